@@ -1,6 +1,15 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
+import time
+import os
+from datetime import timedelta
+
+from utils.cache_datos import estadisticas_cache
+from utils.historico import (
+    cargar_rango_compartido, cargar_y_guardar, estadisticas_historico, leer_promedios_horarios, listar_medidores,
+    rango_crudo, rango_fechas
+)
+from utils.ingesta import cargar_mediciones_compartidas, informe_calidad
+from utils.tareas import enviar_tarea, obtener_tarea
 
 # Set page config
 st.set_page_config(page_title="Home", layout="wide",page_icon="⚡")
@@ -40,19 +49,135 @@ st.markdown("---")
 
 # Sección de Carga de Archivos
 st.subheader("📂 Cargue aquí las mediciones tomadas del analizador")
-uploaded_file = st.file_uploader("Sube un archivo CSV con datos de medición", type=["csv"])
+guardar_col, medidor_col = st.columns([1, 2])
+with guardar_col:
+    guardar_historico = st.checkbox("📚 Guardar también en el histórico", value=False)
+with medidor_col:
+    medidor_carga = st.text_input("Nombre del medidor", value="", disabled=not guardar_historico,
+                                  placeholder="Por defecto, el nombre del archivo")
 
-if uploaded_file is not None:
+uploaded_file = st.file_uploader("Sube un archivo CSV con datos de medición", type=["csv"])
 
-    #Convertimos el csv en un df
-    df=pd.read_csv(uploaded_file)
-    #Guardamos el df en st.session_state
-    st.session_state.df=df
+if uploaded_file is not None and st.session_state.get("archivo_cargado") != uploaded_file.file_id:
+    # Lanzamos la lectura del csv en segundo plano una sola vez por archivo;
+    # si otra sesión ya cargó el mismo contenido se reutiliza desde la caché compartida
+    st.session_state["archivo_cargado"] = uploaded_file.file_id
+    if guardar_historico:
+        medidor = medidor_carga.strip() or os.path.splitext(uploaded_file.name)[0]
+        st.session_state["tarea_carga"] = enviar_tarea(
+            cargar_y_guardar, uploaded_file.getvalue(), medidor, descripcion=f"Carga de {uploaded_file.name} en {medidor}"
+        )
+    else:
+        st.session_state["tarea_carga"] = enviar_tarea(
+            cargar_mediciones_compartidas, uploaded_file.getvalue(), descripcion=f"Carga de {uploaded_file.name}"
+        )
+
+# La tarea sigue ejecutándose aunque se cambie de página; aquí se recoge su resultado
+tarea_carga = obtener_tarea(st.session_state.get("tarea_carga"))
+
+if tarea_carga is not None and tarea_carga.activa:
+    st.progress(tarea_carga.progreso, text=f"⏳ {tarea_carga.mensaje}")
+    time.sleep(0.5)
+    st.rerun()
+
+elif tarea_carga is not None and tarea_carga.estado == "fallida":
+    st.error(f"❌ No fue posible cargar el archivo: {tarea_carga.mensaje}")
+    del st.session_state["tarea_carga"]
+
+elif tarea_carga is not None:
+    #Guardamos el df compartido y su huella en st.session_state
+    st.session_state["huella_datos"], st.session_state.df = tarea_carga.resultado
+    del st.session_state["tarea_carga"]
+
+if uploaded_file is not None and "df" in st.session_state and st.session_state.df is not None:
+    df = st.session_state.df
     # Mostramos el dataframe
     st.success("✅ Archivo cargado correctamente")
     # Mostrar una vista previa de los datos
     st.write("🔍 Vista previa de los datos:")
     st.dataframe(df.head())
 
+# Informe de calidad de la ingesta (huecos, duplicados, orden y horas mal formadas)
+if "df" in st.session_state and st.session_state.df is not None:
+    informe = informe_calidad(st.session_state.get("huella_datos"), st.session_state.df)
+    resumen = informe["resumen"]
+    with st.expander("🧪 Calidad de los datos", expanded=resumen["malformadas"] + resumen["duplicadas"] + resumen["fuera_de_orden"] > 0):
+        col_filas, col_malformadas, col_duplicadas, col_orden, col_huecos = st.columns(5)
+        col_filas.metric("Filas válidas", f"{resumen['filas_validas']:,}", f"{resumen['filas_validas'] - resumen['filas_leidas']:,} descartadas", delta_color="off")
+        col_malformadas.metric("Fechas/horas mal formadas", resumen["malformadas"], f"{resumen['ambiguas']} AM/PM ambiguas", delta_color="off")
+        col_duplicadas.metric("Instantes duplicados", resumen["duplicadas"])
+        col_orden.metric("Filas fuera de orden", resumen["fuera_de_orden"])
+        col_huecos.metric("Huecos", resumen["huecos"], f"paso {resumen['paso_segundos']:g} s", delta_color="off")
+
+        st.write("📅 Cobertura por día:")
+        st.dataframe(informe["cobertura"], hide_index=True)
+        if len(informe["huecos"]):
+            st.write("🕳️ Huecos detectados:")
+            st.dataframe(informe["huecos"], hide_index=True)
+
+# Separador visual
+st.markdown("---")
+
+# Sección del histórico
+st.subheader("📚 Cargar desde el histórico")
+medidores = listar_medidores()
+
+if medidores:
+    medidor_col, rango_col = st.columns([1, 2])
+    with medidor_col:
+        medidor = st.selectbox("Medidor", medidores)
+    # Las páginas trabajan sobre muestras crudas: el rango se limita a lo que no pasó la retención
+    primero, ultimo = rango_crudo(medidor)
+    with rango_col:
+        rango = st.date_input(
+            "Rango de fechas",
+            value=(max(primero.date(), (ultimo - timedelta(days=6)).date()), ultimo.date()),
+            min_value=primero.date(), max_value=ultimo.date(), format="DD/MM/YYYY"
+        )
+
+    if st.button("📥 Cargar rango del histórico", disabled=len(rango) != 2):
+        # Solo se leen de SQLite las filas del rango
+        desde = rango[0]
+        hasta = rango[1] + timedelta(days=1)
+        st.session_state["tarea_carga"] = enviar_tarea(
+            cargar_rango_compartido, medidor, desde, hasta, descripcion=f"Histórico de {medidor}"
+        )
+        st.rerun()
+
+    # Los días anteriores solo conservan promedios horarios; se consultan aparte
+    inicio_horario, _ = rango_fechas(medidor)
+    if inicio_horario.date() < primero.date():
+        with st.expander(f"🕰️ Promedios horarios anteriores al {primero:%d/%m/%Y}"):
+            rango_horario = st.date_input(
+                "Rango de fechas", value=(inicio_horario.date(), primero.date() - timedelta(days=1)),
+                min_value=inicio_horario.date(), max_value=primero.date() - timedelta(days=1),
+                format="DD/MM/YYYY", key="rango_horario"
+            )
+            if len(rango_horario) == 2:
+                horarios = leer_promedios_horarios(medidor, rango_horario[0], rango_horario[1] + timedelta(days=1))
+                st.write("Cada fila es el promedio de una hora; la columna 'muestras' indica cuántas muestras resume.")
+                st.dataframe(horarios, hide_index=True)
+
+    with st.expander("🗃️ Estado del histórico"):
+        st.dataframe(estadisticas_historico(), hide_index=True)
+else:
+    st.info("ℹ️ El histórico está vacío. Marque 'Guardar también en el histórico' al cargar un archivo.")
+
+if uploaded_file is None and "df" in st.session_state and st.session_state.df is not None:
+    df = st.session_state.df
+    st.success(f"✅ Datos cargados: {len(df)} filas del {df['Date'].iloc[0]} al {df['Date'].iloc[-1]}")
+
+# Estado de la caché compartida entre sesiones
+with st.expander("🗄️ Caché compartida de conjuntos de datos"):
+    estadisticas = estadisticas_cache()
+    col_aciertos, col_fallos, col_desalojos, col_memoria = st.columns(4)
+    col_aciertos.metric("Aciertos", estadisticas["aciertos"])
+    col_fallos.metric("Fallos", estadisticas["fallos"])
+    col_desalojos.metric("Desalojos", estadisticas["desalojos"])
+    col_memoria.metric(
+        f"Memoria ({estadisticas['conjuntos']} conjuntos)",
+        f"{estadisticas['bytes'] / 1024 ** 2:.1f} / {estadisticas['max_bytes'] / 1024 ** 2:.0f} MiB"
+    )
+
 # Mensaje final
 st.info("🔍 Explore las diferentes secciones del dashboard en la barra lateral.")
\ No newline at end of file
@@ -0,0 +1,247 @@
+"""API local de consulta en JSON sobre las mediciones procesadas.
+
+Comparte la carga de archivos y las estadísticas con las páginas del dashboard, de
+modo que los scripts del lado SCADA pueden consultar resúmenes sin pasar por la
+interfaz ni volver a procesar los CSV. Cada archivo CSV del directorio de datos es un
+medidor, identificado por el nombre del archivo sin extensión.
+
+Uso:
+    python api.py --datos ./datos --puerto 8502
+
+Endpoints (fechas en formato AAAA-MM-DD):
+    GET /medidores
+    GET /medidores/<medidor>/dias
+    GET /medidores/<medidor>/estadisticas?dia=... | ?desde=...&hasta=...
+    GET /medidores/<medidor>/cuartiles?dia=... | ?desde=...&hasta=...
+    GET /medidores/<medidor>/pf_horario?dia=... | ?desde=...&hasta=...
+
+Las respuestas llevan ETag y se guardan en una caché en memoria; una petición con
+If-None-Match igual al ETag vigente recibe 304 sin cuerpo.
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+from utils.cache_datos import huella_contenido, obtener_o_cargar
+from utils.estadisticas import a_json, cuartiles_voltaje, estadisticas_periodo, pf_horario
+from utils.ingesta import cargar_mediciones
+
+DIRECTORIO_DATOS = "./datos"
+MAX_RESPUESTAS_CACHE = 512
+MAX_HUELLAS = 256
+
+# Nombres de medidor aceptados; se aplica igual al listar y al consultar
+PATRON_MEDIDOR = re.compile(r"[\w\-]+")
+
+# Huella de cada archivo por ruta, con el estado (mtime, tamaño) con que se calculó
+_huellas = OrderedDict()
+_respuestas = OrderedDict()
+_candado = threading.Lock()
+
+
+class ErrorConsulta(Exception):
+    """Error de la consulta con su código HTTP."""
+
+    def __init__(self, codigo, mensaje):
+        super().__init__(mensaje)
+        self.codigo = codigo
+
+
+# ----------------------------------
+# 📦 Datos y filtros
+# ----------------------------------
+
+def listar_medidores():
+    """Medidores disponibles en el directorio de datos."""
+    if not os.path.isdir(DIRECTORIO_DATOS):
+        return []
+    medidores = (os.path.splitext(archivo)[0] for archivo in os.listdir(DIRECTORIO_DATOS) if archivo.endswith(".csv"))
+    return sorted(medidor for medidor in medidores if PATRON_MEDIDOR.fullmatch(medidor))
+
+
+def datos_medidor(medidor):
+    """Devuelve la huella y el DataFrame del medidor, cargándolo a través de la caché compartida."""
+    if not PATRON_MEDIDOR.fullmatch(medidor):
+        raise ErrorConsulta(404, f"Medidor no válido: {medidor}")
+
+    ruta = os.path.join(DIRECTORIO_DATOS, f"{medidor}.csv")
+    if not os.path.isfile(ruta):
+        raise ErrorConsulta(404, f"Medidor no encontrado: {medidor}")
+
+    # La huella solo se recalcula si el archivo cambió en disco; se guarda una por ruta
+    informacion = os.stat(ruta)
+    estado = (informacion.st_mtime_ns, informacion.st_size)
+    with _candado:
+        guardada = _huellas.get(ruta)
+        if guardada is not None:
+            _huellas.move_to_end(ruta)
+    huella = guardada[1] if guardada is not None and guardada[0] == estado else None
+
+    if huella is None:
+        huella = huella_contenido(_leer(ruta))
+        with _candado:
+            _huellas[ruta] = (estado, huella)
+            _huellas.move_to_end(ruta)
+            while len(_huellas) > MAX_HUELLAS:
+                _huellas.popitem(last=False)
+
+    return huella, obtener_o_cargar(huella, lambda: cargar_mediciones(_leer(ruta)))
+
+
+def _leer(ruta):
+    with open(ruta, "rb") as archivo:
+        return archivo.read()
+
+
+def _fecha(parametros, nombre):
+    try:
+        return pd.Timestamp(parametros[nombre][0]).normalize()
+    except (KeyError, ValueError):
+        raise ErrorConsulta(400, f"Parámetro '{nombre}' ausente o inválido (use AAAA-MM-DD).")
+
+
+def filtrar_periodo(df, parametros):
+    """Filtra por `dia` o por el rango `desde`-`hasta` (ambos incluidos)."""
+    if "dia" in parametros:
+        desde = hasta = _fecha(parametros, "dia")
+    elif "desde" in parametros and "hasta" in parametros:
+        desde, hasta = _fecha(parametros, "desde"), _fecha(parametros, "hasta")
+    else:
+        raise ErrorConsulta(400, "Indique 'dia' o 'desde' y 'hasta'.")
+
+    df_periodo = df[(df["Datetime"] >= desde) & (df["Datetime"] < hasta + pd.Timedelta(days=1))]
+    if df_periodo.empty:
+        raise ErrorConsulta(404, "No hay datos en el periodo indicado.")
+    return df_periodo
+
+
+# ----------------------------------
+# 🧠 Consultas
+# ----------------------------------
+
+def consultar_dias(df, parametros):
+    muestras = df.groupby(df["Datetime"].dt.normalize()).size()
+    return [{"dia": dia.strftime("%Y-%m-%d"), "muestras": int(n)} for dia, n in muestras.items()]
+
+
+def consultar_estadisticas(df, parametros):
+    return estadisticas_periodo(filtrar_periodo(df, parametros))
+
+
+def consultar_cuartiles(df, parametros):
+    return cuartiles_voltaje(filtrar_periodo(df, parametros))
+
+
+def consultar_pf_horario(df, parametros):
+    pf = pf_horario(filtrar_periodo(df, parametros))
+    return [{"hora": f"{hora:02d}:00", "pf_promedio": valor} for hora, valor in pf.items()]
+
+
+CONSULTAS = {
+    "dias": consultar_dias,
+    "estadisticas": consultar_estadisticas,
+    "cuartiles": consultar_cuartiles,
+    "pf_horario": consultar_pf_horario,
+}
+
+
+def responder(ruta, parametros):
+    """Resuelve una ruta y devuelve el cuerpo JSON y su ETag, usando la caché de respuestas."""
+    partes = [parte for parte in ruta.split("/") if parte]
+
+    if partes == ["medidores"]:
+        cuerpo = json.dumps(listar_medidores(), ensure_ascii=False).encode("utf-8")
+        return cuerpo, _etag(cuerpo)
+
+    if len(partes) != 3 or partes[0] != "medidores" or partes[2] not in CONSULTAS:
+        raise ErrorConsulta(404, f"Ruta no encontrada: {ruta}")
+
+    medidor, consulta = partes[1], partes[2]
+    huella, df = datos_medidor(medidor)
+
+    # La clave incluye la huella, así que un archivo modificado invalida sus respuestas
+    clave = (huella, consulta, tuple(sorted((k, tuple(v)) for k, v in parametros.items())))
+    with _candado:
+        if clave in _respuestas:
+            _respuestas.move_to_end(clave)
+            return _respuestas[clave]
+
+    resultado = a_json(CONSULTAS[consulta](df, parametros))
+    cuerpo = json.dumps({"medidor": medidor, "resultado": resultado}, ensure_ascii=False).encode("utf-8")
+    respuesta = (cuerpo, _etag(cuerpo))
+
+    with _candado:
+        _respuestas[clave] = respuesta
+        while len(_respuestas) > MAX_RESPUESTAS_CACHE:
+            _respuestas.popitem(last=False)
+    return respuesta
+
+
+def _etag(cuerpo):
+    return f'"{hashlib.blake2b(cuerpo, digest_size=16).hexdigest()}"'
+
+
+# ----------------------------------
+# 🌐 Servidor HTTP
+# ----------------------------------
+
+class ManejadorAPI(BaseHTTPRequestHandler):
+    """Atiende las peticiones GET de la API."""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        try:
+            cuerpo, etag = responder(url.path, parse_qs(url.query))
+        except ErrorConsulta as error:
+            self._enviar(error.codigo, json.dumps({"error": str(error)}, ensure_ascii=False).encode("utf-8"))
+            return
+        except Exception as error:
+            # Cualquier otro fallo (columna ausente, CSV mal formado, ...) responde 500 en vez de cortar la conexión
+            self.log_error("Error atendiendo %s: %r", self.path, error)
+            self._enviar(500, json.dumps({"error": f"Error interno: {error}"}, ensure_ascii=False).encode("utf-8"))
+            return
+
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        self._enviar(200, cuerpo, etag)
+
+    def _enviar(self, codigo, cuerpo, etag=None):
+        self.send_response(codigo)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.send_header("Cache-Control", "no-cache")
+        if etag is not None:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+
+def main():
+    global DIRECTORIO_DATOS
+
+    parser = argparse.ArgumentParser(description="API local de consulta de mediciones en JSON.")
+    parser.add_argument("--datos", default=DIRECTORIO_DATOS, help="Directorio con un CSV por medidor.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8502)
+    argumentos = parser.parse_args()
+
+    DIRECTORIO_DATOS = argumentos.datos
+    servidor = ThreadingHTTPServer((argumentos.host, argumentos.puerto), ManejadorAPI)
+    print(f"API escuchando en http://{argumentos.host}:{argumentos.puerto} (datos en {DIRECTORIO_DATOS})")
+    servidor.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
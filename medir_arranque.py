@@ -0,0 +1,122 @@
+"""Mide el arranque en frío y el primer render de las páginas del dashboard.
+
+Cada medición corre en un intérprete nuevo, como un contenedor que arranca desde
+cero: importa streamlit, ejecuta la página con AppTest y reporta el tiempo de
+importación, el del primer render (que incluye importar lo que la página necesita)
+y el de un segundo render ya en caliente, además de la memoria máxima del proceso.
+
+Uso:
+    python medir_arranque.py --repeticiones 5
+    python medir_arranque.py --csv mediciones.csv
+
+Para comparar antes y después de un cambio, corra el mismo comando con --raiz
+apuntando a otra copia del repositorio (por ejemplo un `git worktree`).
+"""
+import argparse
+import glob
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Configuración de alarmas usada cuando se mide con datos
+CONFIGURACION_PRUEBA = {
+    "limite_superior_v": 132.0,
+    "valor_nominal_v": 120.0,
+    "limite_inferior_v": 108.0,
+    "umbral_corriente": 100.0,
+    "umbral_factor_potencia": 0.9,
+    "desbalance_moderado_v": 2.0,
+    "desbalance_critico_v": 3.0,
+    "desbalance_moderado_i": 10.0,
+    "desbalance_critico_i": 20.0,
+}
+
+# Código que corre en el intérprete nuevo; recibe raíz, página y csv por argv
+MEDICION = r"""
+import json, os, resource, sys, time
+raiz, pagina, csv, configuracion = sys.argv[1], sys.argv[2], sys.argv[3], json.loads(sys.argv[4])
+
+inicio = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+importacion = time.perf_counter() - inicio
+
+sys.path.insert(0, raiz)
+os.chdir(raiz)
+at = AppTest.from_file(os.path.join(raiz, pagina), default_timeout=300)
+
+carga = 0.0
+if csv:
+    inicio = time.perf_counter()
+    from utils.ingesta import cargar_mediciones_compartidas
+    with open(csv, "rb") as archivo:
+        at.session_state["huella_datos"], at.session_state["df"] = cargar_mediciones_compartidas(archivo.read())
+    at.session_state["configuracion_alarmas"] = configuracion
+    carga = time.perf_counter() - inicio
+
+inicio = time.perf_counter()
+at.run()
+primer_render = time.perf_counter() - inicio
+
+inicio = time.perf_counter()
+at.run()
+segundo_render = time.perf_counter() - inicio
+
+print(json.dumps({
+    "importacion": importacion,
+    "carga": carga,
+    "primer_render": primer_render,
+    "segundo_render": segundo_render,
+    "memoria_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "excepciones": [str(excepcion.value) for excepcion in at.exception],
+}))
+"""
+
+
+def medir_pagina(raiz, pagina, csv, repeticiones):
+    """Corre la medición de una página en intérpretes nuevos y devuelve las medianas."""
+    mediciones = []
+    for _ in range(repeticiones):
+        salida = subprocess.run(
+            [sys.executable, "-c", MEDICION, raiz, pagina, csv or "", json.dumps(CONFIGURACION_PRUEBA)],
+            capture_output=True, text=True, check=True,
+        )
+        mediciones.append(json.loads(salida.stdout.strip().splitlines()[-1]))
+
+    resumen = {
+        clave: statistics.median(medicion[clave] for medicion in mediciones)
+        for clave in ("importacion", "carga", "primer_render", "segundo_render", "memoria_mb")
+    }
+    resumen["excepciones"] = mediciones[-1]["excepciones"]
+    return resumen
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mide el arranque en frío y el primer render de cada página.")
+    parser.add_argument("--raiz", default=os.path.dirname(os.path.abspath(__file__)), help="Copia del repositorio a medir.")
+    parser.add_argument("--csv", default=None, help="CSV del analizador para medir las páginas con datos cargados.")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--paginas", nargs="*", default=None, help="Páginas a medir (por defecto todas).")
+    argumentos = parser.parse_args()
+
+    raiz = os.path.abspath(argumentos.raiz)
+    csv = os.path.abspath(argumentos.csv) if argumentos.csv else None
+    paginas = argumentos.paginas or ["1_Home.py"] + sorted(
+        os.path.relpath(ruta, raiz) for ruta in glob.glob(os.path.join(raiz, "pages", "*.py"))
+    )
+
+    print(f"Medianas de {argumentos.repeticiones} arranques en frío ({'con datos' if csv else 'sin datos'}), en ms")
+    print(f"{'Página':<28}{'streamlit':>10}{'carga':>10}{'1er render':>12}{'2do render':>12}{'RSS MiB':>10}")
+    for pagina in paginas:
+        resumen = medir_pagina(raiz, pagina, csv, argumentos.repeticiones)
+        print(
+            f"{pagina:<28}{resumen['importacion'] * 1000:>10.0f}{resumen['carga'] * 1000:>10.0f}"
+            f"{resumen['primer_render'] * 1000:>12.0f}{resumen['segundo_render'] * 1000:>12.0f}{resumen['memoria_mb']:>10.0f}"
+        )
+        if resumen["excepciones"]:
+            print(f"  ⚠️ {resumen['excepciones'][0]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,11 @@
 import streamlit as st
+import pandas as pd
+
+from utils.cache_datos import obtener_derivado
+from utils.config_loader import cargar_configuracion, duracion_regla, guardar_configuracion, listar_sitios
+from utils.histogramas import histogramas_compartidos, limites_configuracion, tiempo_fuera_de_limite
+from utils.reglas_alarma import eventos_compartidos, validar_regla
+from utils.resumen_diario import construir_resumen_diario, evaluar_alarmas_diarias
 
 
 def obtener_valor_configuracion(clave, valor_default):
@@ -15,6 +22,27 @@ st.title("Configuración")
 st.write("Aquí puedes establecer los límites para la detección de alarmas en el monitoreo eléctrico.")
 
 
+# --------- Sección Perfil del sitio ----------
+with st.expander("🏭 Perfil de configuración del sitio", expanded=True):
+    sitios_guardados = listar_sitios()
+    sitio_col, cargar_col = st.columns([2, 1])
+
+    with sitio_col:
+        sitio_existente = st.selectbox("Perfiles guardados", options=["(Nuevo sitio)"] + sitios_guardados)
+        sitio = st.text_input(
+            "Nombre del sitio",
+            value="" if sitio_existente == "(Nuevo sitio)" else sitio_existente,
+            help="La configuración se guarda en disco con este nombre."
+        )
+
+    with cargar_col:
+        st.write("")
+        if st.button("📂 Cargar perfil", disabled=sitio_existente == "(Nuevo sitio)"):
+            st.session_state["configuracion_alarmas"] = cargar_configuracion(sitio_existente)
+            st.session_state["sitio"] = sitio_existente
+            st.rerun()
+
+
 # --------- Sección Voltajes ----------
 with st.expander("🔋 Configuración de Alarmas de Voltaje", expanded=True):
     st.subheader("Parámetros de Voltaje")
@@ -103,19 +131,96 @@ with st.expander("🔥 Configuración de Alarmas de Potencia", expanded=True):
         format="%.2f"
     )
 
+# --------- Sección Reglas personalizadas ----------
+with st.expander("🧮 Reglas de alarma personalizadas", expanded=False):
+    st.write(
+        "Cada regla es una expresión sobre las columnas (U1, U2, U3, I1, I2, I3, Uunb, Iunb, PF), los valores de la "
+        "configuración (por ejemplo `nominal` o `umbral_corriente`), operaciones + - * /, comparaciones, "
+        "`and`/`or`/`not` y las funciones `max`, `min`, `any`, `all` y `abs`. "
+        "Ejemplos: `max(U1, U2, U3) > 1.1 * nominal` durante 60 s, o `Iunb > 10 and I1 > 50`."
+    )
+    reglas_editadas = st.data_editor(
+        pd.DataFrame(obtener_valor_configuracion("reglas", []), columns=["nombre", "expresion", "duracion_s"]),
+        num_rows="dynamic",
+        use_container_width=True,
+        column_config={
+            "nombre": st.column_config.TextColumn("Nombre", required=True),
+            "expresion": st.column_config.TextColumn("Expresión", required=True, width="large"),
+            "duracion_s": st.column_config.NumberColumn("Duración mínima (s)", min_value=0.0, default=0.0, required=True),
+        },
+        key="editor_reglas",
+    )
+
+configuracion_propuesta = {
+    "limite_superior_v": limite_superior_v,
+    "valor_nominal_v": valor_nominal_v,
+    "limite_inferior_v": limite_inferior_v,
+    "umbral_corriente": umbral_corriente,
+    "umbral_factor_potencia": umbral_factor_potencia,
+    "desbalance_moderado_v": desbalance_moderado_v,
+    "desbalance_critico_v": desbalance_critico_v,
+    "desbalance_moderado_i": desbalance_moderado_i,
+    "desbalance_critico_i": desbalance_critico_i
+}
+
+# Solo se guardan las reglas completas que compilan con la configuración propuesta
+reglas_propuestas = []
+for regla in reglas_editadas.dropna(subset=["nombre", "expresion"]).to_dict("records"):
+    error_regla = validar_regla(regla["expresion"], configuracion_propuesta)
+    if error_regla is not None:
+        st.error(f"❌ Regla '{regla['nombre']}': {error_regla}")
+    else:
+        reglas_propuestas.append({"nombre": regla["nombre"], "expresion": regla["expresion"],
+                                  "duracion_s": duracion_regla(regla["duracion_s"])})
+configuracion_propuesta["reglas"] = reglas_propuestas
+
+# --------- Impacto de la configuración propuesta ----------
+if "df" in st.session_state and st.session_state.df is not None:
+    with st.expander("📋 Impacto de la configuración propuesta por día", expanded=False):
+        st.write("Alarmas que se habrían presentado con los valores actuales, calculadas a partir de resúmenes e histogramas diarios precalculados.")
+
+        # Los resúmenes y los histogramas se calculan una vez por conjunto de datos; reevaluar es O(días × bins)
+        df = st.session_state.df
+        resumen_diario = obtener_derivado(
+            st.session_state.get("huella_datos"), "resumen_diario", lambda: construir_resumen_diario(df)
+        )
+        histogramas = histogramas_compartidos(st.session_state.get("huella_datos"), df)
+        st.dataframe(evaluar_alarmas_diarias(resumen_diario, histogramas, configuracion_propuesta), hide_index=True, use_container_width=True)
+
+    with st.expander("⏱️ Tiempo fuera de los límites propuestos", expanded=False):
+        st.write("Porcentaje del tiempo, horas y días en que cada canal habría quedado fuera de los límites actuales, a partir de histogramas diarios precalculados.")
+
+        # Mismos histogramas del impacto por día, sumados sobre todo el conjunto
+        filas_limites = []
+        for canal in histogramas["canales"]:
+            for nombre_limite, valor_limite, sobre_limite in limites_configuracion(canal, configuracion_propuesta):
+                fuera = tiempo_fuera_de_limite(histogramas, canal, valor_limite, sobre_limite)
+                filas_limites.append({
+                    "Canal": canal,
+                    "Límite": nombre_limite,
+                    "Condición": f"{'>' if sobre_limite else '<'} {valor_limite}",
+                    "Tiempo fuera (%)": round(fuera["porcentaje"], 2),
+                    "Horas": round(fuera["horas"], 1),
+                    "Días afectados": fuera["dias"],
+                })
+        st.dataframe(pd.DataFrame(filas_limites), hide_index=True, use_container_width=True)
+
+    if reglas_propuestas:
+        with st.expander("🧮 Eventos de las reglas personalizadas", expanded=False):
+            st.write("Eventos que habrían generado las reglas válidas en todo el conjunto de datos.")
+            eventos_reglas, resumen_reglas = eventos_compartidos(
+                st.session_state.get("huella_datos"), df, reglas_propuestas, configuracion_propuesta
+            )
+            st.dataframe(resumen_reglas, hide_index=True, use_container_width=True)
+
 # --------- Botón para Guardar o Aplicar Configuración ----------
 if st.button("💾 Guardar Configuración"):
-    st.success("¡Configuración guardada correctamente!")
-    
-    # Podrías guardar en session_state
-    st.session_state["configuracion_alarmas"] = {
-        "limite_superior_v": limite_superior_v,
-        "valor_nominal_v": valor_nominal_v,
-        "limite_inferior_v": limite_inferior_v,
-        "umbral_corriente": umbral_corriente,
-        "umbral_factor_potencia": umbral_factor_potencia,
-        "desbalance_moderado_v": desbalance_moderado_v,
-        "desbalance_critico_v": desbalance_critico_v,
-        "desbalance_moderado_i": desbalance_moderado_i,
-        "desbalance_critico_i": desbalance_critico_i
-    }
\ No newline at end of file
+    # Guardamos en session_state y, si hay sitio, también en disco
+    st.session_state["configuracion_alarmas"] = configuracion_propuesta
+
+    if sitio.strip():
+        ruta_perfil = guardar_configuracion(sitio, configuracion_propuesta)
+        st.session_state["sitio"] = sitio
+        st.success(f"¡Configuración guardada correctamente en {ruta_perfil}!")
+    else:
+        st.success("¡Configuración guardada correctamente para esta sesión!")
\ No newline at end of file
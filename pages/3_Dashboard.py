@@ -1,10 +1,43 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
 import plotly.graph_objects as go
 from datetime import time
 
-
+from utils.anomalias import REFERENCIAS_ANOMALIAS, detectar_anomalias
+from utils.cache_datos import obtener_derivado
+from utils.cumplimiento import evaluar_cumplimiento_semanal
+from utils.energia import VENTANA_DEMANDA_MINUTOS, calcular_energia, energia_del_dia
+from utils.estadisticas import COLUMNAS_CORRIENTE, COLUMNAS_VOLTAJE, cuartiles_voltaje
+from utils.graficas import (COLUMNAS_HORARIAS, a_plotly, datos_dia, pivote_horario, spec_corriente, spec_energia_horaria,
+                            spec_factor_potencia, spec_promedio_corriente, spec_voltaje)
+from utils.histogramas import curva_duracion, histograma_rango, histogramas_compartidos, limites_configuracion, tiempo_fuera_de_limite
+from utils.indice_acumulado import INTERVALOS_AGREGACION, indice_compartido, promedio_ventana, promedios_intervalo
+from utils.plots import figura_curva_duracion, figura_histograma, figura_mapa_calor
+from utils.reglas_alarma import eventos_compartidos
+from utils.resumen_diario import construir_resumen_diario, evaluar_alarmas_diarias
+
+
+
+def agregar_marcas_anomalias(fig, df_seccion, anomalias, columnas, promedios=None, intervalo=None):
+    """Agrega a la figura marcadores sobre las muestras anómalas de cada columna.
+
+    Si las trazas están agregadas, se marca cada intervalo que contiene alguna muestra
+    anómala, sobre el promedio del intervalo.
+    """
+    for columna in columnas:
+        marcas = df_seccion[anomalias.loc[df_seccion.index, columna].to_numpy()]
+        if intervalo is None:
+            x, y = marcas["Datetime"], marcas[columna]
+        else:
+            intervalos = promedios.index.intersection(marcas["Datetime"].dt.floor(intervalo).unique())
+            x, y = intervalos, promedios.loc[intervalos, columna]
+        fig.add_trace(go.Scatter(
+            x=x,
+            y=y,
+            mode='markers',
+            name=f"Anomalía {columna.replace('_rms_AVG', '')}",
+            marker=dict(color="black", symbol="x", size=8)
+        ))
 
 
 # Set page config
@@ -16,22 +49,44 @@ st.write("Visualización de datos de voltajes, corrientes y potencia.")
 
 # Verificar si el DataFrame está disponible en session_state
 if "df" in st.session_state and st.session_state.df is not None:
-    df = st.session_state.df  # Recuperar el DataFrame
-
-    # Reemplazar "a. m." por "AM" y "p. m." por "PM" en la columna Time
-    df["Time"] = df["Time"].str.replace(" a. m.", " AM").str.replace(" p. m.", " PM")
-
-    # Convertir Date a formato datetime (suponiendo formato día/mes/año)
-    df["Date"] = pd.to_datetime(df["Date"], format="%d/%m/%Y").dt.strftime("%d/%m/%Y")
-
-    # Unir ambas columnas en una sola (Date + Time)
-    df["Datetime"] = df["Date"].astype(str) + " " + df["Time"]
-    df["Datetime"] = pd.to_datetime(df["Datetime"], format="%d/%m/%Y %I:%M:%S %p")
+    df = st.session_state.df  # Recuperar el DataFrame (fechas ya preparadas en la carga)
 
     dias_disponibles = df["Date"].unique()
 
-    # Selección día filtrado
-    fecha_seleccionada = st.selectbox("📅 Selecciona el día a visualizar:", options=dias_disponibles)
+    # Selección día filtrado (el Calendario puede dejar un día preseleccionado en la clave del selector)
+    if st.session_state.get("dia_dashboard") not in list(dias_disponibles):
+        st.session_state.pop("dia_dashboard", None)
+    fecha_seleccionada = st.selectbox("📅 Selecciona el día a visualizar:", options=dias_disponibles, key="dia_dashboard")
+
+    # Intervalo de las gráficas: los promedios salen del índice de sumas acumuladas construido en la carga
+    nombre_intervalo = st.selectbox("⏱️ Intervalo de agregación de las gráficas:", options=list(INTERVALOS_AGREGACION.keys()))
+    intervalo_graficas = INTERVALOS_AGREGACION[nombre_intervalo]
+
+    indice = indice_compartido(st.session_state.get("huella_datos"), df)
+    inicio_dia = pd.to_datetime(fecha_seleccionada, format="%d/%m/%Y")
+    fin_dia = inicio_dia + pd.Timedelta(days=1)
+    promedio_dia = promedio_ventana(indice, inicio_dia, fin_dia)
+    # Sin agregar, voltaje y corriente usan las muestras y el PF se mantiene por hora
+    promedios_graficas = promedios_intervalo(indice, inicio_dia, fin_dia, intervalo_graficas or "60min")
+
+    # Detección de anomalías con mediana/MAD de la misma franja horaria sobre todos los canales a la vez
+    with st.expander("🔎 Detección de anomalías"):
+        marcar_anomalias = st.checkbox("Marcar anomalías en las gráficas de voltaje y corriente", value=False)
+        referencia_col, umbral_col = st.columns(2)
+        with referencia_col:
+            referencia_anomalias = st.selectbox("Comparar cada muestra con", options=list(REFERENCIAS_ANOMALIAS.keys()))
+            franjas_anomalias = REFERENCIAS_ANOMALIAS[referencia_anomalias]
+        with umbral_col:
+            umbral_anomalias = st.number_input("Umbral (desviaciones robustas)", min_value=2.0, max_value=20.0, value=5.0, step=0.5)
+
+        if marcar_anomalias:
+            anomalias = obtener_derivado(
+                st.session_state.get("huella_datos"), ("anomalias", franjas_anomalias, umbral_anomalias),
+                lambda: detectar_anomalias(df, n_franjas=franjas_anomalias, umbral=umbral_anomalias)
+            )
+            anomalias_dia = anomalias[(df["Date"] == fecha_seleccionada).to_numpy()]
+            st.write("Muestras anómalas en el día seleccionado:")
+            st.dataframe(anomalias_dia.sum().rename("Muestras").to_frame().T, hide_index=True)
 
 else:
     st.warning("⚠️ No hay datos cargados. Ve a la página de inicio y sube un archivo CSV.")
@@ -91,98 +146,17 @@ with st.container():
             df_voltajes = df_voltajes[df_voltajes["Datetime"].notna()]  # Evita NaT en eje X
 
 
-            # Lista de columnas que quieres graficar
-            columnas_a_graficar = ["U1_rms_AVG", "U2_rms_AVG", "U3_rms_AVG"]
-
-            # Colores personalizados para cada línea
-            colores_voltaje = {
-                "U1_rms_AVG": "blue",
-                "U2_rms_AVG": "red",
-                "U3_rms_AVG": "green",
-            }
-
-            # Crear figura
-            fig_voltaje = go.Figure()
-
-            # Añadir una línea por cada columna
-            for columna in columnas_a_graficar:
-                fig_voltaje.add_trace(go.Scatter(
-                    x=df_voltajes["Datetime"],
-                    y=df_voltajes[columna],
-                    mode='lines',
-                    name=columna.replace("_rms_AVG", ""),  # Opcional: limpia el nombre para mostrar bonito
-                    line=dict(color=colores_voltaje.get(columna, 'black'), width=2)
-                ))
-            # Añadir las tres líneas horizontales
-            fig_voltaje.update_layout(
-                shapes=[
-                    dict(type="line", xref="paper", x0=0, x1=1, yref="y", y0=limite_superior_voltaje, y1=limite_superior_voltaje,
-                        line=dict(color="red", width=4, dash="dash")),
-                    dict(type="line", xref="paper", x0=0, x1=1, yref="y", y0=valor_nominal_voltaje, y1=valor_nominal_voltaje,
-                        line=dict(color="grey", width=4, dash="dash")),
-                    dict(type="line", xref="paper", x0=0, x1=1, yref="y", y0=limite_inferior_voltaje, y1=limite_inferior_voltaje,
-                        line=dict(color="blue", width=4, dash="dash")),
-                ],
-                annotations=[
-                    dict(
-                        x=1.005, y=limite_superior_voltaje,
-                        xref='paper', yref='y',
-                        text='Límite Superior',
-                        showarrow=False,
-                        font=dict(color="red", size=12),
-                        xanchor='left'
-                    ),
-                    dict(
-                        x=1.005, y=valor_nominal_voltaje,
-                        xref='paper', yref='y',
-                        text='Valor Nominal',
-                        showarrow=False,
-                        font=dict(color="grey", size=12),
-                        xanchor='left'
-                    ),
-                    dict(
-                        x=1.005, y=limite_inferior_voltaje,
-                        xref='paper', yref='y',
-                        text='Límite Inferior',
-                        showarrow=False,
-                        font=dict(color="blue", size=12),
-                        xanchor='left'
-                    ),
-                ]
-            )
-
-            # Configurar el layout (títulos, ejes, grid, etc.)
-            fig_voltaje.update_layout(
-                title="Gráfica Voltaje Promedio",
-                xaxis_title="Fecha y Hora",
-                yaxis_title="Voltaje (V)",
-                xaxis=dict(
-                    tickformat="%H:%M",
-                    tickmode="auto",
-                    nticks=24,  # Aproximadamente 1 tick por hora si es un día
-                    showgrid=True,
-                    gridcolor="lightgrey",
-                    tickangle=45  # Rotar las etiquetas
-                ),
-                yaxis=dict(
-                    showgrid=True,
-                    gridcolor="lightgrey"
-                ),
-                legend=dict(
-                    title="Medidas",
-                    orientation="h",
-                    yanchor="bottom",
-                    y=1.02,
-                    xanchor="right",
-                    x=1
-                ),
-                margin=dict(l=40, r=120, t=80, b=40),
-                height=600,
-                template="simple_white"
-            )
+            # Misma especificación que la gráfica del reporte, con todas las muestras del día
+            if intervalo_graficas is None:
+                fig_voltaje = a_plotly(spec_voltaje(df_voltajes["Datetime"], df_voltajes[COLUMNAS_VOLTAJE].to_numpy(), config))
+            else:
+                fig_voltaje = a_plotly(spec_voltaje(promedios_graficas.index, promedios_graficas[COLUMNAS_VOLTAJE].to_numpy(), config))
 
             # Mostrar en Streamlit o en notebook
             # Para Streamlit:
+            if marcar_anomalias:
+                agregar_marcas_anomalias(fig_voltaje, df_voltajes, anomalias, COLUMNAS_VOLTAJE, promedios_graficas, intervalo_graficas)
+
             st.plotly_chart(fig_voltaje, use_container_width=True)
             filtro_placeholder = st.empty()
 
@@ -190,7 +164,7 @@ with st.container():
         with desbalance_col:
             st.write("Desbalance de voltajes")
             # Obtener el valor actual del desbalance desde el DataFrame
-            valor_desbalance = df_voltajes["Uunb_AVG"].mean()  # Promedio de desbalance
+            valor_desbalance = promedio_dia["Uunb_AVG"]  # Promedio de desbalance del día
 
             # Elegir color según nivel de desbalance
             if valor_desbalance < desbalance_moderado_v:
@@ -224,34 +198,8 @@ with st.container():
 
             
 
-            # Cuartiles U1_AVG
-            Q1_U1_99 = df_voltajes["U1_rms_AVG"].quantile(0.99)
-            Q1_U1_95 = df_voltajes["U1_rms_AVG"].quantile(0.95)
-            Q1_U1_90 = df_voltajes["U1_rms_AVG"].quantile(0.90)
-
-            
-
-            # Cuartiles U2_AVG
-            Q1_U2_99 = df_voltajes["U2_rms_AVG"].quantile(0.99)
-            Q1_U2_95 = df_voltajes["U2_rms_AVG"].quantile(0.95)
-            Q1_U2_90 = df_voltajes["U2_rms_AVG"].quantile(0.90)
-
-            
-            # Cuartiles U3_AVG
-            Q1_U3_99 = df_voltajes["U3_rms_AVG"].quantile(0.99)
-            Q1_U3_95 = df_voltajes["U3_rms_AVG"].quantile(0.95)
-            Q1_U3_90 = df_voltajes["U3_rms_AVG"].quantile(0.90)
-
-            
-
-            
-
             st.write("Cuartiles voltajes promedio RMS L-N para el día seleccionado")
-            df_tabla_voltajes = pd.DataFrame({
-                "U1": [Q1_U1_99,Q1_U1_95,Q1_U1_90],
-                "U2": [Q1_U2_99,Q1_U2_95,Q1_U2_90],
-                "U3": [Q1_U3_99,Q1_U3_95,Q1_U3_90],
-            }, index=["99%","95%","90%"])
+            df_tabla_voltajes = cuartiles_voltaje(df_voltajes)
 
             # Estilizar la tabla para resaltar valores mayores a 260 V
             styled_df_voltajes = df_tabla_voltajes.style.applymap(lambda x: "background-color: yellow" if x > limite_superior_voltaje else "")
@@ -287,81 +235,21 @@ with st.container():
             
 
 
-            # Lista de columnas que quieres graficar
-            columnas_a_graficar_corriente = ["I1_rms_AVG", "I2_rms_AVG", "I3_rms_AVG"]
-
-            # Colores personalizados para cada línea
-            colores = {
-                "I1_rms_AVG": "blue",
-                "I2_rms_AVG": "red",
-                "I3_rms_AVG": "green",
-            }
-
-            # Crear figura
-            fig_corriente = go.Figure()
-
-            # Añadir una línea por cada columna
-            for columna in columnas_a_graficar_corriente:
-                fig_corriente.add_trace(go.Scatter(
-                    x=df_corriente["Datetime"],
-                    y=df_corriente[columna],
-                    mode='lines',
-                    name=columna.replace("_rms_AVG", ""),  # Opcional: limpia el nombre para mostrar bonito
-                    line=dict(color=colores.get(columna, 'black'), width=2)
+            # Misma especificación que la gráfica del reporte, con todas las muestras del día
+            if intervalo_graficas is None:
+                fig_corriente = a_plotly(spec_corriente(
+                    df_corriente["Datetime"], df_corriente[COLUMNAS_CORRIENTE].to_numpy(), valor_nominal_corriente
+                ))
+            else:
+                fig_corriente = a_plotly(spec_corriente(
+                    promedios_graficas.index, promedios_graficas[COLUMNAS_CORRIENTE].to_numpy(), valor_nominal_corriente
                 ))
-            # Añadir las tres líneas horizontales
-            fig_corriente.update_layout(
-                shapes=[
-                    
-                    dict(type="line", xref="paper", x0=0, x1=1, yref="y", y0=valor_nominal_corriente, y1=valor_nominal_corriente,
-                        line=dict(color="grey", width=4, dash="dash"))
-                    
-                ],
-                annotations=[
-                    
-                    dict(
-                        x=1.005, y=valor_nominal_corriente,
-                        xref='paper', yref='y',
-                        text='Corriente Nominal',
-                        showarrow=False,
-                        font=dict(color="grey", size=12),
-                        xanchor='left'
-                    )
-                ]
-            )
-
-            # Configurar el layout (títulos, ejes, grid, etc.)
-            fig_corriente.update_layout(
-                title="Gráfica corriente promedio",
-                xaxis_title="Fecha y Hora",
-                yaxis_title="Corriente (A)",
-                xaxis=dict(
-                    tickformat="%H:%M",
-                    tickmode="auto",
-                    nticks=24,  # Aproximadamente 1 tick por hora si es un día
-                    showgrid=True,
-                    gridcolor="lightgrey",
-                    tickangle=45  # Rotar las etiquetas
-                ),
-                yaxis=dict(
-                    showgrid=True,
-                    gridcolor="lightgrey"
-                ),
-                legend=dict(
-                    title="Medidas",
-                    orientation="h",
-                    yanchor="bottom",
-                    y=1.02,
-                    xanchor="right",
-                    x=1
-                ),
-                margin=dict(l=40, r=120, t=80, b=40),
-                height=600,
-                template="simple_white"
-            )
 
             # Mostrar en Streamlit o en notebook
             # Para Streamlit:
+            if marcar_anomalias:
+                agregar_marcas_anomalias(fig_corriente, df_corriente, anomalias, COLUMNAS_CORRIENTE, promedios_graficas, intervalo_graficas)
+
             st.plotly_chart(fig_corriente, use_container_width=True)
 
             filtro_placeholder = st.empty()
@@ -370,7 +258,7 @@ with st.container():
             st.write("Desbalance de corriente")
 
             # Obtener el valor actual del desbalance desde el DataFrame
-            valor_desbalance_corriente = df_corriente["Iunb_AVG"].mean()  # Promedio de desbalance
+            valor_desbalance_corriente = promedio_dia["Iunb_AVG"]  # Promedio de desbalance del día
 
             # Elegir color según nivel de desbalance
             if valor_desbalance_corriente < desbalance_moderado_i:
@@ -399,58 +287,9 @@ with st.container():
             """, unsafe_allow_html=True)
 
         with promedio_col:
-            # Calcular promedios
-            promedios_corriente = df_corriente[["I1_rms_AVG", "I2_rms_AVG", "I3_rms_AVG"]].mean()
-
-           # Datos de ejemplo (reemplazar con los datos reales)
-            fases_corrientes_promedio = ["Fase A", "Fase B", "Fase C"]
-            corrientes = [round(df_corriente["I1_rms_AVG"].mean(),2), round(df_corriente["I2_rms_AVG"].mean(),2), round(df_corriente["I3_rms_AVG"].mean(),2)]  # valores promedio por fase (en A)
-            
-            
-
-            fig_promedio_corriente = go.Figure()  # crear figura vacía
-
-            # Añadir barras para cada fase
-            fig_promedio_corriente.add_trace(go.Bar(
-                x=fases_corrientes_promedio, 
-                y=corrientes,
-                text=corrientes,               # mostrar los valores sobre cada barra
-                textposition='outside',        # posición del texto por encima (fuera) de la barra
-                marker_color=["blue", "red", "green"],  # colores para cada barra
-                name="Corriente por fase", 
-                showlegend=False              # no mostrar este trace en la leyenda
-            ))
-
-            # Línea visual
-            fig_promedio_corriente.update_layout(
-                shapes=[
-                    dict(
-                        type="line",
-                        xref="paper", x0=0, x1=1,
-                        yref="y", y0=valor_nominal_corriente, y1=valor_nominal_corriente,
-                        line=dict(color="orange", width=5, dash="solid")
-                    )
-                ]
-            )
-
-            # Dummy trace para la leyenda
-            fig_promedio_corriente.add_trace(go.Scatter(
-                x=[None],
-                y=[None],
-                mode="lines",
-                name=f"Umbral {valor_nominal_corriente} A",
-                line=dict(color="orange", width=5, dash="solid")
-            ))
-
-            fig_promedio_corriente.update_layout(
-                title_text="Corriente promedio por fase",
-                xaxis_title="Fase",
-                yaxis_title="Corriente (A)",
-                yaxis=dict(showgrid=True, gridcolor="lightgray", gridwidth=1),
-                margin=dict(l=40, r=120, t=80, b=40),
-                height=600,
-                template="simple_white"
-            )
+            # Corriente promedio por fase del día, del promedio diario guardado en la caché
+            corrientes = datos_dia(st.session_state.get("huella_datos"), df, fecha_seleccionada)["corriente_promedio"]
+            fig_promedio_corriente = a_plotly(spec_promedio_corriente(corrientes, valor_nominal_corriente))
 
             # Mostrar en Streamlit o en notebook
             # Para Streamlit:
@@ -470,101 +309,18 @@ st.markdown("---")
 with st.container():
     st.subheader("Potencia")
     if "df" in st.session_state and st.session_state.df is not None and alarmas_configuradas is True:
-        # Filtrar el DataFrame por la fecha seleccionada en el selectbox para potencia
-        df_potencia=df[df["Date"]==fecha_seleccionada]
-        #Modificamos la columna Time para ajustarla en fomrato datetime
-        df_potencia['Time'] = pd.to_datetime(df_potencia['Time'],format='%I:%M:%S %p').dt.time
-        # Extraer la hora como número (0 a 23)
-        df_potencia['hour'] = pd.to_datetime(df_potencia['Time'].astype(str)).dt.hour
 
-        
         # Tercera fila (Histograma + Indicador + Tabla)
         grafica_col, indicador_col = st.columns([1, 1])
     
         with grafica_col:
-           # Agrupar por hora y calcular promedio
-            df_hourly = df_potencia.groupby('hour')['PF_sum_AVG'].mean().reset_index()
-
-            # Crear etiquetas tipo 00:00, 01:00, ..., 23:00
-            etiquetas_horas = [f"{h:02d}:00" for h in range(24)]
-
-            # Clasificar estado por nivel de PF
-            df_hourly['status'] = df_hourly['PF_sum_AVG'].apply(lambda x: 'Anormal' if x < umbral_factor_potencia or x >1 else 'Normal')
-
-            # Definir colores
-            colores_estado = {
-                'Anormal': 'red',
-                'Normal': 'blue'
-            }
-
-            # Mapeo de colores individuales para cada barra
-            colores_barras = [colores_estado[estado] for estado in df_hourly['status']]
-
-            # Crear figura
-            fig_potencia = go.Figure()
-
-            # Añadir las barras principales
-            fig_potencia.add_trace(go.Bar(
-                x=etiquetas_horas,
-                y=df_hourly['PF_sum_AVG'],
-                marker_color=colores_barras,
-                text=[f"{y:.3f}" for y in df_hourly['PF_sum_AVG']],
-                textposition='outside',
-                showlegend=False  # Las barras no deben aparecer en leyenda
+           # Promedio del PF en cada intervalo del día (por hora si no se agrega); los vacíos quedan en su posición
+            fig_potencia = a_plotly(spec_factor_potencia(
+                promedios_graficas["PF_sum_AVG"], umbral_factor_potencia,
+                etiquetas=promedios_graficas.index.strftime("%H:%M"),
+                titulo=f"Promedio de factor de potencia cada {(intervalo_graficas or '60min').replace('min', ' min')}"
             ))
 
-            # ------ AGREGAR LEYENDA MANUAL ------
-            fig_potencia.add_trace(go.Scatter(
-                x=[None],
-                y=[None],
-                mode='markers',
-                marker=dict(size=10, color='blue'),
-                legendgroup="Normal",
-                showlegend=True,
-                name=f"Normal (≥ {umbral_factor_potencia} y ≤ 1)"
-            ))
-            fig_potencia.add_trace(go.Scatter(
-                x=[None],
-                y=[None],
-                mode='markers',
-                marker=dict(size=10, color='red'),
-                legendgroup="Anormal",
-                showlegend=True,
-                name=f"Anormal (< {umbral_factor_potencia} o > 1)"
-            ))
-            # -------------------------------------
-
-            # Layout general
-            fig_potencia.update_layout(
-                title="Promedio de factor de potencia por Hora",
-                xaxis_title="Hora del Día",
-                yaxis_title="Factor de Potencia",
-                xaxis=dict(
-                    tickmode='array',
-                    tickvals=list(range(24)),
-                    ticktext=etiquetas_horas,
-                    tickangle=45
-                ),
-                yaxis=dict(
-                    range=[0, 1.1],
-                    tick0=0,
-                    dtick=0.05,
-                    showgrid=True,
-                    gridcolor="lightgrey"
-                ),
-                legend=dict(
-                    title="Estado del PF",
-                    orientation="h",
-                    yanchor="bottom",
-                    y=1.02,
-                    xanchor="right",
-                    x=1
-                ),
-                height=600,
-                template="simple_white",
-                margin=dict(l=40, r=40, t=80, b=40)
-            )
-
             # Mostrar en Streamlit
             st.plotly_chart(fig_potencia, use_container_width=True)
 
@@ -572,7 +328,7 @@ with st.container():
     
         with indicador_col:
             # Valor dinámico del gauge
-            valor_actual = df_potencia['PF_sum_AVG'].mean().round(3)
+            valor_actual = round(promedio_dia["PF_sum_AVG"], 3)
 
             # Interpretación del valor
             if umbral_factor_potencia <= valor_actual <= 1.0:
@@ -636,5 +392,286 @@ with st.container():
     else:
         st.warning("⚠️ No hay datos cargados. Ve a la página de inicio y sube un archivo CSV.") 
 
+# Separador
+st.markdown("---")
+
+### 🔌 Sección de Energía y Demanda
+with st.container():
+    st.subheader("Energía y demanda")
+    if "df" in st.session_state and st.session_state.df is not None and alarmas_configuradas is True:
+        # Se integra todo el conjunto una sola vez; cada día se toma del resultado guardado
+        try:
+            energia = obtener_derivado(
+                st.session_state.get("huella_datos"), ("energia", VENTANA_DEMANDA_MINUTOS),
+                lambda: calcular_energia(df)
+            )
+        except ValueError as error:
+            st.warning(f"⚠️ {error}")
+            energia = None
+
+        if energia is not None:
+            st.write(f"Energía integrada por hora (trapecios sin cruzar huecos) y demanda de {VENTANA_DEMANDA_MINUTOS} minutos. Potencia obtenida de: {energia['fuente']}.")
+
+            energia_horas, fila_dia = energia_del_dia(energia, fecha_seleccionada)
+            mascara_dia = (df["Date"] == fecha_seleccionada).to_numpy()
+            columna_pico = f"Demanda máxima {VENTANA_DEMANDA_MINUTOS} min (kW)"
+
+            col_energia, col_pico, col_hora_pico, col_cobertura = st.columns(4)
+            col_energia.metric("Energía del día", f"{fila_dia['Energía (kWh)']:,.2f} kWh")
+            col_pico.metric(f"Demanda máxima {VENTANA_DEMANDA_MINUTOS} min", f"{fila_dia[columna_pico]:,.2f} kW" if pd.notna(fila_dia[columna_pico]) else "—")
+            col_hora_pico.metric("Fin de la ventana pico", fila_dia["Hora demanda máxima"] or "—")
+            col_cobertura.metric("Cobertura del día", f"{fila_dia['Cobertura (%)']:.1f} %")
+
+            energia_col, demanda_col = st.columns([1, 1])
+
+            with energia_col:
+                # Energía por hora del día seleccionado, con la misma especificación que el reporte
+                st.plotly_chart(a_plotly(spec_energia_horaria(energia_horas)), use_container_width=True)
+
+            with demanda_col:
+                # Demanda móvil del día con la ventana pico marcada
+                df_demanda = df.loc[mascara_dia, ["Datetime"]].assign(Demanda=energia["demanda"][mascara_dia])
+                fig_demanda = go.Figure(go.Scatter(
+                    x=df_demanda["Datetime"],
+                    y=df_demanda["Demanda"],
+                    mode='lines',
+                    name=f"Demanda {VENTANA_DEMANDA_MINUTOS} min",
+                    line=dict(color="darkorange", width=2)
+                ))
+                if fila_dia["Hora demanda máxima"]:
+                    fig_demanda.add_trace(go.Scatter(
+                        x=[pd.to_datetime(f"{fecha_seleccionada} {fila_dia['Hora demanda máxima']}", format="%d/%m/%Y %H:%M:%S")],
+                        y=[fila_dia[columna_pico]],
+                        mode='markers',
+                        name="Demanda máxima",
+                        marker=dict(color="red", size=12, symbol="star")
+                    ))
+                fig_demanda.update_layout(
+                    title=f"Demanda móvil de {VENTANA_DEMANDA_MINUTOS} minutos",
+                    xaxis_title="Hora",
+                    yaxis_title="Demanda (kW)",
+                    xaxis=dict(tickformat="%H:%M", showgrid=True, gridcolor="lightgrey"),
+                    yaxis=dict(showgrid=True, gridcolor="lightgrey"),
+                    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+                    height=500,
+                    template="simple_white",
+                    margin=dict(l=40, r=40, t=80, b=40)
+                )
+                st.plotly_chart(fig_demanda, use_container_width=True)
+
+            st.write("📅 Energía y demanda máxima de todos los días:")
+            st.dataframe(energia["dias"], hide_index=True, use_container_width=True)
+
+    elif alarmas_configuradas is False:
+        st.warning("⚠️ No hay configuración de alarmas guardada. Configúrala primero.")
+
+    else:
+        st.warning("⚠️ No hay datos cargados. Ve a la página de inicio y sube un archivo CSV.")
+
+# Separador
+st.markdown("---")
+
+### 📋 Sección de Resumen de Alarmas por Día
+with st.container():
+    st.subheader("Resumen de alarmas por día")
+    if "df" in st.session_state and st.session_state.df is not None and alarmas_configuradas is True:
+        st.write("Alarmas de todos los días evaluadas con la configuración actual a partir de resúmenes e histogramas diarios precalculados.")
+
+        # Los resúmenes y los histogramas se calculan una vez por conjunto de datos; cambiar la configuración solo reevalúa O(días × bins)
+        resumen_diario = obtener_derivado(
+            st.session_state.get("huella_datos"), "resumen_diario", lambda: construir_resumen_diario(df)
+        )
+        df_alarmas_diarias = evaluar_alarmas_diarias(
+            resumen_diario, histogramas_compartidos(st.session_state.get("huella_datos"), df), config
+        )
+
+        styled_df_alarmas = df_alarmas_diarias.style.map(
+            lambda x: "background-color: #FF6347" if x == "Crítico" else ("background-color: #FFD700" if x == "Moderado" else ""),
+            subset=["Estado desbalance V", "Estado desbalance I"]
+        )
+        st.dataframe(styled_df_alarmas, hide_index=True, use_container_width=True)
+
+    elif alarmas_configuradas is False:
+        st.warning("⚠️ No hay configuración de alarmas guardada. Configúrala primero.")
+
+    else:
+        st.warning("⚠️ No hay datos cargados. Ve a la página de inicio y sube un archivo CSV.")
+
+# Separador
+st.markdown("---")
+
+### 🧮 Sección de Reglas Personalizadas
+with st.container():
+    st.subheader("Eventos de las reglas personalizadas")
+    if "df" in st.session_state and st.session_state.df is not None and alarmas_configuradas is True:
+        if config.get("reglas"):
+            st.write("Eventos de todo el conjunto de datos; las reglas se compilan una vez y se evalúan sobre las columnas completas.")
+
+            eventos_reglas, resumen_reglas = eventos_compartidos(st.session_state.get("huella_datos"), df, config["reglas"], config)
+            st.dataframe(resumen_reglas, hide_index=True, use_container_width=True)
+
+            solo_dia = st.checkbox("Mostrar solo los eventos que empiezan en el día seleccionado", value=True)
+            if solo_dia:
+                eventos_reglas = eventos_reglas[(eventos_reglas["Inicio"] >= inicio_dia) & (eventos_reglas["Inicio"] < fin_dia)]
+            st.dataframe(eventos_reglas, hide_index=True, use_container_width=True)
+        else:
+            st.info("ℹ️ No hay reglas personalizadas. Agréguelas en la página de Configuración.")
+
+    elif alarmas_configuradas is False:
+        st.warning("⚠️ No hay configuración de alarmas guardada. Configúrala primero.")
+
+    else:
+        st.warning("⚠️ No hay datos cargados. Ve a la página de inicio y sube un archivo CSV.")
+
+# Separador
+st.markdown("---")
+
+### 🗓️ Sección de Mapa de Calor
+with st.container():
+    st.subheader("Mapa de calor día × hora")
+    if "df" in st.session_state and st.session_state.df is not None and alarmas_configuradas is True:
+        st.write("Promedio horario de cada día del conjunto de datos, útil para encontrar horas críticas recurrentes.")
+
+        # Variables disponibles para el mapa de calor
+        variables_mapa = {
+            "Factor de potencia": "PF_sum_AVG",
+            "Voltaje U1": "U1_rms_AVG",
+            "Voltaje U2": "U2_rms_AVG",
+            "Voltaje U3": "U3_rms_AVG",
+            "Corriente I1": "I1_rms_AVG",
+            "Corriente I2": "I2_rms_AVG",
+            "Corriente I3": "I3_rms_AVG",
+        }
+
+        variable_mapa = st.selectbox("Variable a visualizar:", options=list(variables_mapa.keys()))
+
+        # Un solo pivote vectorizado para todas las variables, compartido con las gráficas del día y el reporte
+        dias_mapa, matrices_mapa = pivote_horario(st.session_state.get("huella_datos"), df)
+        matriz_mapa = matrices_mapa[COLUMNAS_HORARIAS.index(variables_mapa[variable_mapa])]
+
+        if variable_mapa == "Factor de potencia":
+            fig_mapa = figura_mapa_calor(matriz_mapa, dias_mapa, "Factor de potencia promedio por hora", "PF",
+                                         escala_colores="RdYlGn", zmin=umbral_factor_potencia - 0.1, zmax=1.0)
+        elif variable_mapa.startswith("Voltaje"):
+            fig_mapa = figura_mapa_calor(matriz_mapa, dias_mapa, f"{variable_mapa} promedio por hora", "V",
+                                         escala_colores="RdBu_r", zmid=valor_nominal_voltaje)
+        else:
+            fig_mapa = figura_mapa_calor(matriz_mapa, dias_mapa, f"{variable_mapa} promedio por hora", "A")
+
+        st.plotly_chart(fig_mapa, use_container_width=True)
+
+    elif alarmas_configuradas is False:
+        st.warning("⚠️ No hay configuración de alarmas guardada. Configúrala primero.")
+
+    else:
+        st.warning("⚠️ No hay datos cargados. Ve a la página de inicio y sube un archivo CSV.")
+
+# Separador
+st.markdown("---")
+
+### 📊 Sección de Distribución y Curva de Duración
+with st.container():
+    st.subheader("Distribución y curva de duración")
+    if "df" in st.session_state and st.session_state.df is not None and alarmas_configuradas is True:
+        st.write("Porcentaje del tiempo en cada valor y tiempo durante el que se iguala o supera cada valor en el rango elegido.")
+
+        # Histogramas por día construidos en la carga: cualquier rango se obtiene sumando días
+        histogramas = histogramas_compartidos(st.session_state.get("huella_datos"), df)
+
+        variables_distribucion = {
+            "Voltaje U1": ("U1_rms_AVG", "V"),
+            "Voltaje U2": ("U2_rms_AVG", "V"),
+            "Voltaje U3": ("U3_rms_AVG", "V"),
+            "Corriente I1": ("I1_rms_AVG", "A"),
+            "Corriente I2": ("I2_rms_AVG", "A"),
+            "Corriente I3": ("I3_rms_AVG", "A"),
+            "Desbalance de voltaje": ("Uunb_AVG", "%"),
+            "Desbalance de corriente": ("Iunb_AVG", "%"),
+            "Factor de potencia": ("PF_sum_AVG", "PF"),
+        }
+        variables_distribucion = {nombre: valor for nombre, valor in variables_distribucion.items()
+                                  if valor[0] in histogramas["canales"]}
+
+        variable_col, rango_col = st.columns(2)
+        with variable_col:
+            variable_distribucion = st.selectbox("Variable:", options=list(variables_distribucion.keys()))
+        with rango_col:
+            primer_dia, ultimo_dia = histogramas["dias"][0].date(), histogramas["dias"][-1].date()
+            rango_distribucion = st.date_input("Rango de días:", value=(primer_dia, ultimo_dia),
+                                               min_value=primer_dia, max_value=ultimo_dia)
+
+        # Mientras se elige el rango, date_input devuelve solo el primer día
+        if len(rango_distribucion) == 2:
+            desde_distribucion, hasta_distribucion = rango_distribucion
+        else:
+            desde_distribucion = hasta_distribucion = rango_distribucion[0]
+
+        canal_distribucion, unidad_distribucion = variables_distribucion[variable_distribucion]
+        limites_canal = limites_configuracion(canal_distribucion, config)
+
+        # Tiempo fuera de cada límite configurado
+        columnas_limites = st.columns(max(len(limites_canal), 1))
+        for columna_limite, (nombre_limite, valor_limite, sobre_limite) in zip(columnas_limites, limites_canal):
+            fuera = tiempo_fuera_de_limite(histogramas, canal_distribucion, valor_limite, sobre_limite,
+                                           desde_distribucion, hasta_distribucion)
+            with columna_limite:
+                st.metric(
+                    f"{nombre_limite} ({'>' if sobre_limite else '<'} {valor_limite} {unidad_distribucion})",
+                    f"{fuera['porcentaje']:.2f} % del tiempo",
+                    f"{fuera['horas']:.1f} h en {fuera['dias']} días",
+                    delta_color="off"
+                )
+
+        colores_limites = ["red", "purple"]
+        lineas_limites = [(valor, nombre, colores_limites[i % len(colores_limites)])
+                          for i, (nombre, valor, _) in enumerate(limites_canal)]
+
+        bordes, conteos = histograma_rango(histogramas, canal_distribucion, desde_distribucion, hasta_distribucion)
+        porcentaje_tiempo, valores_duracion = curva_duracion(histogramas, canal_distribucion, desde_distribucion, hasta_distribucion)
+
+        histograma_col, duracion_col = st.columns(2)
+        with histograma_col:
+            st.plotly_chart(figura_histograma(bordes, conteos, f"Distribución de {variable_distribucion}",
+                                              unidad_distribucion, lineas_limites), use_container_width=True)
+        with duracion_col:
+            st.plotly_chart(figura_curva_duracion(porcentaje_tiempo, valores_duracion, f"Curva de duración de {variable_distribucion}",
+                                                  unidad_distribucion, lineas_limites), use_container_width=True)
+
+    elif alarmas_configuradas is False:
+        st.warning("⚠️ No hay configuración de alarmas guardada. Configúrala primero.")
+
+    else:
+        st.warning("⚠️ No hay datos cargados. Ve a la página de inicio y sube un archivo CSV.")
+
+# Separador
+st.markdown("---")
+
+### ✅ Sección de Cumplimiento
+with st.container():
+    st.subheader("Cumplimiento semanal de voltaje (EN 50160)")
+    if "df" in st.session_state and st.session_state.df is not None and alarmas_configuradas is True:
+        if valor_nominal_voltaje > 0:
+            st.write("Por semana y fase: al menos 95% de los promedios de 10 minutos dentro de ±10% del valor nominal y todos dentro de -15%/+10%.")
+
+            # Evaluación sobre todo el conjunto de datos, no solo el día seleccionado
+            df_cumplimiento = obtener_derivado(
+                st.session_state.get("huella_datos"), ("cumplimiento", valor_nominal_voltaje),
+                lambda: evaluar_cumplimiento_semanal(df, valor_nominal_voltaje)
+            )
+
+            styled_df_cumplimiento = df_cumplimiento.style.map(
+                lambda x: "background-color: #FF6347" if x == "No" else "background-color: #90EE90",
+                subset=["Cumple"]
+            )
+            st.dataframe(styled_df_cumplimiento, hide_index=True, use_container_width=True)
+        else:
+            st.warning("⚠️ Defina un valor nominal de voltaje mayor que cero para evaluar el cumplimiento.")
+
+    elif alarmas_configuradas is False:
+        st.warning("⚠️ No hay configuración de alarmas guardada. Configúrala primero.")
+
+    else:
+        st.warning("⚠️ No hay datos cargados. Ve a la página de inicio y sube un archivo CSV.")
+
 # Separador final
 st.markdown("---")
\ No newline at end of file
@@ -0,0 +1,158 @@
+import streamlit as st
+import plotly.graph_objects as go
+import time
+
+from utils.cache_datos import obtener_derivado
+from utils.pronostico import COLUMNAS_PRONOSTICO, pronosticar
+
+# Set page config
+st.set_page_config(page_title="Predicciones", layout="wide", page_icon="🔮")
+
+st.title("🔮 Predicciones de carga")
+st.write("Pronóstico de las próximas 24 horas para la corriente por fase y el factor de potencia a partir de los promedios horarios.")
+
+# Colores personalizados para cada serie
+colores = {
+    "I1_rms_AVG": "blue",
+    "I2_rms_AVG": "red",
+    "I3_rms_AVG": "green",
+    "PF_sum_AVG": "black",
+}
+
+
+def figura_pronostico(resultado, columnas, modelo, dias_historia, titulo, yaxis_title, umbral=None, nombre_umbral=""):
+    """Grafica la historia reciente y el pronóstico de las próximas 24 horas al estilo de fig_corriente."""
+    horas = resultado["horas"]
+    desde = max(len(horas) - dias_historia * 24, 0)
+
+    fig = go.Figure()
+
+    for columna in columnas:
+        indice = resultado["columnas"].index(columna)
+        nombre = columna.replace("_rms_AVG", "").replace("_sum_AVG", "")
+
+        # Historia (promedios horarios)
+        fig.add_trace(go.Scatter(
+            x=horas[desde:],
+            y=resultado["series"][indice, desde:],
+            mode='lines',
+            name=nombre,
+            line=dict(color=colores.get(columna, 'black'), width=2)
+        ))
+
+        # Pronóstico desde la hora siguiente a la última observada
+        fig.add_trace(go.Scatter(
+            x=resultado["horas_pronostico"],
+            y=resultado["modelos"][modelo][indice],
+            mode='lines',
+            name=f"{nombre} pronóstico",
+            line=dict(color=colores.get(columna, 'black'), width=2, dash="dash")
+        ))
+
+    # Inicio del pronóstico
+    fig.add_vline(x=resultado["horas_pronostico"][0], line=dict(color="grey", width=2, dash="dot"))
+
+    if umbral is not None:
+        fig.update_layout(
+            shapes=[
+                dict(type="line", xref="paper", x0=0, x1=1, yref="y", y0=umbral, y1=umbral,
+                     line=dict(color="grey", width=4, dash="dash"))
+            ],
+            annotations=[
+                dict(
+                    x=1.005, y=umbral,
+                    xref='paper', yref='y',
+                    text=nombre_umbral,
+                    showarrow=False,
+                    font=dict(color="grey", size=12),
+                    xanchor='left'
+                )
+            ]
+        )
+
+    fig.update_layout(
+        title=titulo,
+        xaxis_title="Fecha y Hora",
+        yaxis_title=yaxis_title,
+        xaxis=dict(
+            tickformat="%d/%m %H:%M",
+            tickmode="auto",
+            nticks=24,
+            showgrid=True,
+            gridcolor="lightgrey",
+            tickangle=45
+        ),
+        yaxis=dict(
+            showgrid=True,
+            gridcolor="lightgrey"
+        ),
+        legend=dict(
+            title="Medidas",
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        ),
+        margin=dict(l=40, r=120, t=80, b=40),
+        height=600,
+        template="simple_white"
+    )
+
+    return fig
+
+
+if "df" in st.session_state and st.session_state.df is not None:
+    df = st.session_state.df
+    config = st.session_state.get("configuracion_alarmas", {})
+
+    modelo_col, historia_col = st.columns([1, 1])
+    with modelo_col:
+        modelo = st.radio("Modelo de pronóstico", options=["Holt-Winters", "Estacional ingenuo"], horizontal=True)
+    with historia_col:
+        dias_historia = st.slider("Días de historia a mostrar", min_value=1, max_value=14, value=3)
+
+    # Los modelos se ajustan en lote y se guardan por huella del conjunto de datos
+    inicio = time.perf_counter()
+    try:
+        resultado = obtener_derivado(
+            st.session_state.get("huella_datos"), ("pronostico", tuple(COLUMNAS_PRONOSTICO)),
+            lambda: pronosticar(df)
+        )
+    except ValueError as error:
+        st.warning(f"⚠️ {error}")
+        st.stop()
+    duracion = time.perf_counter() - inicio
+
+    st.caption(f"Modelos obtenidos en {duracion * 1000:.0f} ms para {len(resultado['horas'])} horas de historia.")
+
+    st.markdown("---")
+
+    ### ⚡ Sección de Corrientes
+    st.subheader("Corriente")
+    fig_pronostico_corriente = figura_pronostico(
+        resultado, ["I1_rms_AVG", "I2_rms_AVG", "I3_rms_AVG"], modelo, dias_historia,
+        "Pronóstico de corriente promedio", "Corriente (A)",
+        umbral=config.get("umbral_corriente"), nombre_umbral="Corriente Nominal"
+    )
+    st.plotly_chart(fig_pronostico_corriente, use_container_width=True)
+
+    st.markdown("---")
+
+    ### 🔥 Sección de Potencia
+    st.subheader("Factor de potencia")
+    fig_pronostico_potencia = figura_pronostico(
+        resultado, ["PF_sum_AVG"], modelo, dias_historia,
+        "Pronóstico del factor de potencia", "Factor de Potencia",
+        umbral=config.get("umbral_factor_potencia"), nombre_umbral="Umbral PF"
+    )
+    st.plotly_chart(fig_pronostico_potencia, use_container_width=True)
+
+    st.markdown("---")
+
+    st.subheader("Error de ajuste de los modelos")
+    st.write("Error medio absoluto de cada modelo al pronosticar las últimas 24 horas de la historia con los datos anteriores a ellas, el mismo horizonte del pronóstico.")
+    st.dataframe(resultado["errores"], hide_index=True)
+
+else:
+    st.warning("⚠️ No hay datos cargados. Ve a la página de inicio y sube un archivo CSV.")
@@ -0,0 +1,143 @@
+import streamlit as st
+import time
+from datetime import timedelta
+
+from utils.comparacion import (COLUMNAS_COMPARACION, INTERVALOS_PERFIL, MODOS_ALINEACION, alinear_perfiles,
+                               etiquetas_desfase, perfil_tipico, resumen_diferencias, tabla_diferencias)
+from utils.historico import cargar_rango_compartido, listar_medidores, rango_crudo
+from utils.indice_acumulado import indice_compartido
+from utils.ingesta import cargar_mediciones_compartidas
+from utils.plots import figura_perfiles_comparados
+from utils.tareas import enviar_tarea, obtener_tarea
+
+# Set page config
+st.set_page_config(page_title="Comparación", layout="wide", page_icon="⚖️")
+
+st.title("⚖️ Comparación de campañas de medición")
+st.write("Compare dos campañas (por ejemplo, antes y después de instalar un banco de condensadores) alineadas por hora del día o por día de la semana.")
+
+
+def seleccionar_campana(nombre, clave):
+    """Elige el origen de una campaña y lanza su carga en segundo plano; devuelve (huella, df) o None."""
+    st.subheader(nombre)
+    origenes = ["Datos cargados en Inicio", "Archivo CSV", "Histórico"]
+    origen = st.radio("Origen", origenes, key=f"origen_{clave}", horizontal=True)
+
+    if origen == "Datos cargados en Inicio":
+        if "df" in st.session_state and st.session_state.df is not None:
+            return st.session_state.get("huella_datos"), st.session_state.df
+        st.warning("⚠️ No hay datos cargados. Ve a la página de inicio y sube un archivo CSV.")
+        return None
+
+    if origen == "Archivo CSV":
+        archivo = st.file_uploader("Archivo CSV de la campaña", type=["csv"], key=f"archivo_{clave}")
+        if archivo is not None and st.session_state.get(f"archivo_comparacion_{clave}") != archivo.file_id:
+            # Misma carga compartida que en Inicio: si otra sesión ya leyó el archivo se reutiliza
+            st.session_state[f"archivo_comparacion_{clave}"] = archivo.file_id
+            st.session_state[f"tarea_comparacion_{clave}"] = enviar_tarea(
+                cargar_mediciones_compartidas, archivo.getvalue(), descripcion=f"Comparación: {archivo.name}"
+            )
+        if archivo is None:
+            return None
+
+    else:
+        medidores = listar_medidores()
+        if not medidores:
+            st.info("ℹ️ El histórico está vacío.")
+            return None
+        medidor = st.selectbox("Medidor", medidores, key=f"medidor_{clave}")
+        # Solo los días que conservan muestras crudas
+        primero, ultimo = rango_crudo(medidor)
+        rango = st.date_input(
+            "Rango de fechas",
+            value=(max(primero.date(), (ultimo - timedelta(days=6)).date()), ultimo.date()),
+            min_value=primero.date(), max_value=ultimo.date(), format="DD/MM/YYYY", key=f"rango_{clave}"
+        )
+        if st.button("📥 Cargar rango", key=f"cargar_{clave}", disabled=len(rango) != 2):
+            st.session_state[f"tarea_comparacion_{clave}"] = enviar_tarea(
+                cargar_rango_compartido, medidor, rango[0], rango[1] + timedelta(days=1),
+                descripcion=f"Comparación: {medidor}"
+            )
+
+    tarea = obtener_tarea(st.session_state.get(f"tarea_comparacion_{clave}"))
+    if tarea is not None and tarea.activa:
+        st.progress(tarea.progreso, text=f"⏳ {tarea.mensaje}")
+        return None
+    if tarea is not None and tarea.estado == "fallida":
+        st.error(f"❌ No fue posible cargar la campaña: {tarea.mensaje}")
+        del st.session_state[f"tarea_comparacion_{clave}"]
+        return None
+    if tarea is not None:
+        st.session_state[f"comparacion_{clave}"] = tarea.resultado
+        del st.session_state[f"tarea_comparacion_{clave}"]
+
+    return st.session_state.get(f"comparacion_{clave}")
+
+
+# --------- Selección de las campañas ----------
+antes_col, despues_col = st.columns(2)
+with antes_col:
+    campana_antes = seleccionar_campana("📘 Antes", "antes")
+with despues_col:
+    campana_despues = seleccionar_campana("📗 Después", "despues")
+
+# Mientras alguna campaña se carga, la página se vuelve a ejecutar para mostrar el avance
+if any(obtener_tarea(st.session_state.get(f"tarea_comparacion_{clave}")) is not None for clave in ("antes", "despues")):
+    time.sleep(0.5)
+    st.rerun()
+
+for campana, nombre in ((campana_antes, "Antes"), (campana_despues, "Después")):
+    if campana is not None:
+        df_campana = campana[1]
+        st.caption(f"{nombre}: {len(df_campana):,} filas del {df_campana['Date'].iloc[0]} al {df_campana['Date'].iloc[-1]}")
+
+# Separador visual
+st.markdown("---")
+
+### 📈 Sección de Perfiles Comparados
+with st.container():
+    st.subheader("Perfiles típicos y diferencias")
+    if campana_antes is not None and campana_despues is not None:
+        modo_col, intervalo_col = st.columns(2)
+        with modo_col:
+            modo = st.selectbox("Alinear por:", options=list(MODOS_ALINEACION.keys()))
+        with intervalo_col:
+            nombre_intervalo = st.selectbox("Intervalo del perfil:", options=list(INTERVALOS_PERFIL.keys()), index=1)
+        intervalo = INTERVALOS_PERFIL[nombre_intervalo]
+
+        # Los perfiles salen del índice de sumas acumuladas de cada campaña, construido en la carga
+        perfil_antes = perfil_tipico(indice_compartido(*campana_antes), modo, intervalo)
+        perfil_despues = perfil_tipico(indice_compartido(*campana_despues), modo, intervalo)
+        alineado = alinear_perfiles(perfil_antes, perfil_despues, intervalo)
+
+        st.write("Diferencias promedio (después − antes) en los intervalos presentes en ambas campañas:")
+        st.dataframe(resumen_diferencias(alineado, modo), hide_index=True, use_container_width=True)
+
+        variables_perfil = {
+            "Voltaje U1": ("U1_rms_AVG", "V"),
+            "Voltaje U2": ("U2_rms_AVG", "V"),
+            "Voltaje U3": ("U3_rms_AVG", "V"),
+            "Desbalance de voltaje": ("Uunb_AVG", "%"),
+            "Desbalance de corriente": ("Iunb_AVG", "%"),
+            "Factor de potencia": ("PF_sum_AVG", "PF"),
+        }
+        variables_perfil = {nombre: valor for nombre, valor in variables_perfil.items()
+                            if f"{valor[0]} antes" in alineado and f"{valor[0]} después" in alineado}
+
+        variable_perfil = st.selectbox("Variable a comparar:", options=list(variables_perfil.keys()))
+        columna_perfil, unidad_perfil = variables_perfil[variable_perfil]
+        fig_perfil = figura_perfiles_comparados(
+            etiquetas_desfase(alineado["Desfase_s"], modo),
+            alineado[f"{columna_perfil} antes"], alineado[f"{columna_perfil} después"],
+            f"Perfil típico de {variable_perfil} por {modo.lower()}", unidad_perfil
+        )
+        st.plotly_chart(fig_perfil, use_container_width=True)
+
+        with st.expander("📋 Diferencias por intervalo"):
+            st.dataframe(tabla_diferencias(alineado, modo, COLUMNAS_COMPARACION), hide_index=True, use_container_width=True)
+
+    else:
+        st.warning("⚠️ Cargue las dos campañas para compararlas.")
+
+# Separador final
+st.markdown("---")
@@ -0,0 +1,71 @@
+import streamlit as st
+
+from utils.calendario import agregar_alarmas, resumen_calendario_compartido
+from utils.histogramas import histogramas_compartidos
+from utils.plots import figura_calendario
+
+# Set page config
+st.set_page_config(page_title="Calendario", layout="wide", page_icon="🗓️")
+
+st.title("🗓️ Calendario del conjunto de datos")
+st.write("Resumen de cada día para encontrar los días interesantes. Haga clic en un día para abrirlo en el Dashboard.")
+
+
+def abrir_en_dashboard(dia):
+    """Abre el Dashboard con el día preseleccionado."""
+    st.session_state["dia_dashboard"] = dia
+    st.switch_page("pages/3_Dashboard.py")
+
+
+if "df" in st.session_state and st.session_state.df is not None:
+    df = st.session_state.df
+    huella = st.session_state.get("huella_datos")
+
+    # Tabla por día construida en la carga; las alarmas se recuentan desde los histogramas diarios
+    resumen = resumen_calendario_compartido(huella, df)
+    config = st.session_state.get("configuracion_alarmas")
+    if config is not None:
+        resumen = agregar_alarmas(resumen, histogramas_compartidos(huella, df), config)
+    else:
+        st.warning("⚠️ No hay configuración de alarmas guardada. El calendario no incluye alarmas ni estado del desbalance.")
+
+    # Variables disponibles para colorear el calendario
+    variables_calendario = {
+        "Cobertura": ("Cobertura (%)", "%", "RdYlGn", 0, 100),
+        "Voltaje mínimo": ("V mín (V)", "V", "RdBu", None, None),
+        "Voltaje máximo": ("V máx (V)", "V", "RdBu_r", None, None),
+        "Factor de potencia promedio": ("PF promedio", "PF", "RdYlGn", None, 1.0),
+        "Desbalance de voltaje": ("Desbalance V (%)", "%", "YlOrRd", 0, None),
+        "Desbalance de corriente": ("Desbalance I (%)", "%", "YlOrRd", 0, None),
+    }
+    if "Alarmas" in resumen:
+        variables_calendario = {"Alarmas activas": ("Alarmas", "alarmas", "YlOrRd", 0, 6), **variables_calendario}
+
+    variable_calendario = st.selectbox("Colorear por:", options=list(variables_calendario.keys()))
+    columna, unidad, escala, zmin, zmax = variables_calendario[variable_calendario]
+
+    columnas_hover = [nombre for nombre in ("Cobertura (%)", "V mín (V)", "V máx (V)", "PF promedio",
+                                            "Desbalance V (%)", "Desbalance I (%)", "Alarmas") if nombre in resumen]
+    textos = resumen["Día"].to_numpy(dtype=object)
+    for nombre in columnas_hover:
+        textos = textos + f"<br>{nombre}: " + resumen[nombre].astype(str).to_numpy(dtype=object)
+
+    fig_calendario = figura_calendario(resumen["Fecha"], resumen[columna], resumen["Día"], textos,
+                                       f"{variable_calendario} por día", unidad, escala, zmin, zmax)
+    evento = st.plotly_chart(fig_calendario, use_container_width=True, on_select="rerun",
+                             selection_mode="points", key="calendario")
+    if evento.selection.points:
+        abrir_en_dashboard(evento.selection.points[0]["customdata"][0])
+
+    # Separador visual
+    st.markdown("---")
+
+    st.subheader("📋 Resumen por día")
+    st.write("Seleccione una fila para abrir ese día en el Dashboard.")
+    seleccion = st.dataframe(resumen.drop(columns=["Fecha"]), hide_index=True, use_container_width=True,
+                             on_select="rerun", selection_mode="single-row", key="tabla_calendario")
+    if seleccion.selection.rows:
+        abrir_en_dashboard(resumen["Día"].iloc[seleccion.selection.rows[0]])
+
+else:
+    st.warning("⚠️ No hay datos cargados. Ve a la página de inicio y sube un archivo CSV.")
@@ -0,0 +1,72 @@
+import streamlit as st
+import plotly.colors
+
+from utils.dias_tipicos import RESOLUCIONES_PERFIL, dias_tipicos_compartidos
+from utils.plots import figura_calendario, figura_centroides
+
+# Set page config
+st.set_page_config(page_title="Días típicos", layout="wide", page_icon="🧩")
+
+st.title("🧩 Días típicos")
+st.write("Agrupa los días del conjunto según su perfil de corriente total y factor de potencia para obtener perfiles de referencia (día laboral, fin de semana, parada, ...).")
+
+if "df" in st.session_state and st.session_state.df is not None:
+    df = st.session_state.df
+
+    resolucion_col, grupos_col = st.columns(2)
+    with resolucion_col:
+        nombre_resolucion = st.selectbox("Resolución del perfil:", options=list(RESOLUCIONES_PERFIL.keys()))
+    with grupos_col:
+        numero_grupos = st.slider("Número de grupos", min_value=2, max_value=8, value=3)
+    intervalo = RESOLUCIONES_PERFIL[nombre_resolucion]
+
+    # Perfiles desde el índice de sumas acumuladas y k-means vectorizado; se guarda por resolución y k
+    agrupamiento = dias_tipicos_compartidos(st.session_state.get("huella_datos"), df, intervalo, numero_grupos)
+
+    if agrupamiento is None:
+        st.warning("⚠️ No hay días con cobertura suficiente para agrupar.")
+    else:
+        nombres = agrupamiento["nombres"]
+        colores = plotly.colors.qualitative.Plotly
+        colores_grupos = [colores[grupo % len(colores)] for grupo in range(len(nombres))]
+
+        st.subheader("📋 Resumen de los grupos")
+        st.dataframe(agrupamiento["resumen"], hide_index=True, use_container_width=True)
+
+        # Centroides en unidades originales
+        por_dia = agrupamiento["centroides_corriente"].shape[1]
+        etiquetas_horas = [f"{(minuto // 60):02d}:{(minuto % 60):02d}" for minuto in range(0, 24 * 60, 24 * 60 // por_dia)]
+        corriente_col, pf_col = st.columns(2)
+        with corriente_col:
+            st.plotly_chart(figura_centroides(etiquetas_horas, agrupamiento["centroides_corriente"], nombres,
+                                              "Perfil típico de corriente total", "A", colores_grupos), use_container_width=True)
+        with pf_col:
+            st.plotly_chart(figura_centroides(etiquetas_horas, agrupamiento["centroides_pf"], nombres,
+                                              "Perfil típico del factor de potencia", "PF", colores_grupos), use_container_width=True)
+
+        # Pertenencia en el calendario, con una escala discreta de un color por grupo
+        st.subheader("🗓️ Pertenencia de los días")
+        st.write("Haga clic en un día para abrirlo en el Dashboard.")
+        pertenencia = agrupamiento["pertenencia"]
+        k = len(nombres)
+        escala_grupos = []
+        for grupo, color in enumerate(colores_grupos):
+            escala_grupos += [(grupo / k, color), ((grupo + 1) / k, color)]
+
+        fig_pertenencia = figura_calendario(
+            pertenencia["Fecha"], pertenencia["Número de grupo"], pertenencia["Día"],
+            pertenencia["Día"] + "<br>" + pertenencia["Grupo"], "Grupo de cada día", "Grupo",
+            escala_grupos, -0.5, k - 0.5
+        )
+        fig_pertenencia.update_traces(marker_colorbar=dict(tickvals=list(range(k)), ticktext=nombres))
+        evento = st.plotly_chart(fig_pertenencia, use_container_width=True, on_select="rerun",
+                                 selection_mode="points", key="calendario_grupos")
+        if evento.selection.points:
+            st.session_state["dia_dashboard"] = evento.selection.points[0]["customdata"][0]
+            st.switch_page("pages/3_Dashboard.py")
+
+        with st.expander("📅 Grupo de cada día"):
+            st.dataframe(pertenencia.drop(columns=["Fecha", "Número de grupo"]), hide_index=True, use_container_width=True)
+
+else:
+    st.warning("⚠️ No hay datos cargados. Ve a la página de inicio y sube un archivo CSV.")
@@ -0,0 +1,163 @@
+import streamlit as st
+import time
+
+from utils.ingesta import cargar_mediciones_compartidas
+from utils.plots import figura_en_vivo
+from utils.reproduccion import alarmas_activas, avanzar, en_curso, iniciar_reproduccion, pausar, reanudar, terminada
+from utils.tareas import enviar_tarea, obtener_tarea
+
+# Set page config
+st.set_page_config(page_title="Reproducción", layout="wide", page_icon="⏯️")
+
+st.title("⏯️ Reproducción en tiempo real")
+st.write("Reproduce un conjunto de mediciones a velocidad acelerada como si llegara del analizador, para demostrar y validar el monitoreo en vivo.")
+
+# Periodo de actualización de los paneles en vivo
+SEGUNDOS_ACTUALIZACION = 1.0
+
+VELOCIDADES = {"x1": 1, "x10": 10, "x60": 60, "x600": 600, "x3600": 3600}
+CAPACIDADES = {"600 muestras": 600, "3 600 muestras": 3600, "14 400 muestras": 14400}
+
+# Paneles en vivo: columnas, colores, unidad y claves de la configuración con sus límites
+PANELES = {
+    "Voltajes": (["U1_rms_AVG", "U2_rms_AVG", "U3_rms_AVG"], ["blue", "red", "green"], "V",
+                 [("limite_superior_v", "red"), ("limite_inferior_v", "orange")]),
+    "Corrientes": (["I1_rms_AVG", "I2_rms_AVG", "I3_rms_AVG"], ["blue", "red", "green"], "A",
+                   [("umbral_corriente", "red")]),
+    "Factor de potencia": (["PF_sum_AVG"], ["black"], "PF", [("umbral_factor_potencia", "red")]),
+}
+
+# --------- Origen de los datos ----------
+origen = st.radio("Origen", ["Datos cargados en Inicio", "Archivo CSV"], horizontal=True)
+datos_reproduccion = None
+
+if origen == "Datos cargados en Inicio":
+    if "df" in st.session_state and st.session_state.df is not None:
+        datos_reproduccion = (st.session_state.get("huella_datos"), st.session_state.df)
+else:
+    archivo = st.file_uploader("Archivo CSV a reproducir", type=["csv"])
+    if archivo is not None and st.session_state.get("archivo_reproduccion") != archivo.file_id:
+        st.session_state["archivo_reproduccion"] = archivo.file_id
+        st.session_state["tarea_reproduccion"] = enviar_tarea(
+            cargar_mediciones_compartidas, archivo.getvalue(), descripcion=f"Reproducción: {archivo.name}"
+        )
+
+    tarea = obtener_tarea(st.session_state.get("tarea_reproduccion"))
+    if tarea is not None and tarea.activa:
+        st.progress(tarea.progreso, text=f"⏳ {tarea.mensaje}")
+        time.sleep(0.5)
+        st.rerun()
+    elif tarea is not None and tarea.estado == "fallida":
+        st.error(f"❌ No fue posible cargar el archivo: {tarea.mensaje}")
+        del st.session_state["tarea_reproduccion"]
+    elif tarea is not None:
+        st.session_state["datos_reproduccion"] = tarea.resultado
+        del st.session_state["tarea_reproduccion"]
+
+    if archivo is not None:
+        datos_reproduccion = st.session_state.get("datos_reproduccion")
+
+config = st.session_state.get("configuracion_alarmas")
+
+if datos_reproduccion is not None and config is not None:
+    huella, df = datos_reproduccion
+
+    velocidad_col, capacidad_col = st.columns(2)
+    with velocidad_col:
+        velocidad = VELOCIDADES[st.selectbox("Velocidad:", options=list(VELOCIDADES.keys()), index=2)]
+    with capacidad_col:
+        capacidad = CAPACIDADES[st.selectbox("Ventana en vivo (buffer circular):", options=list(CAPACIDADES.keys()), index=1)]
+
+    estado = st.session_state.get("reproduccion")
+    # Un cambio de conjunto o de ventana reinicia la reproducción
+    if estado is not None and (estado["df"] is not df or estado["buffer"].capacidad != capacidad):
+        estado = None
+
+    iniciar_col, pausar_col, reiniciar_col = st.columns(3)
+    with iniciar_col:
+        iniciar = st.button("▶️ Iniciar / Reanudar", disabled=estado is not None and (en_curso(estado) or terminada(estado)))
+    with pausar_col:
+        detener = st.button("⏸️ Pausar", disabled=estado is None or not en_curso(estado))
+    with reiniciar_col:
+        reiniciar = st.button("⏹️ Reiniciar", disabled=estado is None)
+
+    if iniciar or detener or reiniciar:
+        if iniciar:
+            estado = estado or iniciar_reproduccion(df, config, capacidad, velocidad)
+            reanudar(estado)
+        elif detener:
+            pausar(estado)
+        else:
+            estado = None
+            st.session_state.pop("figuras_reproduccion", None)
+        # Se vuelve a ejecutar la página para que los botones y el fragmento reflejen el nuevo estado
+        st.session_state["reproduccion"] = estado
+        st.rerun()
+
+    # La velocidad se cambia sin saltos: se fija el instante alcanzado y se reanuda con la nueva
+    if estado is not None and estado["velocidad"] != velocidad:
+        corriendo = en_curso(estado)
+        pausar(estado)
+        estado["velocidad"] = velocidad
+        if corriendo:
+            reanudar(estado)
+
+    # Valores de los límites dibujados; si la configuración cambia, las figuras se vuelven a crear
+    limites_paneles = {nombre: tuple(config[clave] for clave, _ in limites) for nombre, (_, _, _, limites) in PANELES.items()}
+    if estado is None:
+        st.session_state.pop("figuras_reproduccion", None)
+    elif st.session_state.get("figuras_reproduccion", (None, None))[0] != limites_paneles:
+        # Las figuras se crean una vez por reproducción; cada actualización solo reemplaza los datos de las trazas
+        st.session_state["figuras_reproduccion"] = (limites_paneles, {
+            nombre: figura_en_vivo(nombre, [columna.replace("_rms_AVG", "").replace("_sum_AVG", "") for columna in columnas],
+                                   colores, unidad, [(config[clave], color) for clave, color in limites])
+            for nombre, (columnas, colores, unidad, limites) in PANELES.items()
+        })
+    st.session_state["reproduccion"] = estado
+
+    def panel_en_vivo():
+        """Avanza la reproducción con las muestras nuevas y actualiza los paneles en vivo."""
+        estado = st.session_state.get("reproduccion")
+        if estado is None:
+            st.info("ℹ️ Presione Iniciar para comenzar la reproducción.")
+            return
+
+        estaba_en_curso = en_curso(estado)
+        avanzar(estado)
+
+        instantes, valores = estado["buffer"].ordenado()
+        tiempos = instantes.view("datetime64[ns]")
+
+        reloj_col, avance_col, lote_col = st.columns(3)
+        reloj_col.metric("Instante reproducido", str(tiempos[-1])[:19].replace("T", " ") if len(tiempos) else "—")
+        avance_col.metric("Avance", f"{estado['posicion'] / len(estado['instantes']) * 100:.1f} %")
+        lote_col.metric("Muestras en la última actualización", estado["muestras_ultimo_lote"])
+
+        for nombre, (columnas, _, _, _) in PANELES.items():
+            figura = st.session_state["figuras_reproduccion"][1][nombre]
+            with figura.batch_update():
+                for traza, columna in zip(figura.data, columnas):
+                    traza.x = tiempos
+                    traza.y = valores[:, estado["columnas"].index(columna)]
+            st.plotly_chart(figura, use_container_width=True, key=f"vivo_{nombre}")
+
+        activas_col, eventos_col = st.columns(2)
+        with activas_col:
+            st.write("🚨 Alarmas activas")
+            st.dataframe(alarmas_activas(estado), hide_index=True, use_container_width=True)
+        with eventos_col:
+            st.write("📜 Eventos recientes")
+            st.dataframe(list(estado["eventos"]), hide_index=True, use_container_width=True)
+
+        # Al terminar se vuelve a ejecutar la página para detener las actualizaciones
+        if estaba_en_curso and not en_curso(estado):
+            st.rerun()
+
+    # Solo este fragmento se vuelve a ejecutar en cada actualización, no toda la página
+    st.fragment(panel_en_vivo, run_every=SEGUNDOS_ACTUALIZACION if estado is not None and en_curso(estado) else None)()
+
+elif config is None:
+    st.warning("⚠️ No hay configuración de alarmas guardada. Configúrala primero.")
+
+else:
+    st.warning("⚠️ No hay datos para reproducir. Cargue un archivo CSV aquí o en la página de inicio.")
@@ -0,0 +1,292 @@
+"""Prueba de carga: varias sesiones simultáneas recorriendo las páginas reales.
+
+Cada escenario corre en un intérprete nuevo, que hace de servidor: N sesiones en
+hilos paralelos comparten la caché de datos y el pool de tareas, como en Streamlit.
+Cada sesión ejecuta las páginas con AppTest, que no admite ejecuciones simultáneas
+(reemplaza el Runtime global en cada run), así que los reruns de las sesiones se
+turnan y la espera de turno cuenta en la latencia. Las tareas de segundo plano sí
+corren en paralelo, pero AppTest sigue los st.rerun con los que Reporte sondea su
+tarea dentro del mismo turno, así que las latencias son una cota superior:
+
+1. Abre Inicio y carga un CSV sintético con la misma tarea que lanza la página
+   (AppTest no permite subir archivos, así que se encola `cargar_mediciones_compartidas`).
+2. Guarda una configuración de alarmas en Configuración.
+3. Recorre varios días en el Dashboard.
+4. Genera PDFs del día en Reporte.
+
+Se reporta la latencia de cada paso (percentiles 50, 90, 95 y 99 y máximo), el tiempo
+total y la memoria máxima (RSS) del proceso en cada escenario.
+
+Uso:
+    python prueba_carga.py --sesiones 1 4 8
+    python prueba_carga.py --sesiones 4 --csv-distintos --dias 7 --paso 1
+    python prueba_carga.py --csv mediciones.csv --salida carga.json
+"""
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from medir_arranque import CONFIGURACION_PRUEBA
+
+PERCENTILES = (50, 90, 95, 99)
+
+# AppTest reemplaza Runtime._instance en cada run: solo un rerun a la vez
+_candado_apptest = threading.Lock()
+
+# Etiquetas de los campos de 2_Configuracion.py para cada clave de la configuración
+ETIQUETAS_CONFIGURACION = {
+    "limite_superior_v": "Límite superior de voltaje (V)",
+    "valor_nominal_v": "Valor nominal de voltaje (V)",
+    "limite_inferior_v": "Límite inferior de voltaje (V)",
+    "desbalance_moderado_v": "Máximo porcentaje de desbalance de voltaje en estado normal (%)",
+    "desbalance_critico_v": "Máximo porcentaje de desbalance de voltaje en estado critico (%)",
+    "umbral_corriente": "Umbral máximo de corriente (A)",
+    "desbalance_moderado_i": "Porcentaje de desbalance de corriente en estado moderado (%)",
+    "desbalance_critico_i": "Porcentaje de desbalance de corriente en estado critico (%)",
+    "umbral_factor_potencia": "Umbral mínimo de factor de potencia",
+}
+
+
+# ----------------------------------
+# 🧪 Datos sintéticos
+# ----------------------------------
+
+def generar_csv(dias, paso_segundos, semilla=0, inicio="2025-05-01"):
+    """CSV sintético con el formato del analizador: fecha dd/mm/aaaa, hora con AM/PM y canales RMS."""
+    import numpy as np
+    import pandas as pd
+
+    from utils.calidad import formatear_fecha_hora
+
+    generador = np.random.default_rng(semilla)
+    instantes = pd.Series(pd.date_range(inicio, periods=int(dias * 86400 / paso_segundos), freq=f"{paso_segundos}s"))
+    n = len(instantes)
+    hora = (instantes.dt.hour + instantes.dt.minute / 60).to_numpy()
+    carga = 50 + 40 * np.sin((hora - 6) / 24 * 2 * np.pi).clip(0)
+
+    fechas, horas = formatear_fecha_hora(instantes)
+    columnas = {"Date": fechas, "Time": horas}
+    for fase in range(3):
+        columnas[f"U{fase + 1}_rms_AVG"] = 120 + generador.normal(0, 2, n) - carga * 0.05 * (fase + 1)
+        columnas[f"I{fase + 1}_rms_AVG"] = carga * (1 + 0.1 * fase) + generador.normal(0, 3, n)
+    columnas["Uunb_AVG"] = np.abs(generador.normal(1, 0.3, n))
+    columnas["Iunb_AVG"] = np.abs(generador.normal(8, 2, n))
+    columnas["PF_sum_AVG"] = np.clip(0.9 + 0.05 * np.sin(hora / 24 * 2 * np.pi) + generador.normal(0, 0.01, n), 0, 1)
+
+    return pd.DataFrame(columnas).to_csv(index=False, float_format="%.3f").encode()
+
+
+# ----------------------------------
+# 👤 Sesión simulada
+# ----------------------------------
+
+def _abrir(raiz, pagina, estado, timeout):
+    """AppTest de una página con el estado de sesión que se arrastra entre páginas."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(raiz, pagina), default_timeout=timeout)
+    for clave, valor in estado.items():
+        at.session_state[clave] = valor
+    return at
+
+
+def _ejecutar(at):
+    """Ejecuta un rerun de la página esperando el turno de AppTest."""
+    with _candado_apptest:
+        at.run()
+
+
+def correr_sesion(numero, contenido, argumentos, registrar):
+    """Recorre Inicio, Configuración, Dashboard y Reporte como lo haría un usuario."""
+    from utils.ingesta import cargar_mediciones_compartidas
+    from utils.tareas import enviar_tarea, obtener_tarea
+
+    raiz, timeout = argumentos.raiz, argumentos.timeout
+    estado = {}
+
+    def medir(paso, at, accion):
+        inicio = time.perf_counter()
+        accion()
+        registrar(paso, time.perf_counter() - inicio, [str(excepcion.value) for excepcion in at.exception])
+
+    # 1. Inicio: primer render y carga del CSV en la tarea compartida
+    inicio_app = _abrir(raiz, "1_Home.py", estado, timeout)
+    medir("Inicio: primer render", inicio_app, lambda: _ejecutar(inicio_app))
+
+    def cargar():
+        id_tarea = enviar_tarea(cargar_mediciones_compartidas, contenido, descripcion=f"Carga de la sesión {numero}")
+        while obtener_tarea(id_tarea).activa:
+            time.sleep(0.05)
+        estado["huella_datos"], estado["df"] = obtener_tarea(id_tarea).resultado
+        inicio_app.session_state["huella_datos"] = estado["huella_datos"]
+        inicio_app.session_state["df"] = estado["df"]
+        _ejecutar(inicio_app)
+
+    medir("Inicio: carga del CSV", inicio_app, cargar)
+
+    # 2. Configuración: llenar los campos y guardar
+    configuracion = _abrir(raiz, "pages/2_Configuracion.py", estado, timeout)
+    medir("Configuración: primer render", configuracion, lambda: _ejecutar(configuracion))
+
+    def guardar():
+        for campo in configuracion.number_input:
+            clave = next((c for c, etiqueta in ETIQUETAS_CONFIGURACION.items() if etiqueta == campo.label), None)
+            if clave is not None:
+                campo.set_value(CONFIGURACION_PRUEBA[clave])
+        next(boton for boton in configuracion.button if boton.label == "💾 Guardar Configuración").click()
+        _ejecutar(configuracion)
+
+    medir("Configuración: guardar", configuracion, guardar)
+    estado["configuracion_alarmas"] = configuracion.session_state["configuracion_alarmas"]
+
+    # 3. Dashboard: primer render y cambios de día
+    dashboard = _abrir(raiz, "pages/3_Dashboard.py", estado, timeout)
+    medir("Dashboard: primer render", dashboard, lambda: _ejecutar(dashboard))
+    dias = list(dashboard.selectbox[0].options) if dashboard.selectbox else []
+    for posicion in range(min(argumentos.cambios_dia, len(dias))):
+        dashboard.selectbox[0].set_value(dias[(numero + posicion + 1) % len(dias)])
+        medir("Dashboard: cambio de día", dashboard, lambda: _ejecutar(dashboard))
+
+    # 4. Reporte: PDFs del día (la página espera la tarea con reruns)
+    reporte = _abrir(raiz, "pages/4_Reporte.py", estado, timeout)
+    medir("Reporte: primer render", reporte, lambda: _ejecutar(reporte))
+    for posicion in range(argumentos.pdfs):
+        if not dias:
+            break
+        dia = dias[(numero + posicion) % len(dias)]
+
+        def generar_pdf():
+            reporte.selectbox[0].set_value(dia)
+            _ejecutar(reporte)
+            next(boton for boton in reporte.button if boton.label == "📄 Generar y descargar PDF").click()
+            _ejecutar(reporte)
+            # La página sondea la tarea con reruns y, al terminar, lee el PDF y lo borra del disco;
+            # si el run terminó antes, se sigue sondeando
+            while "tarea_reporte" in reporte.session_state and obtener_tarea(reporte.session_state["tarea_reporte"]).activa:
+                time.sleep(0.5)
+                _ejecutar(reporte)
+            if "tarea_reporte" in reporte.session_state:
+                _ejecutar(reporte)
+
+        medir("Reporte: PDF del día", reporte, generar_pdf)
+
+
+def correr_escenario(argumentos):
+    """Corre N sesiones simultáneas en este proceso y devuelve latencias, errores y memoria."""
+    import resource
+
+    sys.path.insert(0, argumentos.raiz)
+    os.chdir(argumentos.raiz)
+
+    if argumentos.csv:
+        with open(argumentos.csv, "rb") as archivo:
+            contenidos = [archivo.read()] * argumentos.escenario
+    elif argumentos.csv_distintos:
+        contenidos = [generar_csv(argumentos.dias, argumentos.paso, semilla=n) for n in range(argumentos.escenario)]
+    else:
+        contenidos = [generar_csv(argumentos.dias, argumentos.paso)] * argumentos.escenario
+
+    latencias = {}
+    errores = []
+    candado = threading.Lock()
+
+    def registrar(paso, segundos, excepciones):
+        with candado:
+            latencias.setdefault(paso, []).append(segundos)
+            errores.extend(f"{paso}: {excepcion}" for excepcion in excepciones)
+
+    def sesion(numero):
+        time.sleep(numero * argumentos.escalonamiento)
+        try:
+            correr_sesion(numero, contenidos[numero], argumentos, registrar)
+        except Exception as error:
+            with candado:
+                errores.append(f"Sesión {numero}: {error!r}")
+
+    inicio = time.perf_counter()
+    hilos = [threading.Thread(target=sesion, args=(numero,)) for numero in range(argumentos.escenario)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    return {
+        "sesiones": argumentos.escenario,
+        "duracion": time.perf_counter() - inicio,
+        "memoria_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "latencias": latencias,
+        "errores": errores,
+    }
+
+
+# ----------------------------------
+# 📊 Resumen
+# ----------------------------------
+
+def percentil(valores, p):
+    """Percentil por rango más cercano."""
+    ordenados = sorted(valores)
+    return ordenados[max(math.ceil(p / 100 * len(ordenados)) - 1, 0)]
+
+
+def imprimir_escenario(resultado):
+    print(f"\n{resultado['sesiones']} sesiones: {resultado['duracion']:.1f} s en total, RSS máximo {resultado['memoria_mb']:.0f} MiB")
+    encabezado = "".join(f"{f'p{p}':>9}" for p in PERCENTILES)
+    print(f"  {'Paso (ms)':<30}{'n':>5}{encabezado}{'máx':>9}")
+    for paso, valores in resultado["latencias"].items():
+        columnas = "".join(f"{percentil(valores, p) * 1000:>9.0f}" for p in PERCENTILES)
+        print(f"  {paso:<30}{len(valores):>5}{columnas}{max(valores) * 1000:>9.0f}")
+    for error in resultado["errores"][:5]:
+        print(f"  ⚠️ {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga con varias sesiones simultáneas sobre las páginas reales.")
+    parser.add_argument("--raiz", default=os.path.dirname(os.path.abspath(__file__)), help="Copia del repositorio a probar.")
+    parser.add_argument("--sesiones", type=int, nargs="+", default=[1, 4], help="Sesiones simultáneas de cada escenario.")
+    parser.add_argument("--csv", default=None, help="CSV del analizador a usar en lugar del sintético.")
+    parser.add_argument("--csv-distintos", action="store_true", help="Un CSV sintético distinto por sesión (sin caché compartida).")
+    parser.add_argument("--dias", type=float, default=3, help="Días del CSV sintético.")
+    parser.add_argument("--paso", type=int, default=1, help="Segundos entre muestras del CSV sintético.")
+    parser.add_argument("--cambios-dia", type=int, default=3, help="Cambios de día por sesión en el Dashboard.")
+    parser.add_argument("--pdfs", type=int, default=1, help="PDFs del día por sesión en Reporte.")
+    parser.add_argument("--escalonamiento", type=float, default=0.0, help="Segundos entre el inicio de cada sesión.")
+    parser.add_argument("--timeout", type=float, default=600, help="Tiempo máximo de cada ejecución de página.")
+    parser.add_argument("--salida", default=None, help="Archivo JSON donde guardar los resultados.")
+    parser.add_argument("--escenario", type=int, default=None, help=argparse.SUPPRESS)
+    argumentos = parser.parse_args()
+    argumentos.raiz = os.path.abspath(argumentos.raiz)
+    if argumentos.csv:
+        argumentos.csv = os.path.abspath(argumentos.csv)
+
+    # Proceso hijo: corre un escenario e imprime el resultado en JSON
+    if argumentos.escenario is not None:
+        print(json.dumps(correr_escenario(argumentos)))
+        return
+
+    origen = argumentos.csv or f"CSV sintético de {argumentos.dias:g} días cada {argumentos.paso} s" + (
+        " (uno por sesión)" if argumentos.csv_distintos else " (compartido)"
+    )
+    print(f"Prueba de carga sobre {argumentos.raiz} con {origen}")
+
+    resultados = []
+    for sesiones in argumentos.sesiones:
+        # Cada escenario en un intérprete nuevo, para que la caché y el RSS máximo no se arrastren
+        comando = [sys.executable, os.path.abspath(__file__), *sys.argv[1:], "--escenario", str(sesiones)]
+        salida = subprocess.run(comando, capture_output=True, text=True, check=True)
+        resultado = json.loads(salida.stdout.strip().splitlines()[-1])
+        imprimir_escenario(resultado)
+        resultados.append(resultado)
+
+    if argumentos.salida:
+        with open(argumentos.salida, "w", encoding="utf-8") as archivo:
+            json.dump(resultados, archivo, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+
+from utils.anomalias import _medianas_por_franja, detectar_anomalias
+
+
+def test_medianas_por_franja_igualan_groupby():
+    rng = np.random.default_rng(0)
+    valores = rng.normal(size=5001)
+    valores[rng.random(len(valores)) < 0.1] = np.nan
+    franjas = rng.integers(0, 24, len(valores))
+    franjas[franjas == 5] = 6
+
+    medianas, muestras = _medianas_por_franja(valores, franjas, 24)
+
+    esperadas = pd.Series(valores).groupby(franjas).median().reindex(range(24))
+    assert np.allclose(medianas, esperadas.to_numpy(), equal_nan=True)
+    assert muestras[5] == 0
+
+
+def test_pico_diario_habitual_no_es_anomalia():
+    """Un pico que se repite cada tarde no se marca; el mismo nivel de madrugada sí."""
+    rng = np.random.default_rng(1)
+    instantes = pd.date_range("2025-05-01", periods=7 * 1440, freq="60s")
+    corriente = np.where((instantes.hour >= 18) & (instantes.hour < 21), 100.0, 50.0) + rng.normal(0, 1, len(instantes))
+    madrugada = (instantes.day == 4) & (instantes.hour == 3) & (instantes.minute < 10)
+    corriente[madrugada] = 75.0
+    df = pd.DataFrame({"Datetime": instantes, "I1_rms_AVG": corriente})
+
+    anomalias = detectar_anomalias(df)["I1_rms_AVG"].to_numpy()
+
+    assert not anomalias[(instantes.hour >= 18) & (instantes.hour < 21)].any()
+    assert anomalias[madrugada].all()
@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+
+from utils.cumplimiento import evaluar_cumplimiento_semanal
+
+
+def test_cumplimiento_por_fase():
+    # Una semana completa de lunes a domingo cada 60 s
+    instantes = pd.date_range("2025-06-02", periods=7 * 1440, freq="60s")
+    df = pd.DataFrame({
+        "Datetime": instantes,
+        "U1_rms_AVG": 120.0,
+        # Un 10 % del tiempo fuera de ±10 %, pero dentro de -15 %
+        "U2_rms_AVG": np.where(instantes.hour < 3, 104.0, 120.0),
+        # Un solo promedio de 10 minutos por debajo de -15 %
+        "U3_rms_AVG": np.where(instantes < "2025-06-02 00:10", 90.0, 120.0),
+    })
+
+    tabla = evaluar_cumplimiento_semanal(df, 120.0).set_index("Fase")
+
+    assert list(tabla.index) == ["U1", "U2", "U3"]
+    assert (tabla["Intervalos"] == 7 * 144).all()
+    assert tabla.loc["U1", "Semana"] == "02/06/2025 - 08/06/2025"
+    assert list(tabla["Cumple"]) == ["Sí", "No", "No"]
+    assert tabla.loc["U2", "% dentro -15%/+10%"] == 100.0
+    assert tabla.loc["U3", "% dentro ±10%"] > 99.0
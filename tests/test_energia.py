@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.energia import calcular_energia
+
+
+def test_potencia_constante_da_energia_y_demanda_esperadas():
+    instantes = pd.date_range("2025-06-01", periods=2 * 1440, freq="60s")
+    df = pd.DataFrame({"Datetime": instantes, "P_sum_AVG": 6000.0})
+
+    resultado = calcular_energia(df)
+    dias = resultado["dias"]
+
+    # El primer día suma 1440 intervalos de un minuto; el segundo, uno menos
+    assert list(dias["Energía (kWh)"]) == [144.0, pytest.approx(143.9, abs=0.01)]
+    assert list(dias["Demanda máxima 15 min (kW)"]) == [6.0, 6.0]
+    assert resultado["fuente"] == "P_sum_AVG"
+
+
+def test_hueco_no_suma_energia():
+    instantes = pd.date_range("2025-06-01", periods=1440, freq="60s")
+    instantes = instantes[(instantes.hour < 10) | (instantes.hour >= 12)]
+    df = pd.DataFrame({"Datetime": instantes, "P_sum_AVG": 6000.0})
+
+    horas = calcular_energia(df)["horas"]
+
+    assert np.allclose(horas.loc["2025-06-01 10:00":"2025-06-01 11:00", "Energía (kWh)"], 0.0)
+    # 22 horas con datos menos el minuto que cruza el hueco y el último minuto del día
+    assert horas["Energía (kWh)"].sum() == pytest.approx(6.0 * 22 - 0.2, abs=1e-6)
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+from utils.histogramas import (
+    MAX_BINS, construir_histogramas, muestras_fuera_de_limite, tiempo_fuera_de_limite,
+)
+
+
+def _mediciones(voltaje):
+    instantes = pd.date_range("2025-06-01", periods=len(voltaje), freq="60s")
+    return pd.DataFrame({"Datetime": instantes, "U1_rms_AVG": np.asarray(voltaje, dtype=float)})
+
+
+def test_muestras_fuera_de_limite_igualan_conteo_exacto():
+    rng = np.random.default_rng(3)
+    voltaje = rng.normal(120.0, 3.0, 3 * 1440)
+    voltaje[rng.random(len(voltaje)) < 0.05] = np.nan
+    df = _mediciones(voltaje)
+    histogramas = construir_histogramas(df)
+
+    # En un borde de bin el conteo es exacto
+    fuera, totales = muestras_fuera_de_limite(histogramas, "U1_rms_AVG", 125.0)
+    dias = (df["Datetime"] - df["Datetime"].iloc[0]).dt.days
+    esperados = (df["U1_rms_AVG"] >= 125.0).groupby(dias).sum()
+    assert np.array_equal(fuera, esperados.to_numpy())
+    assert np.array_equal(totales, df["U1_rms_AVG"].notna().groupby(dias).sum().to_numpy())
+
+    # Dentro de un bin el error es a lo sumo el contenido de ese bin
+    debajo, _ = muestras_fuera_de_limite(histogramas, "U1_rms_AVG", 114.2, sobre=False)
+    assert np.abs(debajo.sum() - (df["U1_rms_AVG"] < 114.2).sum()) <= ((df["U1_rms_AVG"] >= 114.0) & (df["U1_rms_AVG"] < 114.5)).sum()
+
+
+def test_centinela_no_desborda_los_bins():
+    voltaje = np.full(1440, 120.0)
+    voltaje[:10] = -9999.0
+    histogramas = construir_histogramas(_mediciones(voltaje))
+
+    assert histogramas["canales"]["U1_rms_AVG"]["conteos"].shape[1] <= MAX_BINS
+    resumen = tiempo_fuera_de_limite(histogramas, "U1_rms_AVG", 110.0, sobre=False)
+    assert resumen["horas"] == 10 / 60
+    assert resumen["dias"] == 1
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.energia import calcular_energia
+from utils.historico import (
+    aplicar_retencion, cargar_rango_compartido, guardar_mediciones, leer_promedios_horarios, leer_rango, rango_crudo
+)
+
+
+@pytest.fixture
+def historico(tmp_path):
+    """Cinco días de muestras cada 60 s con solo los dos últimos conservados como crudos."""
+    ruta = str(tmp_path / "historico.sqlite")
+    instantes = pd.date_range("2025-06-01", periods=5 * 1440, freq="60s")
+    df = pd.DataFrame({
+        "Datetime": instantes,
+        "P_sum_AVG": np.full(len(instantes), 10_000.0),
+        "I1_rms_AVG": np.where(instantes.hour < 12, 100.0, 50.0),
+    })
+    guardar_mediciones(df, "medidor", ruta=ruta)
+    aplicar_retencion("medidor", dias_crudos=2, ruta=ruta)
+    return ruta
+
+
+def test_rango_mixto_no_mezcla_promedios_con_muestras(historico):
+    with pytest.raises(ValueError, match="promedios horarios"):
+        leer_rango("medidor", "2025-06-01", "2025-06-06", ruta=historico)
+    with pytest.raises(ValueError, match="promedios horarios"):
+        cargar_rango_compartido("medidor", "2025-06-01", "2025-06-06", ruta=historico)
+
+
+def test_rango_crudo_conserva_energia_y_cobertura(historico):
+    primero, ultimo = rango_crudo("medidor", ruta=historico)
+    assert primero == pd.Timestamp("2025-06-04")
+
+    df = leer_rango("medidor", primero, pd.Timestamp(ultimo.date()) + pd.Timedelta(days=1), ruta=historico)
+    assert len(df) == 2 * 1440
+    assert (df["Datetime"].diff().dropna() == pd.Timedelta(seconds=60)).all()
+
+    dias = calcular_energia(df)["dias"]
+    # 10 kW constantes: 240 kWh por día salvo el último intervalo del conjunto
+    assert dias["Energía (kWh)"].iloc[0] == pytest.approx(240.0)
+    assert dias["Cobertura (%)"].iloc[0] == pytest.approx(100.0)
+
+
+def test_promedios_horarios_llevan_su_peso(historico):
+    horarios = leer_promedios_horarios("medidor", "2025-06-01", "2025-06-04", ruta=historico)
+    assert len(horarios) == 3 * 24
+    assert (horarios["muestras"] == 60).all()
+    # El promedio ponderado por muestras reproduce el de las muestras originales
+    promedio = np.average(horarios["I1_rms_AVG"], weights=horarios["muestras"])
+    assert promedio == pytest.approx(75.0)
+
+
+def test_columnas_con_nombres_no_identificadores(tmp_path):
+    ruta = str(tmp_path / "historico.sqlite")
+    instantes = pd.date_range("2025-06-01", periods=120, freq="60s")
+    df = pd.DataFrame({
+        "Datetime": instantes,
+        "THD U1 (%)": np.full(len(instantes), 2.5),
+        'Temp. "interna"': np.arange(len(instantes), dtype=float),
+    })
+    guardar_mediciones(df, "medidor", ruta=ruta)
+
+    crudos = leer_rango("medidor", "2025-06-01", "2025-06-02", ruta=ruta)
+    assert (crudos["THD U1 (%)"] == 2.5).all()
+    assert crudos['Temp. "interna"'].tolist() == list(range(len(instantes)))
+
+    horarios = leer_promedios_horarios("medidor", "2025-06-01", "2025-06-02", ruta=ruta)
+    assert horarios["THD U1 (%)"].tolist() == [2.5, 2.5]
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+from utils.reglas_alarma import evaluar_reglas, validar_regla
+
+CONFIG = {"valor_nominal_v": 0.0, "umbral_corriente": 80.0, "reglas": []}
+
+
+def _mediciones(corriente, paso="60s"):
+    instantes = pd.date_range("2025-06-01", periods=len(corriente), freq=paso)
+    return pd.DataFrame({"Datetime": instantes, "I1_rms_AVG": np.asarray(corriente, dtype=float)})
+
+
+def test_divisor_cero_no_invalida_la_regla():
+    assert validar_regla("I1 > 50 / nominal", CONFIG) is None
+    assert validar_regla("I1 / nominal > 1.1", CONFIG) is None
+    assert validar_regla("I1 > 0 / 0", CONFIG) is None
+
+
+def test_divisor_cero_se_evalua_con_semantica_de_numpy():
+    df = _mediciones([10.0, 0.0, -10.0, np.nan])
+    reglas = [
+        {"nombre": "Infinito", "expresion": "I1 > 50 / nominal", "duracion_s": 0.0},
+        {"nombre": "Relativa", "expresion": "I1 / nominal > 1", "duracion_s": 0.0},
+    ]
+    eventos, resumen = evaluar_reglas(df, reglas, CONFIG)
+
+    # I1 > inf nunca se cumple; I1 / 0 solo supera 1 cuando I1 > 0 (inf)
+    assert list(resumen["Eventos"]) == [0, 1]
+    assert eventos.loc[0, "Inicio"] == df.loc[0, "Datetime"]
+
+
+def test_regla_invalida_devuelve_mensaje():
+    assert "no tiene el valor" in validar_regla("I1 > umbral_inexistente", CONFIG)
+    assert validar_regla("I1 >", CONFIG) is not None
+    assert validar_regla("__import__('os')", CONFIG) is not None
+
+
+def test_tramo_se_corta_en_huecos():
+    df = _mediciones([100.0] * 10)
+    # Hueco de 5 minutos entre la quinta y la sexta muestra
+    df.loc[5:, "Datetime"] += pd.Timedelta(minutes=4)
+    reglas = [{"nombre": "Sobrecorriente", "expresion": "I1 > umbral_corriente", "duracion_s": 0.0}]
+
+    eventos, resumen = evaluar_reglas(df, reglas, CONFIG)
+
+    assert list(eventos["Muestras"]) == [5, 5]
+    assert list(eventos["Duración (s)"]) == [300.0, 300.0]
+    assert eventos.loc[1, "Inicio"] == df.loc[5, "Datetime"]
+
+
+def test_duracion_minima_descarta_tramos_cortos():
+    corriente = [100.0, 100.0, 50.0] + [100.0] * 6 + [np.nan, 100.0]
+    df = _mediciones(corriente)
+    reglas = [{"nombre": "Sostenida", "expresion": "I1 > umbral_corriente", "duracion_s": 300.0}]
+
+    eventos, resumen = evaluar_reglas(df, reglas, CONFIG)
+
+    # Solo el tramo de seis minutos; el NaN corta el último
+    assert list(eventos["Muestras"]) == [6]
+    assert eventos.loc[0, "Inicio"] == df.loc[3, "Datetime"]
+    assert resumen.loc[0, "Tiempo total (min)"] == 6.0
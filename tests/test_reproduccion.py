@@ -0,0 +1,49 @@
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from utils.reglas_alarma import evaluar_reglas
+from utils.reproduccion import avanzar, iniciar_reproduccion, reanudar, terminada
+
+CONFIG = {
+    "limite_superior_v": 125.0,
+    "limite_inferior_v": 110.0,
+    "umbral_corriente": 80.0,
+    "umbral_factor_potencia": 0.9,
+    "desbalance_critico_v": 3.0,
+    "desbalance_critico_i": 15.0,
+    "reglas": [{"nombre": "Sostenida", "expresion": "I1 > 90", "duracion_s": 600.0}],
+}
+
+
+def test_eventos_por_lotes_igualan_evaluacion_completa():
+    rng = np.random.default_rng(2)
+    instantes = pd.date_range("2025-06-01", periods=2 * 1440, freq="60s")
+    # Un hueco de una hora a mitad del conjunto y un tramo activo hasta la última muestra
+    instantes = instantes[(instantes < "2025-06-01 12:00") | (instantes >= "2025-06-01 13:00")]
+    corriente = 70.0 + 25.0 * np.sin(np.arange(len(instantes)) / 40.0) + rng.normal(0, 2, len(instantes))
+    corriente[-30:] = 100.0
+    df = pd.DataFrame({"Datetime": instantes, "I1_rms_AVG": corriente, "I2_rms_AVG": 50.0, "I3_rms_AVG": 50.0})
+
+    estado = iniciar_reproduccion(df, CONFIG, capacidad=600, velocidad=60.0)
+    estado["eventos"] = deque()
+    reanudar(estado, ahora=0.0)
+    ahora = 0.0
+    while not terminada(estado):
+        # Lotes de unas 37 muestras, que no coinciden con el inicio de los tramos
+        ahora += 37.0
+        avanzar(estado, ahora)
+
+    reglas = [regla for regla, _ in estado["reglas"]]
+    assert [regla["nombre"] for regla in reglas] == ["Sobrecorriente", "Sostenida"]
+    esperados, _ = evaluar_reglas(df, reglas, CONFIG)
+    obtenidos = pd.DataFrame(list(estado["eventos"])).sort_values(["Inicio", "Regla"], ignore_index=True)
+    esperados = esperados.sort_values(["Inicio", "Regla"], ignore_index=True)
+
+    assert len(obtenidos) == len(esperados) > 0
+    assert list(obtenidos["Regla"]) == list(esperados["Regla"])
+    assert (obtenidos["Inicio"] == esperados["Inicio"]).all()
+    assert (obtenidos["Fin"] == esperados["Fin"]).all()
+    assert np.allclose(obtenidos["Duración (s)"], esperados["Duración (s)"])
+    assert obtenidos["Fin"].iloc[-1] == df["Datetime"].iloc[-1]
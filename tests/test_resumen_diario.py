@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.histogramas import construir_histogramas
+from utils.resumen_diario import construir_resumen_diario, evaluar_alarmas_diarias
+
+CONFIG = {
+    "limite_superior_v": 125.0,
+    "limite_inferior_v": 110.0,
+    "umbral_corriente": 80.0,
+    "umbral_factor_potencia": 0.9,
+    "desbalance_moderado_v": 2.0,
+    "desbalance_critico_v": 3.0,
+    "desbalance_moderado_i": 10.0,
+    "desbalance_critico_i": 15.0,
+}
+
+
+@pytest.fixture
+def mediciones():
+    """Tres días cada 60 s: el segundo sin ningún PF válido y el tercero sin corriente en la fase 1."""
+    instantes = pd.date_range("2025-06-01", periods=3 * 1440, freq="60s")
+    dia = (instantes - instantes[0]).days.to_numpy()
+    df = pd.DataFrame({
+        "Datetime": instantes,
+        "U1_rms_AVG": np.where(instantes.hour < 6, 130.0, 120.0),
+        "U2_rms_AVG": 120.0,
+        "U3_rms_AVG": 120.0,
+        "I1_rms_AVG": np.where(dia == 2, np.nan, 100.0),
+        "I2_rms_AVG": 50.0,
+        "I3_rms_AVG": 50.0,
+        "PF_sum_AVG": np.where(dia == 1, np.nan, 0.95),
+        "Uunb_AVG": 1.0,
+        "Iunb_AVG": np.where(dia == 0, 20.0, 5.0),
+    })
+    return df
+
+
+def test_dia_sin_pf_queda_alineado_con_nan(mediciones):
+    resumen = construir_resumen_diario(mediciones)
+
+    assert len(resumen["dias"]) == 3
+    assert resumen["pf_horario"].shape == (3, 24)
+    assert np.isnan(resumen["pf_horario"][1]).all()
+    assert np.allclose(resumen["pf_horario"][[0, 2]], 0.95)
+
+
+def test_alarmas_diarias_con_canales_ausentes(mediciones):
+    resumen = construir_resumen_diario(mediciones)
+    alarmas = evaluar_alarmas_diarias(resumen, construir_histogramas(mediciones), CONFIG)
+
+    assert list(alarmas["Día"]) == ["01/06/2025", "02/06/2025", "03/06/2025"]
+    # Seis de las 24 horas por encima del límite superior en la fase 1
+    assert np.allclose(alarmas["% tiempo sobre límite superior V"], 25.0, atol=0.5)
+    # Sin I1 el tercer día, el peor canal de corriente es el que sí tiene datos
+    assert list(alarmas["% tiempo sobre umbral I"]) == pytest.approx([100.0, 100.0, 0.0], abs=0.5)
+    # Un día sin PF no cuenta horas anormales
+    assert list(alarmas["Horas PF anormal"]) == [0, 0, 0]
+    assert list(alarmas["Estado desbalance I"]) == ["Crítico", "Normal", "Normal"]
+
+
+def test_pf_bajo_cuenta_horas():
+    instantes = pd.date_range("2025-06-01", periods=1440, freq="60s")
+    df = pd.DataFrame({
+        "Datetime": instantes,
+        **{columna: 120.0 for columna in ["U1_rms_AVG", "U2_rms_AVG", "U3_rms_AVG"]},
+        **{columna: 10.0 for columna in ["I1_rms_AVG", "I2_rms_AVG", "I3_rms_AVG"]},
+        "PF_sum_AVG": np.where(instantes.hour < 3, 0.8, 0.95),
+        "Uunb_AVG": 1.0,
+        "Iunb_AVG": 1.0,
+    })
+    alarmas = evaluar_alarmas_diarias(construir_resumen_diario(df), construir_histogramas(df), CONFIG)
+
+    assert list(alarmas["Horas PF anormal"]) == [3]
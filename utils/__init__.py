@@ -0,0 +1 @@
+"""Utilidades compartidas por las páginas del dashboard."""
@@ -0,0 +1,73 @@
+"""Agregaciones vectorizadas de las mediciones."""
+import numpy as np
+import pandas as pd
+
+
+def _sumas_y_conteos(posiciones, valores, n_bins):
+    """Suma y cuenta los valores no nulos de cada columna por bin con un solo bincount."""
+    n_columnas = valores.shape[1]
+    indices = (posiciones[:, None] + np.arange(n_columnas) * n_bins).ravel()
+    planos = valores.ravel()
+    validos = ~np.isnan(planos)
+
+    sumas = np.bincount(indices[validos], weights=planos[validos], minlength=n_bins * n_columnas)
+    conteos = np.bincount(indices[validos], minlength=n_bins * n_columnas)
+
+    return sumas.reshape(n_columnas, n_bins).T, conteos.reshape(n_columnas, n_bins).T
+
+
+def promedios_por_intervalo(df, columnas, intervalo="10min"):
+    """Promedia las columnas en intervalos fijos de tiempo en una sola pasada."""
+    paso = pd.Timedelta(intervalo).value
+    instantes = df["Datetime"].to_numpy(dtype="datetime64[ns]")
+    validos = ~np.isnat(instantes)
+
+    if not validos.any():
+        return pd.DataFrame(columns=columnas, index=pd.DatetimeIndex([], name="Datetime"), dtype=float)
+
+    codigos = instantes[validos].view("int64") // paso
+    base = codigos.min()
+    posiciones = codigos - base
+    n_bins = int(posiciones.max()) + 1
+
+    valores = df[columnas].to_numpy(dtype=float)[validos]
+    sumas, conteos = _sumas_y_conteos(posiciones, valores, n_bins)
+
+    # Solo se conservan los intervalos con al menos una muestra
+    con_datos = conteos.sum(axis=1) > 0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        promedios = sumas[con_datos] / conteos[con_datos]
+
+    indice = pd.to_datetime((np.flatnonzero(con_datos) + base) * paso)
+    return pd.DataFrame(promedios, columns=columnas, index=pd.DatetimeIndex(indice, name="Datetime"))
+
+
+def promedios_dia_hora(df, columnas):
+    """Pivota las columnas a matrices día × hora con un solo bincount sobre todo el conjunto.
+
+    Devuelve los días (DatetimeIndex) y un arreglo de forma (columnas, días, 24) con
+    NaN en las horas sin muestras.
+    """
+    instantes = df["Datetime"].to_numpy(dtype="datetime64[ns]")
+    validos = ~np.isnat(instantes)
+
+    if not validos.any():
+        return pd.DatetimeIndex([]), np.empty((len(columnas), 0, 24))
+
+    horas_absolutas = instantes[validos].view("int64") // pd.Timedelta(hours=1).value
+    base = (horas_absolutas.min() // 24) * 24
+    posiciones = horas_absolutas - base
+    n_dias = int(posiciones.max()) // 24 + 1
+
+    valores = df[columnas].to_numpy(dtype=float)[validos]
+    sumas, conteos = _sumas_y_conteos(posiciones, valores, n_dias * 24)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        promedios = np.where(conteos > 0, sumas / conteos, np.nan)
+
+    # Se descartan los días sin ninguna muestra
+    matrices = promedios.T.reshape(len(columnas), n_dias, 24)
+    con_datos = (conteos.reshape(n_dias, 24, len(columnas)).sum(axis=(1, 2))) > 0
+
+    dias = pd.to_datetime((base // 24 + np.flatnonzero(con_datos)) * pd.Timedelta(days=1).value)
+    return pd.DatetimeIndex(dias), matrices[:, con_datos, :]
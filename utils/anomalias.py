@@ -0,0 +1,94 @@
+"""Detección de anomalías con mediana y MAD por franja horaria sobre los canales por segundo.
+
+La referencia de cada muestra es el comportamiento típico de su franja: la misma hora
+del día (o la misma hora del mismo día de la semana) en todo el conjunto. Así un pico
+de la tarde que se repite cada día no se marca por ser distinto de la hora anterior,
+y una corriente fuera de lo habitual para esa hora sí, aunque esté bajo el umbral.
+
+La mediana y la MAD de todas las franjas de un canal salen de un solo ordenamiento
+de las muestras por (franja, valor), sin `groupby().apply` ni recorrer franjas en
+Python, así que el costo es O(n log n) por canal.
+"""
+import numpy as np
+import pandas as pd
+
+CANALES_ANOMALIAS = [
+    "U1_rms_AVG", "U2_rms_AVG", "U3_rms_AVG",
+    "I1_rms_AVG", "I2_rms_AVG", "I3_rms_AVG",
+    "PF_sum_AVG",
+]
+
+# Referencias que se ofrecen: nombre visible y número de franjas
+REFERENCIAS_ANOMALIAS = {
+    "Misma hora del día": 24,
+    "Misma hora y día de la semana": 7 * 24,
+}
+
+# Factor que convierte la MAD en una estimación de la desviación estándar
+FACTOR_MAD = 1.4826
+
+
+def franjas_horarias(instantes, n_franjas=24):
+    """Franja de cada instante: la hora del día (24) o el día de la semana por la hora (168)."""
+    instantes = pd.DatetimeIndex(instantes)
+    franjas = instantes.hour.to_numpy()
+    if n_franjas == 7 * 24:
+        franjas = instantes.dayofweek.to_numpy() * 24 + franjas
+    return franjas.astype(np.int64)
+
+
+def _medianas_por_franja(valores, franjas, n_franjas):
+    """Mediana de los valores no NaN de cada franja y su número de muestras, con un solo lexsort."""
+    orden = np.lexsort((valores, franjas))
+    ordenados = valores[orden]
+    # Dentro de cada franja los NaN quedan al final
+    inicios = np.concatenate(([0], np.cumsum(np.bincount(franjas, minlength=n_franjas))[:-1]))
+    validos = np.bincount(franjas[~np.isnan(valores)], minlength=n_franjas)
+
+    # Los dos valores centrales (el mismo si la franja tiene un número impar de muestras)
+    con_datos = validos > 0
+    bajo = (inicios + (validos - 1) // 2)[con_datos]
+    alto = (inicios + validos // 2)[con_datos]
+    medianas = np.full(n_franjas, np.nan)
+    medianas[con_datos] = (ordenados[bajo] + ordenados[alto]) / 2
+    return medianas, validos
+
+
+def perfiles_robustos(valores, franjas, n_franjas=24, escala_minima_relativa=0.005):
+    """Mediana y escala robusta (1.4826 · MAD) de cada franja y canal; `valores` es (muestras, canales)."""
+    n_canales = valores.shape[1]
+    medianas = np.full((n_franjas, n_canales), np.nan)
+    escalas = np.full((n_franjas, n_canales), np.nan)
+    muestras = np.zeros((n_franjas, n_canales), dtype=np.int64)
+
+    for canal in range(n_canales):
+        columna = valores[:, canal]
+        mediana, muestras[:, canal] = _medianas_por_franja(columna, franjas, n_franjas)
+        mad, _ = _medianas_por_franja(np.abs(columna - mediana[franjas]), franjas, n_franjas)
+        medianas[:, canal] = mediana
+        # Piso de escala para canales casi constantes (MAD cercana a cero)
+        escalas[:, canal] = np.maximum(FACTOR_MAD * mad, escala_minima_relativa * np.abs(mediana) + 1e-9)
+    return medianas, escalas, muestras
+
+
+def puntajes_robustos(valores, franjas, n_franjas=24, muestras_minimas=30, escala_minima_relativa=0.005):
+    """Calcula |x - mediana| / (1.4826 · MAD) de cada muestra contra la referencia de su franja.
+
+    Las franjas con menos de `muestras_minimas` muestras no tienen referencia fiable y
+    sus muestras tienen puntaje 0.
+    """
+    medianas, escalas, muestras = perfiles_robustos(valores, franjas, n_franjas, escala_minima_relativa)
+    escalas = np.where(muestras >= muestras_minimas, escalas, np.nan)
+
+    with np.errstate(invalid="ignore"):
+        puntajes = np.abs(valores - medianas[franjas]) / escalas[franjas]
+    return np.nan_to_num(puntajes, nan=0.0)
+
+
+def detectar_anomalias(df, canales=CANALES_ANOMALIAS, n_franjas=24, umbral=5.0):
+    """Marca como anómalas las muestras cuyo puntaje robusto supera el umbral en cada canal."""
+    canales = [canal for canal in canales if canal in df.columns]
+    valores = df[canales].to_numpy(dtype=float)
+    franjas = franjas_horarias(df["Datetime"], n_franjas)
+    puntajes = puntajes_robustos(valores, franjas, n_franjas)
+    return pd.DataFrame(puntajes > umbral, index=df.index, columns=canales)
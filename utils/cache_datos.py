@@ -0,0 +1,141 @@
+"""Caché de conjuntos de datos compartida por todas las sesiones del servidor.
+
+Los conjuntos se identifican por la huella de su contenido, de modo que varias
+sesiones que cargan el mismo archivo comparten un solo DataFrame y sus índices
+derivados. Las entradas se desalojan por tamaño total en bytes (LRU).
+"""
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+# Tamaño máximo de la caché en bytes (por defecto 2 GiB)
+MAX_BYTES_CACHE = int(os.environ.get("IELE_MAX_BYTES_CACHE", str(2 * 1024 ** 3)))
+
+_entradas = OrderedDict()
+_cargas_en_curso = {}
+_candado = threading.Lock()
+_estadisticas = {"aciertos": 0, "fallos": 0, "desalojos": 0}
+
+
+def huella_contenido(contenido):
+    """Calcula la huella (hash) del contenido de un archivo."""
+    return hashlib.blake2b(contenido, digest_size=16).hexdigest()
+
+
+def _tamano_bytes(objeto):
+    """Estima la memoria ocupada por un objeto guardado en la caché."""
+    # pandas y numpy no se importan aquí: si aún no están cargados el objeto no puede ser de sus tipos
+    pd = sys.modules.get("pandas")
+    np = sys.modules.get("numpy")
+    if pd is not None and isinstance(objeto, (pd.DataFrame, pd.Series, pd.Index)):
+        uso = objeto.memory_usage(deep=True)
+        return int(uso.sum()) if hasattr(uso, "sum") else int(uso)
+    if np is not None and isinstance(objeto, np.ndarray):
+        return int(objeto.nbytes)
+    if isinstance(objeto, (list, tuple)):
+        return sum(_tamano_bytes(elemento) for elemento in objeto)
+    if isinstance(objeto, dict):
+        return sum(_tamano_bytes(valor) for valor in objeto.values())
+    return sys.getsizeof(objeto)
+
+
+def _bytes_totales():
+    return sum(entrada["bytes"] for entrada in _entradas.values())
+
+
+def _desalojar(huella_protegida=None):
+    """Desaloja las entradas menos usadas hasta respetar el límite de bytes."""
+    while _bytes_totales() > MAX_BYTES_CACHE and len(_entradas) > 1:
+        huella = next(iter(_entradas))
+        if huella == huella_protegida:
+            _entradas.move_to_end(huella)
+            huella = next(iter(_entradas))
+        del _entradas[huella]
+        _estadisticas["desalojos"] += 1
+
+
+def obtener_dataset(huella):
+    """Devuelve el DataFrame compartido de esa huella o None si no está en la caché.
+
+    El DataFrame es de solo lectura: las páginas pueden agregar columnas a sus propias
+    copias pero no deben modificar valores en el lugar.
+    """
+    with _candado:
+        entrada = _entradas.get(huella)
+        if entrada is None:
+            _estadisticas["fallos"] += 1
+            return None
+        _estadisticas["aciertos"] += 1
+        _entradas.move_to_end(huella)
+        return entrada["df"].copy(deep=False)
+
+
+def guardar_dataset(huella, df):
+    """Guarda un DataFrame recién procesado en la caché compartida."""
+    with _candado:
+        _entradas[huella] = {"df": df, "derivados": {}, "bytes": _tamano_bytes(df)}
+        _entradas.move_to_end(huella)
+        _desalojar(huella_protegida=huella)
+    return df.copy(deep=False)
+
+
+def obtener_o_cargar(huella, cargar):
+    """Devuelve el DataFrame de la caché o lo carga una sola vez aunque varias sesiones lo pidan a la vez."""
+    df = obtener_dataset(huella)
+    if df is not None:
+        return df
+
+    with _candado:
+        candado_carga = _cargas_en_curso.setdefault(huella, threading.Lock())
+
+    with candado_carga:
+        # Otra sesión pudo terminar la carga mientras se esperaba
+        with _candado:
+            entrada = _entradas.get(huella)
+            if entrada is not None:
+                _estadisticas["aciertos"] += 1
+                _entradas.move_to_end(huella)
+                return entrada["df"].copy(deep=False)
+
+        try:
+            return guardar_dataset(huella, cargar())
+        finally:
+            with _candado:
+                _cargas_en_curso.pop(huella, None)
+
+
+def obtener_derivado(huella, clave, calcular):
+    """Devuelve un índice o agregado derivado del conjunto, calculándolo una sola vez.
+
+    Si el conjunto ya no está en la caché el valor se calcula sin guardarse.
+    """
+    with _candado:
+        entrada = _entradas.get(huella)
+        if entrada is not None and clave in entrada["derivados"]:
+            _estadisticas["aciertos"] += 1
+            _entradas.move_to_end(huella)
+            return entrada["derivados"][clave]
+        _estadisticas["fallos"] += 1
+
+    valor = calcular()
+
+    with _candado:
+        entrada = _entradas.get(huella)
+        if entrada is not None:
+            entrada["derivados"][clave] = valor
+            entrada["bytes"] += _tamano_bytes(valor)
+            _desalojar(huella_protegida=huella)
+    return valor
+
+
+def estadisticas_cache():
+    """Devuelve los contadores de aciertos, fallos y desalojos y el uso de memoria."""
+    with _candado:
+        return {
+            **_estadisticas,
+            "conjuntos": len(_entradas),
+            "bytes": _bytes_totales(),
+            "max_bytes": MAX_BYTES_CACHE,
+        }
@@ -0,0 +1,93 @@
+"""Resumen por día del conjunto para la vista de calendario.
+
+La tabla (cobertura, voltaje mínimo y máximo, PF y desbalance promedio) se construye
+una vez al cargar el conjunto con reducciones por tramos contiguos de cada día, y se
+guarda en la caché compartida. Las alarmas dependen de la configuración, así que se
+cuentan aparte a partir de los histogramas diarios, en O(días × bins).
+"""
+import numpy as np
+import pandas as pd
+
+from utils.cache_datos import obtener_derivado
+from utils.calidad import SEGUNDOS_DIA
+from utils.estadisticas import COLUMNAS_CORRIENTE, COLUMNAS_VOLTAJE
+from utils.histogramas import fuera_de_limite_por_dia
+from utils.resumen_diario import clasificar_desbalance
+
+# Alarmas por tiempo fuera de límite: nombre, canales, clave de configuración y si es por encima
+TIPOS_ALARMA = [
+    ("Sobretensión", COLUMNAS_VOLTAJE, "limite_superior_v", True),
+    ("Subtensión", COLUMNAS_VOLTAJE, "limite_inferior_v", False),
+    ("Sobrecorriente", COLUMNAS_CORRIENTE, "umbral_corriente", True),
+    ("PF bajo", ["PF_sum_AVG"], "umbral_factor_potencia", False),
+]
+
+
+def _promedio_por_dia(valores, posiciones_dia, n_dias):
+    """Promedio diario ignorando NaN, con dos bincount."""
+    validos = ~np.isnan(valores)
+    sumas = np.bincount(posiciones_dia[validos], weights=valores[validos], minlength=n_dias)
+    conteos = np.bincount(posiciones_dia[validos], minlength=n_dias)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return sumas / conteos
+
+
+def construir_resumen_calendario(df):
+    """Una fila por día con cobertura, voltaje mínimo/máximo, PF promedio y desbalance promedio.
+
+    Supone la serie ordenada por Datetime, como la deja la ingesta, de modo que cada
+    día es un tramo contiguo.
+    """
+    instantes = df["Datetime"].to_numpy(dtype="datetime64[s]").astype("int64")
+    dias_codigo, inicios, muestras = np.unique(instantes // SEGUNDOS_DIA, return_index=True, return_counts=True)
+    posiciones_dia = np.repeat(np.arange(len(dias_codigo)), muestras)
+
+    intervalos = np.diff(instantes)
+    positivos = intervalos[intervalos > 0]
+    paso = float(np.median(positivos)) if len(positivos) else 1.0
+
+    # Extremos de las tres fases por muestra y luego por tramo de cada día (fmin/fmax ignoran NaN)
+    voltajes = df[COLUMNAS_VOLTAJE].to_numpy(dtype=float)
+    with np.errstate(invalid="ignore"):
+        voltaje_min = np.fmin.reduceat(np.fmin.reduce(voltajes, axis=1), inicios)
+        voltaje_max = np.fmax.reduceat(np.fmax.reduce(voltajes, axis=1), inicios)
+
+    return pd.DataFrame({
+        "Fecha": pd.to_datetime(dias_codigo * SEGUNDOS_DIA, unit="s"),
+        "Día": pd.to_datetime(dias_codigo * SEGUNDOS_DIA, unit="s").strftime("%d/%m/%Y"),
+        "Muestras": muestras,
+        "Cobertura (%)": np.minimum(muestras * paso / SEGUNDOS_DIA * 100, 100).round(1),
+        "V mín (V)": voltaje_min.round(2),
+        "V máx (V)": voltaje_max.round(2),
+        "PF promedio": _promedio_por_dia(df["PF_sum_AVG"].to_numpy(dtype=float), posiciones_dia, len(dias_codigo)).round(3),
+        "Desbalance V (%)": _promedio_por_dia(df["Uunb_AVG"].to_numpy(dtype=float), posiciones_dia, len(dias_codigo)).round(3),
+        "Desbalance I (%)": _promedio_por_dia(df["Iunb_AVG"].to_numpy(dtype=float), posiciones_dia, len(dias_codigo)).round(3),
+    })
+
+
+def resumen_calendario_compartido(huella, df):
+    """Resumen por día desde la caché compartida (se construye una vez por conjunto)."""
+    return obtener_derivado(huella, "resumen_calendario", lambda: construir_resumen_calendario(df))
+
+
+def agregar_alarmas(resumen, histogramas, config):
+    """Agrega al resumen los minutos fuera de cada límite, el estado del desbalance y el conteo de alarmas del día."""
+    resumen = resumen.copy()
+    minutos_por_muestra = histogramas["paso_segundos"] / 60
+    activas = np.zeros(len(resumen), dtype=int)
+
+    for nombre, canales, clave, sobre in TIPOS_ALARMA:
+        # Peor canal del grupo en cada día, igual que en el resumen de alarmas por día
+        fuera, _ = fuera_de_limite_por_dia(histogramas, canales, config[clave], sobre)
+        resumen[f"{nombre} (min)"] = (fuera * minutos_por_muestra).round(1)
+        activas += fuera >= 0.5
+
+    resumen["Estado desbalance V"] = clasificar_desbalance(
+        resumen["Desbalance V (%)"].to_numpy(), config["desbalance_moderado_v"], config["desbalance_critico_v"])
+    resumen["Estado desbalance I"] = clasificar_desbalance(
+        resumen["Desbalance I (%)"].to_numpy(), config["desbalance_moderado_i"], config["desbalance_critico_i"])
+    activas += (resumen["Estado desbalance V"] != "Normal").to_numpy()
+    activas += (resumen["Estado desbalance I"] != "Normal").to_numpy()
+
+    resumen["Alarmas"] = activas
+    return resumen
@@ -0,0 +1,185 @@
+"""Validación y reparación de la serie de mediciones al cargarla.
+
+Detecta horas mal formadas o con AM/PM ambiguo, instantes duplicados, filas fuera de
+orden y huecos en el muestreo, todo en forma vectorizada (las cadenas de fecha y
+hora se analizan una sola vez por valor único). La serie reparada queda ordenada y
+con instantes únicos, que es lo que suponen los cortes y agregaciones rápidas.
+"""
+import numpy as np
+import pandas as pd
+
+# hh:mm[:ss] con marca opcional "AM", "PM", "a. m.", "p.m.", etc.
+PATRON_HORA = r"^\s*(\d{1,2}):(\d{1,2})(?::(\d{1,2}))?\s*(?:([aApP])\.?\s*[mM]\.?)?\s*$"
+
+# Un intervalo mayor a este múltiplo del paso de muestreo se considera hueco
+FACTOR_HUECO = 1.5
+
+SEGUNDOS_DIA = 86400
+
+_horas_formateadas = None
+
+
+def _segundos_del_dia(tiempos):
+    """Convierte las horas en texto a segundos del día.
+
+    Devuelve los segundos (NaN si la hora está mal formada) y una máscara de horas
+    ambiguas: marca AM/PM incompatible con la hora (p. ej. "13:00:00 PM" o
+    "00:30:00 PM") u horas sin marca en un archivo que sí las usa.
+    """
+    codigos, unicos = pd.factorize(tiempos)
+    partes = pd.Series(unicos, dtype=object).astype(str).str.extract(PATRON_HORA)
+
+    hora = partes[0].astype(float).to_numpy()
+    minuto = partes[1].astype(float).to_numpy()
+    segundo = partes[2].astype(float).fillna(0).to_numpy()
+    marca = partes[3].str.upper().to_numpy(dtype=object)
+
+    con_marca = pd.notna(marca)
+    es_pm = marca == "P"
+
+    # Reloj de 12 h: 12 AM es medianoche y de 1 a 11 PM se suman 12 horas
+    en_doce_horas = con_marca & (hora >= 1) & (hora <= 12)
+    hora_24 = np.where(en_doce_horas, hora % 12 + 12 * es_pm, hora)
+
+    ambigua = con_marca & ((hora > 12) | ((hora == 0) & es_pm))
+    if con_marca.any():
+        ambigua |= ~con_marca & (hora <= 12)
+
+    valida = (hora_24 < 24) & (minuto < 60) & (segundo < 60)
+    segundos_unicos = np.where(valida, hora_24 * 3600 + minuto * 60 + segundo, np.nan)
+
+    # El código -1 corresponde a valores vacíos
+    segundos_unicos = np.append(segundos_unicos, np.nan)
+    ambigua = np.append(ambigua & valida, False)
+    return segundos_unicos[codigos], ambigua[codigos]
+
+
+def _fechas(fechas):
+    """Convierte las fechas dd/mm/aaaa a datetime64 (NaT si están mal formadas)."""
+    codigos, unicos = pd.factorize(fechas)
+    dias = pd.to_datetime(pd.Series(unicos, dtype=object), format="%d/%m/%Y", errors="coerce").to_numpy(dtype="datetime64[ns]")
+    return np.append(dias, np.datetime64("NaT"))[codigos]
+
+
+def _tabla_horas():
+    """Las 86 400 horas del día ya formateadas como hh:mm:ss AM/PM."""
+    global _horas_formateadas
+    if _horas_formateadas is None:
+        _horas_formateadas = np.array([
+            f"{(segundo // 3600) % 12 or 12:02d}:{segundo // 60 % 60:02d}:{segundo % 60:02d} {'AM' if segundo < 43200 else 'PM'}"
+            for segundo in range(SEGUNDOS_DIA)
+        ], dtype=object)
+    return _horas_formateadas
+
+
+def formatear_fecha_hora(datetimes):
+    """Construye las columnas Date y Time de las páginas a partir de Datetime sin formatear fila por fila."""
+    segundos = datetimes.to_numpy(dtype="datetime64[s]").astype("int64")
+    if not len(segundos):
+        return np.array([], dtype=object), np.array([], dtype=object)
+
+    dias = segundos // SEGUNDOS_DIA
+    primer_dia = dias.min()
+    fechas = pd.to_datetime((primer_dia + np.arange(dias.max() - primer_dia + 1)) * SEGUNDOS_DIA, unit="s")
+    fechas = fechas.strftime("%d/%m/%Y").to_numpy(dtype=object)
+    return fechas[dias - primer_dia], _tabla_horas()[segundos - dias * SEGUNDOS_DIA]
+
+
+def reparar_mediciones(df):
+    """Valida y repara las fechas y horas del CSV del analizador.
+
+    Descarta las filas con fecha u hora mal formada, ordena por instante y conserva la
+    primera de cada instante duplicado. Devuelve el DataFrame reparado (índice 0..n-1 y
+    Datetime estrictamente creciente) y el informe de calidad.
+    """
+    segundos, ambiguas = _segundos_del_dia(df["Time"])
+    fechas = _fechas(df["Date"])
+    instantes = np.where(
+        np.isnan(segundos) | np.isnat(fechas), np.datetime64("NaT", "ns"),
+        fechas + np.nan_to_num(segundos).astype("int64").astype("timedelta64[s]")
+    )
+
+    malformadas = np.isnat(instantes)
+    filas_leidas = len(df)
+    df = df[~malformadas]
+    instantes = instantes[~malformadas]
+    enteros = instantes.view("int64")
+
+    fuera_de_orden = int(np.count_nonzero(enteros[1:] < enteros[:-1]))
+    if fuera_de_orden:
+        orden = np.argsort(enteros, kind="stable")
+        df = df.take(orden)
+        instantes = instantes[orden]
+        enteros = enteros[orden]
+
+    duplicadas = np.zeros(len(enteros), dtype=bool)
+    duplicadas[1:] = enteros[1:] == enteros[:-1]
+    dias_duplicadas = instantes[duplicadas].astype("datetime64[D]")
+
+    df = df[~duplicadas].reset_index(drop=True)
+    df["Datetime"] = instantes[~duplicadas]
+    df["Date"], df["Time"] = formatear_fecha_hora(df["Datetime"])
+
+    informe = evaluar_cobertura(df["Datetime"], dias_duplicadas)
+    informe["resumen"] = {
+        "filas_leidas": filas_leidas,
+        "filas_validas": len(df),
+        "malformadas": int(malformadas.sum()),
+        "ambiguas": int(ambiguas[~malformadas].sum()),
+        "fuera_de_orden": fuera_de_orden,
+        "duplicadas": int(duplicadas.sum()),
+        "huecos": len(informe["huecos"]),
+        "paso_segundos": informe["paso_segundos"],
+    }
+    return df, informe
+
+
+def evaluar_cobertura(datetimes, dias_duplicadas=None):
+    """Detecta los huecos de una serie ordenada y calcula la cobertura de cada día.
+
+    El paso de muestreo esperado es la mediana de los intervalos entre muestras.
+    """
+    instantes = datetimes.to_numpy(dtype="datetime64[s]").astype("int64")
+    intervalos = np.diff(instantes)
+    positivos = intervalos[intervalos > 0]
+    paso = float(np.median(positivos)) if len(positivos) else 1.0
+
+    # Huecos: intervalos mayores a FACTOR_HUECO veces el paso
+    posiciones = np.flatnonzero(intervalos > FACTOR_HUECO * paso)
+    inicios = instantes[posiciones]
+    fines = instantes[posiciones + 1]
+    huecos = pd.DataFrame({
+        "Desde": pd.to_datetime(inicios, unit="s"),
+        "Hasta": pd.to_datetime(fines, unit="s"),
+        "Duración (min)": np.round((fines - inicios) / 60, 1),
+        "Muestras faltantes": np.round((fines - inicios) / paso - 1).astype(int),
+    })
+
+    # Cobertura por día con bincount sobre el número de día
+    if len(instantes):
+        dia_muestra = instantes // SEGUNDOS_DIA
+        primer_dia = dia_muestra[0]
+        n_dias = int(dia_muestra[-1] - primer_dia + 1)
+        muestras = np.bincount(dia_muestra - primer_dia, minlength=n_dias)
+        huecos_dia = np.bincount(inicios // SEGUNDOS_DIA - primer_dia, minlength=n_dias)
+        if dias_duplicadas is not None and len(dias_duplicadas):
+            indices = dias_duplicadas.astype("int64") - primer_dia
+            duplicadas_dia = np.bincount(indices[(indices >= 0) & (indices < n_dias)], minlength=n_dias)
+        else:
+            duplicadas_dia = np.zeros(n_dias, dtype=int)
+        dias = pd.to_datetime((primer_dia + np.arange(n_dias)) * SEGUNDOS_DIA, unit="s")
+    else:
+        muestras = huecos_dia = duplicadas_dia = np.zeros(0, dtype=int)
+        dias = pd.DatetimeIndex([])
+
+    esperadas = SEGUNDOS_DIA / paso
+    cobertura = pd.DataFrame({
+        "Día": dias.strftime("%d/%m/%Y"),
+        "Muestras": muestras,
+        "Esperadas": int(round(esperadas)),
+        "Cobertura (%)": np.round(np.minimum(muestras / esperadas * 100, 100), 2),
+        "Huecos": huecos_dia,
+        "Duplicadas": duplicadas_dia,
+    })
+
+    return {"paso_segundos": paso, "huecos": huecos, "cobertura": cobertura}
@@ -0,0 +1,123 @@
+"""Comparación de dos campañas de medición (por ejemplo, antes y después de un cambio).
+
+Cada campaña se reduce a un perfil típico por hora del día o por día de la semana:
+los promedios por intervalo salen del índice de sumas acumuladas del conjunto (sin
+recorrer las muestras) y se acumulan por posición dentro del periodo. Los dos
+perfiles se alinean con un as-of join sobre el desfase dentro del periodo, así que
+las campañas no necesitan coincidir en fechas ni en cobertura.
+"""
+import numpy as np
+import pandas as pd
+
+from utils.estadisticas import COLUMNAS_DESBALANCE, COLUMNAS_VOLTAJE
+
+COLUMNAS_COMPARACION = COLUMNAS_VOLTAJE + COLUMNAS_DESBALANCE + ["PF_sum_AVG"]
+
+# Periodo de alineación y desfase de su inicio respecto a la época (1970-01-05 fue lunes)
+MODOS_ALINEACION = {
+    "Hora del día": (pd.Timedelta(days=1).value, 0),
+    "Día de la semana": (pd.Timedelta(days=7).value, pd.Timedelta(days=4).value),
+}
+
+# Intervalos de los perfiles; todos dividen el día exactamente
+INTERVALOS_PERFIL = {
+    "5 minutos": "5min",
+    "15 minutos": "15min",
+    "30 minutos": "30min",
+    "60 minutos": "60min",
+}
+
+DIAS_SEMANA = ["Lun", "Mar", "Mié", "Jue", "Vie", "Sáb", "Dom"]
+
+
+def perfil_tipico(indice, modo, intervalo):
+    """Promedio de cada canal por posición dentro del periodo (día o semana), en intervalos fijos.
+
+    Devuelve un DataFrame con la columna Desfase_s (segundos desde el inicio del
+    periodo), un renglón por intervalo con muestras y el número de muestras.
+    """
+    periodo, origen = MODOS_ALINEACION[modo]
+    paso = pd.Timedelta(intervalo).value
+    instantes = indice["instantes"]
+    columnas = [columna for columna in COLUMNAS_COMPARACION if columna in indice["columnas"]]
+    posiciones_columnas = [indice["columnas"].index(columna) for columna in columnas]
+
+    # Intervalos alineados a la medianoche que cubren toda la campaña
+    inicio = instantes[0] - (instantes[0] - origen) % paso
+    bordes = np.arange(inicio, instantes[-1] + paso + 1, paso)
+    posiciones = np.searchsorted(instantes, bordes)
+    sumas = np.diff(indice["sumas"][posiciones][:, posiciones_columnas], axis=0)
+    conteos = np.diff(indice["conteos"][posiciones][:, posiciones_columnas], axis=0)
+
+    # Acumulación por posición dentro del periodo
+    n_posiciones = periodo // paso
+    claves = ((bordes[:-1] - origen) % periodo) // paso
+    sumas_perfil = np.zeros((n_posiciones, len(columnas)))
+    conteos_perfil = np.zeros((n_posiciones, len(columnas)), dtype=np.int64)
+    np.add.at(sumas_perfil, claves, sumas)
+    np.add.at(conteos_perfil, claves, conteos)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        promedios = np.where(conteos_perfil > 0, sumas_perfil / conteos_perfil, np.nan)
+
+    perfil = pd.DataFrame(promedios, columns=columnas)
+    perfil.insert(0, "Desfase_s", np.arange(n_posiciones) * (paso // 10 ** 9))
+    perfil["Muestras"] = conteos_perfil.max(axis=1)
+    return perfil[perfil["Muestras"] > 0].reset_index(drop=True)
+
+
+def alinear_perfiles(perfil_antes, perfil_despues, intervalo):
+    """As-of join de los dos perfiles por desfase; los intervalos sin pareja quedan en NaN."""
+    tolerancia = int(pd.Timedelta(intervalo).total_seconds()) // 2
+    return pd.merge_asof(
+        perfil_antes, perfil_despues, on="Desfase_s", direction="nearest", tolerance=tolerancia,
+        suffixes=(" antes", " después")
+    )
+
+
+def etiquetas_desfase(desfases, modo):
+    """Etiquetas legibles del desfase: 'HH:MM' o 'Lun HH:MM'."""
+    desfases = np.asarray(desfases)
+    horas = (desfases % 86400) // 3600
+    minutos = (desfases % 3600) // 60
+    etiquetas = [f"{hora:02d}:{minuto:02d}" for hora, minuto in zip(horas, minutos)]
+    if modo == "Día de la semana":
+        etiquetas = [f"{DIAS_SEMANA[dia]} {etiqueta}" for dia, etiqueta in zip(desfases // 86400, etiquetas)]
+    return etiquetas
+
+
+def resumen_diferencias(alineado, modo, columnas=COLUMNAS_COMPARACION):
+    """Promedio de cada canal en ambas campañas, su diferencia y el intervalo con la mayor diferencia.
+
+    Solo se comparan los intervalos presentes en las dos campañas.
+    """
+    filas = []
+    for columna in columnas:
+        if f"{columna} antes" not in alineado or f"{columna} después" not in alineado:
+            continue
+        comunes = alineado[[f"{columna} antes", f"{columna} después", "Desfase_s"]].dropna()
+        if comunes.empty:
+            continue
+        antes = comunes[f"{columna} antes"].to_numpy()
+        despues = comunes[f"{columna} después"].to_numpy()
+        diferencias = despues - antes
+        mayor = int(np.argmax(np.abs(diferencias)))
+        filas.append({
+            "Variable": columna,
+            "Promedio antes": round(antes.mean(), 3),
+            "Promedio después": round(despues.mean(), 3),
+            "Diferencia": round(diferencias.mean(), 3),
+            "Diferencia (%)": round(diferencias.mean() / antes.mean() * 100, 2) if antes.mean() else np.nan,
+            "Mayor diferencia": round(diferencias[mayor], 3),
+            "En": etiquetas_desfase(comunes["Desfase_s"].to_numpy()[[mayor]], modo)[0],
+        })
+    return pd.DataFrame(filas)
+
+
+def tabla_diferencias(alineado, modo, columnas=COLUMNAS_COMPARACION):
+    """Diferencia (después − antes) de cada canal en cada intervalo del periodo."""
+    tabla = pd.DataFrame({"Intervalo": etiquetas_desfase(alineado["Desfase_s"], modo)})
+    for columna in columnas:
+        if f"{columna} antes" in alineado and f"{columna} después" in alineado:
+            tabla[columna] = (alineado[f"{columna} después"] - alineado[f"{columna} antes"]).round(3)
+    return tabla
@@ -0,0 +1,68 @@
+"""Persistencia en disco de los perfiles de configuración de alarmas por sitio."""
+import json
+import math
+import os
+import re
+
+DIRECTORIO_CONFIGURACIONES = os.environ.get("IELE_DIR_CONFIGURACIONES", "./configuraciones")
+
+# Valores por defecto de cada clave; los perfiles guardados antes de que existiera una
+# clave la toman de aquí al cargarse
+CONFIGURACION_POR_DEFECTO = {
+    "limite_superior_v": 0.0,
+    "valor_nominal_v": 0.0,
+    "limite_inferior_v": 0.0,
+    "umbral_corriente": 0.0,
+    "umbral_factor_potencia": 0.0,
+    "desbalance_moderado_v": 0.0,
+    "desbalance_critico_v": 0.0,
+    "desbalance_moderado_i": 0.0,
+    "desbalance_critico_i": 0.0,
+    "reglas": [],
+}
+
+
+def _ruta_sitio(sitio):
+    nombre = re.sub(r"[^\w\-]+", "_", sitio.strip()).strip("_")
+    if not nombre:
+        raise ValueError("El nombre del sitio no es válido.")
+    return os.path.join(DIRECTORIO_CONFIGURACIONES, f"{nombre}.json")
+
+
+def listar_sitios():
+    """Lista los sitios que tienen un perfil de configuración guardado."""
+    if not os.path.isdir(DIRECTORIO_CONFIGURACIONES):
+        return []
+    return sorted(
+        os.path.splitext(archivo)[0]
+        for archivo in os.listdir(DIRECTORIO_CONFIGURACIONES)
+        if archivo.endswith(".json")
+    )
+
+
+def duracion_regla(valor):
+    """Duración mínima de una regla en segundos; vacía, no numérica, negativa o no finita cuenta como 0."""
+    try:
+        duracion = float(valor)
+    except (TypeError, ValueError):
+        return 0.0
+    return duracion if math.isfinite(duracion) and duracion > 0 else 0.0
+
+
+def cargar_configuracion(sitio):
+    """Lee el perfil de configuración de un sitio, completando las claves que le falten."""
+    with open(_ruta_sitio(sitio), encoding="utf-8") as archivo:
+        config = {**CONFIGURACION_POR_DEFECTO, **json.load(archivo)}
+    config["reglas"] = [{**regla, "duracion_s": duracion_regla(regla.get("duracion_s"))} for regla in config["reglas"]]
+    return config
+
+
+def guardar_configuracion(sitio, config):
+    """Guarda el perfil de configuración de un sitio sin dejar archivos a medio escribir."""
+    os.makedirs(DIRECTORIO_CONFIGURACIONES, exist_ok=True)
+    ruta = _ruta_sitio(sitio)
+    ruta_temporal = f"{ruta}.tmp"
+    with open(ruta_temporal, "w", encoding="utf-8") as archivo:
+        json.dump(config, archivo, ensure_ascii=False, indent=2)
+    os.replace(ruta_temporal, ruta)
+    return ruta
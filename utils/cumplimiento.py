@@ -0,0 +1,52 @@
+"""Evaluación semanal de la calidad del voltaje al estilo EN 50160."""
+import pandas as pd
+
+from utils.agregados import promedios_por_intervalo
+
+COLUMNAS_VOLTAJE = ["U1_rms_AVG", "U2_rms_AVG", "U3_rms_AVG"]
+
+
+def evaluar_cumplimiento_semanal(df, valor_nominal_v, tolerancia=0.10, porcentaje_minimo=95.0,
+                                 limite_bajo_total=0.15, columnas=COLUMNAS_VOLTAJE):
+    """Evalúa por semana y fase los promedios de 10 minutos contra el voltaje nominal.
+
+    Una fase cumple en la semana si al menos `porcentaje_minimo` de los promedios de
+    10 minutos están dentro de ±`tolerancia` del nominal y todos están dentro de
+    [-`limite_bajo_total`, +`tolerancia`].
+    """
+    promedios = promedios_por_intervalo(df, columnas, "10min")
+
+    # Semanas de lunes a domingo
+    semanas = promedios.index.to_period("W-SUN").start_time
+
+    desviacion = (promedios - valor_nominal_v) / valor_nominal_v
+    validos = promedios.notna()
+    dentro = (desviacion.abs() <= tolerancia) & validos
+    dentro_total = (desviacion >= -limite_bajo_total) & (desviacion <= tolerancia) & validos
+
+    intervalos = validos.groupby(semanas).sum()
+    porcentaje_dentro = 100 * dentro.groupby(semanas).sum() / intervalos
+    porcentaje_total = 100 * dentro_total.groupby(semanas).sum() / intervalos
+
+    columna_tolerancia = f"% dentro ±{tolerancia * 100:g}%"
+    columna_total = f"% dentro -{limite_bajo_total * 100:g}%/+{tolerancia * 100:g}%"
+
+    tabla = pd.DataFrame({
+        "Intervalos": intervalos.stack(),
+        columna_tolerancia: porcentaje_dentro.stack().round(2),
+        columna_total: porcentaje_total.stack().round(2),
+    })
+    tabla.index.names = ["Semana", "Fase"]
+    tabla = tabla.reset_index()
+
+    tabla["Semana"] = (
+        tabla["Semana"].dt.strftime("%d/%m/%Y")
+        + " - "
+        + (tabla["Semana"] + pd.Timedelta(days=6)).dt.strftime("%d/%m/%Y")
+    )
+    tabla["Fase"] = tabla["Fase"].str.replace("_rms_AVG", "")
+    tabla["Cumple"] = (
+        (tabla[columna_tolerancia] >= porcentaje_minimo) & (tabla[columna_total] >= 100)
+    ).map({True: "Sí", False: "No"})
+
+    return tabla
@@ -0,0 +1,128 @@
+"""Servidor local de descargas en streaming para las exportaciones de datos.
+
+st.download_button entrega el archivo terminado como bytes, así que una exportación
+de millones de filas tendría que existir completa en memoria. Las exportaciones se
+sirven en cambio desde un servidor HTTP pequeño dentro del mismo proceso: la página
+registra la exportación y muestra un enlace; al abrirlo, los bloques de
+iterar_bloques se convierten y se escriben en la conexión uno a uno, con
+Transfer-Encoding: chunked, sin límite de filas.
+
+El servidor escucha en IELE_HOST_DESCARGAS:IELE_PUERTO_DESCARGAS (127.0.0.1:8503 por
+defecto) y los enlaces usan IELE_URL_DESCARGAS si el navegador lo ve en otra dirección.
+"""
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote
+
+from utils.exportacion import escribir_bloques, iterar_bloques
+
+HOST_DESCARGAS = os.environ.get("IELE_HOST_DESCARGAS", "127.0.0.1")
+PUERTO_DESCARGAS = int(os.environ.get("IELE_PUERTO_DESCARGAS", "8503"))
+URL_DESCARGAS = os.environ.get("IELE_URL_DESCARGAS", f"http://localhost:{PUERTO_DESCARGAS}")
+
+# Máximo de exportaciones registradas; se descartan las más antiguas
+MAX_DESCARGAS = 32
+
+TIPOS_CONTENIDO = {"CSV": "text/csv; charset=utf-8", "Parquet": "application/octet-stream"}
+
+_descargas = OrderedDict()
+_candado = threading.Lock()
+_servidor = None
+
+
+class _SalidaFragmentada:
+    """Destino binario que envía cada escritura como un fragmento HTTP (chunked)."""
+
+    def __init__(self, conexion):
+        self.conexion = conexion
+        self.closed = False
+
+    def write(self, datos):
+        if datos:
+            self.conexion.write(f"{len(datos):X}\r\n".encode("ascii") + bytes(datos) + b"\r\n")
+        return len(datos)
+
+    def flush(self):
+        self.conexion.flush()
+
+    def close(self):
+        self.closed = True
+
+
+class ManejadorDescargas(BaseHTTPRequestHandler):
+    """Atiende GET /descargas/<token> escribiendo la exportación registrada por bloques."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        partes = [parte for parte in self.path.split("?")[0].split("/") if parte]
+        with _candado:
+            descarga = _descargas.get(partes[1]) if len(partes) == 2 and partes[0] == "descargas" else None
+
+        if descarga is None:
+            cuerpo = "Descarga no encontrada o vencida; vuelva a generarla desde la página de Reporte.".encode("utf-8")
+            self.send_response(404)
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+            self.send_header("Content-Length", str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", TIPOS_CONTENIDO[descarga["formato"]])
+        self.send_header("Content-Disposition", f"attachment; filename*=UTF-8''{quote(descarga['nombre'])}")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+
+        bloques = iterar_bloques(descarga["df"], descarga["desde"], descarga["hasta"], intervalo=descarga["intervalo"])
+        try:
+            escribir_bloques(bloques, descarga["formato"], _SalidaFragmentada(self.wfile))
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # El navegador canceló la descarga
+            self.close_connection = True
+        except Exception as error:
+            # Ya se enviaron los encabezados: se corta la conexión sin el fragmento final para que
+            # el navegador marque la descarga como incompleta
+            self.log_error("Error exportando %s: %r", self.path, error)
+            self.close_connection = True
+
+    def log_message(self, formato, *args):
+        # Sin una línea por petición en la consola de Streamlit
+        pass
+
+
+def _iniciar_servidor():
+    """Levanta el servidor de descargas la primera vez que se registra una."""
+    global _servidor
+    if _servidor is None:
+        _servidor = ThreadingHTTPServer((HOST_DESCARGAS, PUERTO_DESCARGAS), ManejadorDescargas)
+        _servidor.daemon_threads = True
+        threading.Thread(target=_servidor.serve_forever, name="iele-descargas", daemon=True).start()
+
+
+def registrar_descarga(df, desde, hasta, intervalo, formato, nombre):
+    """Registra la exportación del rango [desde, hasta) y devuelve el enlace que la descarga.
+
+    Una misma exportación pedida de nuevo (por ejemplo en cada rerun) reutiliza su enlace.
+    """
+    clave = (id(df), str(desde), str(hasta), intervalo, formato)
+    with _candado:
+        _iniciar_servidor()
+        for token, descarga in _descargas.items():
+            if descarga["clave"] == clave:
+                _descargas.move_to_end(token)
+                break
+        else:
+            token = uuid.uuid4().hex
+            _descargas[token] = {
+                "clave": clave, "df": df, "desde": desde, "hasta": hasta,
+                "intervalo": intervalo, "formato": formato, "nombre": nombre,
+            }
+            while len(_descargas) > MAX_DESCARGAS:
+                _descargas.popitem(last=False)
+    return f"{URL_DESCARGAS}/descargas/{token}"
@@ -0,0 +1,174 @@
+"""Agrupamiento de días típicos a partir de los perfiles de carga de 24 horas.
+
+Cada día se reduce a un vector con el perfil de la corriente total y el del factor de
+potencia (24 promedios horarios o 96 de 15 minutos), sacados del índice de sumas
+acumuladas sin recorrer las muestras. Los días se agrupan con k-means vectorizado
+(inicialización k-means++ y varias semillas), y cada grupo se nombra según su nivel
+de carga y los días de la semana que reúne.
+"""
+import numpy as np
+import pandas as pd
+
+from utils.cache_datos import obtener_derivado
+from utils.estadisticas import COLUMNAS_CORRIENTE
+from utils.indice_acumulado import indice_compartido, promedios_intervalo
+
+RESOLUCIONES_PERFIL = {
+    "24 horas": "60min",
+    "96 × 15 minutos": "15min",
+}
+
+# Días con menos de esta fracción de intervalos con datos no se agrupan
+COBERTURA_MINIMA = 0.5
+
+DIAS_SEMANA = ["Lun", "Mar", "Mié", "Jue", "Vie", "Sáb", "Dom"]
+
+
+def matriz_perfiles(indice, intervalo):
+    """Perfiles diarios de corriente total (suma de fases) y PF, un renglón por día.
+
+    Devuelve los días, la matriz de corriente y la de PF (días × intervalos del día),
+    con NaN en los intervalos sin muestras.
+    """
+    primer_dia = pd.Timestamp(indice["instantes"][0]).normalize()
+    ultimo_dia = pd.Timestamp(indice["instantes"][-1]).normalize()
+    n_dias = (ultimo_dia - primer_dia).days + 1
+    por_dia = pd.Timedelta(days=1) // pd.Timedelta(intervalo)
+
+    promedios = promedios_intervalo(indice, primer_dia, ultimo_dia + pd.Timedelta(days=1), intervalo)
+    corriente = promedios[COLUMNAS_CORRIENTE].to_numpy().sum(axis=1).reshape(n_dias, por_dia)
+    pf = promedios["PF_sum_AVG"].to_numpy().reshape(n_dias, por_dia)
+    return pd.date_range(primer_dia, periods=n_dias, freq="D"), corriente, pf
+
+
+def kmeans(datos, k, semillas=5, iteraciones=100, semilla=0):
+    """K-means de Lloyd vectorizado con inicialización k-means++; se queda con la semilla de menor inercia."""
+    rng = np.random.default_rng(semilla)
+    normas = (datos ** 2).sum(axis=1)
+    mejor = None
+
+    for _ in range(semillas):
+        # k-means++: cada centro nuevo se elige con probabilidad proporcional a la distancia al más cercano
+        centros = [datos[rng.integers(len(datos))]]
+        distancias = ((datos - centros[0]) ** 2).sum(axis=1)
+        for _ in range(1, k):
+            probabilidades = distancias / distancias.sum() if distancias.sum() > 0 else None
+            centros.append(datos[rng.choice(len(datos), p=probabilidades)])
+            distancias = np.minimum(distancias, ((datos - centros[-1]) ** 2).sum(axis=1))
+        centros = np.array(centros)
+
+        etiquetas = None
+        for _ in range(iteraciones):
+            # Distancias de todos los días a todos los centros en una operación matricial
+            distancias = normas[:, None] - 2 * datos @ centros.T + (centros ** 2).sum(axis=1)[None, :]
+            nuevas = distancias.argmin(axis=1)
+            if etiquetas is not None and np.array_equal(nuevas, etiquetas):
+                break
+            etiquetas = nuevas
+
+            conteos = np.bincount(etiquetas, minlength=k)
+            sumas = np.zeros_like(centros)
+            np.add.at(sumas, etiquetas, datos)
+            # Un grupo vacío conserva su centro anterior
+            centros = np.where(conteos[:, None] > 0, sumas / np.maximum(conteos, 1)[:, None], centros)
+
+        inercia = np.maximum(distancias[np.arange(len(datos)), etiquetas], 0).sum()
+        if mejor is None or inercia < mejor[2]:
+            mejor = (etiquetas, centros, inercia)
+
+    return mejor
+
+
+def _nombrar_grupos(etiquetas, dias, corriente_media, k):
+    """Nombre descriptivo de cada grupo según su nivel de carga y los días de la semana que reúne."""
+    nombres = []
+    nivel_maximo = np.nanmax(corriente_media)
+    fin_de_semana = dias.weekday >= 5
+    for grupo in range(k):
+        miembros = etiquetas == grupo
+        if corriente_media[grupo] < 0.5 * nivel_maximo:
+            nombre = "Parada / baja carga"
+        elif fin_de_semana[miembros].mean() >= 0.6:
+            nombre = "Fin de semana"
+        elif (~fin_de_semana[miembros]).mean() >= 0.8:
+            nombre = "Día laboral"
+        else:
+            nombre = "Mixto"
+        nombres.append(nombre)
+
+    # Se numeran los nombres repetidos
+    for nombre in set(nombres):
+        repetidos = [grupo for grupo in range(k) if nombres[grupo] == nombre]
+        if len(repetidos) > 1:
+            for numero, grupo in enumerate(repetidos, start=1):
+                nombres[grupo] = f"{nombre} {numero}"
+    return nombres
+
+
+def agrupar_dias(indice, intervalo, k):
+    """Agrupa los días por su perfil de corriente total y PF.
+
+    Devuelve un diccionario con la pertenencia de cada día, los centroides en
+    unidades originales (k × intervalos del día), el resumen por grupo y la inercia.
+    """
+    dias, corriente, pf = matriz_perfiles(indice, intervalo)
+
+    # Se descartan los días con poca cobertura y se rellenan los huecos con el promedio del intervalo
+    cobertura = (~np.isnan(corriente) & ~np.isnan(pf)).mean(axis=1)
+    seleccion = cobertura >= COBERTURA_MINIMA
+    dias, corriente, pf = dias[seleccion], corriente[seleccion], pf[seleccion]
+    k = min(k, len(dias))
+    if k == 0:
+        return None
+    with np.errstate(invalid="ignore"):
+        corriente = np.where(np.isnan(corriente), np.nanmean(corriente, axis=0), corriente)
+        pf = np.where(np.isnan(pf), np.nanmean(pf, axis=0), pf)
+    corriente, pf = np.nan_to_num(corriente), np.nan_to_num(pf)
+
+    # Cada bloque se escala por su desviación global para que corriente y PF pesen parecido
+    escala_corriente = corriente.std() or 1.0
+    escala_pf = pf.std() or 1.0
+    datos = np.hstack([corriente / escala_corriente, pf / escala_pf])
+
+    etiquetas, centros, inercia = kmeans(datos, k)
+    por_dia = corriente.shape[1]
+    centroides_corriente = centros[:, :por_dia] * escala_corriente
+    centroides_pf = centros[:, por_dia:] * escala_pf
+
+    nombres = _nombrar_grupos(etiquetas, dias, centroides_corriente.mean(axis=1), k)
+    paso_horas = 24 / por_dia
+
+    resumen = pd.DataFrame({
+        "Grupo": nombres,
+        "Días": np.bincount(etiquetas, minlength=k),
+        **{dia: np.bincount(etiquetas[dias.weekday == numero], minlength=k) for numero, dia in enumerate(DIAS_SEMANA)},
+        "I total promedio (A)": centroides_corriente.mean(axis=1).round(1),
+        "I total pico (A)": centroides_corriente.max(axis=1).round(1),
+        "Hora del pico": [f"{int(hora):02d}:{int(round(hora % 1 * 60)):02d}"
+                          for hora in centroides_corriente.argmax(axis=1) * paso_horas],
+        "PF promedio": centroides_pf.mean(axis=1).round(3),
+    })
+
+    pertenencia = pd.DataFrame({
+        "Fecha": dias,
+        "Día": dias.strftime("%d/%m/%Y"),
+        "Día de la semana": [DIAS_SEMANA[numero] for numero in dias.weekday],
+        "Grupo": np.array(nombres, dtype=object)[etiquetas],
+        "Número de grupo": etiquetas,
+    })
+
+    return {
+        "pertenencia": pertenencia,
+        "resumen": resumen,
+        "nombres": nombres,
+        "centroides_corriente": centroides_corriente,
+        "centroides_pf": centroides_pf,
+        "inercia": inercia,
+    }
+
+
+def dias_tipicos_compartidos(huella, df, intervalo, k):
+    """Agrupamiento desde la caché compartida, por resolución y número de grupos."""
+    return obtener_derivado(
+        huella, ("dias_tipicos", intervalo, k), lambda: agrupar_dias(indice_compartido(huella, df), intervalo, k)
+    )
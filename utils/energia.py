@@ -0,0 +1,123 @@
+"""Energía y demanda para facturación.
+
+La potencia activa total se integra en el tiempo con la regla del trapecio, sin
+cruzar los huecos del muestreo, y se acumula en kWh por hora y por día. La demanda
+es la potencia media de una ventana móvil (15 minutos por defecto) y se obtiene de
+la energía acumulada, así que todo el conjunto se procesa en un solo paso
+vectorizado.
+"""
+import numpy as np
+import pandas as pd
+
+from utils.calidad import FACTOR_HUECO, SEGUNDOS_DIA
+
+COLUMNA_POTENCIA_TOTAL = "P_sum_AVG"
+COLUMNAS_POTENCIA_FASE = ["P1_AVG", "P2_AVG", "P3_AVG"]
+COLUMNAS_VOLTAJE = ["U1_rms_AVG", "U2_rms_AVG", "U3_rms_AVG"]
+COLUMNAS_CORRIENTE = ["I1_rms_AVG", "I2_rms_AVG", "I3_rms_AVG"]
+
+VENTANA_DEMANDA_MINUTOS = 15
+
+# Fracción mínima de la ventana con datos para que su demanda sea válida
+COBERTURA_MINIMA_VENTANA = 0.9
+
+
+def potencia_total(df):
+    """Potencia activa total en kW y el nombre de la fuente usada.
+
+    Usa la columna de potencia total o la suma de las fases si el analizador las
+    registra; si no, la aproxima como Σ U·I por fase multiplicada por el PF total.
+    """
+    if COLUMNA_POTENCIA_TOTAL in df.columns:
+        return df[COLUMNA_POTENCIA_TOTAL].to_numpy(dtype=float) / 1000, COLUMNA_POTENCIA_TOTAL
+    if all(columna in df.columns for columna in COLUMNAS_POTENCIA_FASE):
+        return df[COLUMNAS_POTENCIA_FASE].to_numpy(dtype=float).sum(axis=1) / 1000, " + ".join(COLUMNAS_POTENCIA_FASE)
+
+    voltajes = df[COLUMNAS_VOLTAJE].to_numpy(dtype=float)
+    corrientes = df[COLUMNAS_CORRIENTE].to_numpy(dtype=float)
+    aparente = (voltajes * corrientes).sum(axis=1)
+    return aparente * df["PF_sum_AVG"].to_numpy(dtype=float) / 1000, "U·I·PF"
+
+
+def calcular_energia(df, ventana_minutos=VENTANA_DEMANDA_MINUTOS):
+    """Energía por hora y por día, demanda móvil por muestra y demanda máxima de cada día.
+
+    Supone la serie ordenada por Datetime, como la deja la ingesta.
+    """
+    instantes = df["Datetime"].to_numpy(dtype="datetime64[s]").astype("int64")
+    potencia, fuente = potencia_total(df)
+
+    if len(instantes) < 2:
+        raise ValueError("Se necesitan al menos dos muestras para calcular energía.")
+
+    # Trapecios entre muestras consecutivas; los intervalos que cruzan un hueco no suman
+    intervalos = np.diff(instantes)
+    positivos = intervalos[intervalos > 0]
+    paso = float(np.median(positivos)) if len(positivos) else 1.0
+    validos = (intervalos > 0) & (intervalos <= FACTOR_HUECO * paso) & np.isfinite(potencia[:-1]) & np.isfinite(potencia[1:])
+    segundos_validos = np.where(validos, intervalos, 0)
+    energia_intervalo = np.where(validos, (potencia[:-1] + potencia[1:]) / 2, 0) * segundos_validos / 3600
+
+    # kWh por hora: cada intervalo se asigna a la hora en que empieza
+    primera_hora = instantes[0] // 3600
+    posicion_hora = instantes[:-1] // 3600 - primera_hora
+    n_horas = int(instantes[-1] // 3600 - primera_hora + 1)
+    energia_hora = np.bincount(posicion_hora, weights=energia_intervalo, minlength=n_horas)
+    cubierto_hora = np.bincount(posicion_hora, weights=segundos_validos, minlength=n_horas)
+
+    # Demanda: energía de la ventana que termina en cada muestra, desde la energía acumulada
+    ventana = ventana_minutos * 60
+    energia_acumulada = np.concatenate(([0.0], np.cumsum(energia_intervalo)))
+    tiempo_acumulado = np.concatenate(([0.0], np.cumsum(segundos_validos)))
+    inicio_ventana = instantes - ventana
+    demanda = (energia_acumulada - np.interp(inicio_ventana, instantes, energia_acumulada)) * 3600 / ventana
+    cobertura_ventana = tiempo_acumulado - np.interp(inicio_ventana, instantes, tiempo_acumulado)
+    demanda[cobertura_ventana < COBERTURA_MINIMA_VENTANA * ventana] = np.nan
+
+    # Por día: energía, cobertura y ventana de demanda máxima
+    horas = pd.to_datetime((primera_hora + np.arange(n_horas)) * 3600, unit="s")
+    primer_dia = instantes[0] // SEGUNDOS_DIA
+    n_dias = int(instantes[-1] // SEGUNDOS_DIA - primer_dia + 1)
+    posicion_dia_hora = (primera_hora + np.arange(n_horas)) * 3600 // SEGUNDOS_DIA - primer_dia
+    energia_dia = np.bincount(posicion_dia_hora, weights=energia_hora, minlength=n_dias)
+    cubierto_dia = np.bincount(posicion_dia_hora, weights=cubierto_hora, minlength=n_dias)
+
+    posicion_dia = instantes // SEGUNDOS_DIA - primer_dia
+    demanda_comparable = np.where(np.isnan(demanda), -np.inf, demanda)
+    pico_dia = np.full(n_dias, -np.inf)
+    np.maximum.at(pico_dia, posicion_dia, demanda_comparable)
+    # Primera muestra de cada día que alcanza su pico
+    candidatas = np.flatnonzero((demanda_comparable == pico_dia[posicion_dia]) & np.isfinite(demanda_comparable))
+    dias_con_pico, primeras = np.unique(posicion_dia[candidatas], return_index=True)
+    hora_pico = np.full(n_dias, None, dtype=object)
+    hora_pico[dias_con_pico] = pd.to_datetime(instantes[candidatas[primeras]], unit="s").strftime("%H:%M:%S")
+
+    dias = pd.to_datetime((primer_dia + np.arange(n_dias)) * SEGUNDOS_DIA, unit="s")
+    tabla_dias = pd.DataFrame({
+        "Día": dias.strftime("%d/%m/%Y"),
+        "Energía (kWh)": np.round(energia_dia, 2),
+        f"Demanda máxima {ventana_minutos} min (kW)": np.round(np.where(np.isfinite(pico_dia), pico_dia, np.nan), 2),
+        "Hora demanda máxima": hora_pico,
+        "Cobertura (%)": np.round(cubierto_dia / SEGUNDOS_DIA * 100, 1),
+    })
+
+    return {
+        "fuente": fuente,
+        "ventana_minutos": ventana_minutos,
+        "horas": pd.DataFrame(
+            {"Energía (kWh)": energia_hora, "Cobertura (%)": cubierto_hora / 3600 * 100},
+            index=pd.DatetimeIndex(horas, name="Hora"),
+        ),
+        "dias": tabla_dias,
+        "demanda": demanda,
+    }
+
+
+def energia_del_dia(resultado, dia):
+    """Energía por hora (0 a 23) de un día dd/mm/aaaa y su fila del resumen diario."""
+    inicio = pd.to_datetime(dia, format="%d/%m/%Y")
+    horas = resultado["horas"]
+    energia = horas.loc[inicio:inicio + pd.Timedelta(hours=23), "Energía (kWh)"]
+    energia = energia.set_axis(energia.index.hour).reindex(range(24))
+    fila = resultado["dias"][resultado["dias"]["Día"] == dia]
+    return energia, (fila.iloc[0] if len(fila) else None)
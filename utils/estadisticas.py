@@ -0,0 +1,62 @@
+"""Estadísticas de un día o rango de mediciones, compartidas por las páginas y la API local."""
+import numpy as np
+import pandas as pd
+
+COLUMNAS_VOLTAJE = ["U1_rms_AVG", "U2_rms_AVG", "U3_rms_AVG"]
+COLUMNAS_CORRIENTE = ["I1_rms_AVG", "I2_rms_AVG", "I3_rms_AVG"]
+COLUMNAS_DESBALANCE = ["Uunb_AVG", "Iunb_AVG"]
+
+PERCENTILES_VOLTAJE = {"99%": 0.99, "95%": 0.95, "90%": 0.90}
+
+
+def cuartiles_voltaje(df_dia, decimales=None):
+    """Percentiles 99, 95 y 90 % de los voltajes RMS L-N de cada fase."""
+    tabla = df_dia[COLUMNAS_VOLTAJE].quantile(list(PERCENTILES_VOLTAJE.values()))
+    tabla.index = list(PERCENTILES_VOLTAJE.keys())
+    tabla.columns = [columna.replace("_rms_AVG", "") for columna in COLUMNAS_VOLTAJE]
+    return tabla.round(decimales) if decimales is not None else tabla
+
+
+def pf_horario(df_dia):
+    """Promedio del factor de potencia de cada hora de 0 a 23 (NaN en las horas sin datos)."""
+    return df_dia.groupby(df_dia["Datetime"].dt.hour)["PF_sum_AVG"].mean().reindex(range(24))
+
+
+def estadisticas_periodo(df_periodo):
+    """Resumen de un día o rango: muestras, mínimos, máximos y promedios por canal."""
+    canales = COLUMNAS_VOLTAJE + COLUMNAS_CORRIENTE + COLUMNAS_DESBALANCE + ["PF_sum_AVG"]
+    canales = [canal for canal in canales if canal in df_periodo.columns]
+    resumen = df_periodo[canales].agg(["min", "max", "mean"])
+
+    return {
+        "muestras": int(len(df_periodo)),
+        "desde": df_periodo["Datetime"].min(),
+        "hasta": df_periodo["Datetime"].max(),
+        "canales": {
+            canal: {
+                "minimo": resumen.at["min", canal],
+                "maximo": resumen.at["max", canal],
+                "promedio": resumen.at["mean", canal],
+            }
+            for canal in canales
+        },
+    }
+
+
+def a_json(valor):
+    """Convierte recursivamente tipos de NumPy y pandas a tipos serializables en JSON."""
+    if isinstance(valor, dict):
+        return {str(clave): a_json(v) for clave, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [a_json(v) for v in valor]
+    if isinstance(valor, pd.DataFrame):
+        return {str(fila): a_json(valores) for fila, valores in valor.to_dict(orient="index").items()}
+    if isinstance(valor, pd.Series):
+        return {str(clave): a_json(v) for clave, v in valor.items()}
+    if isinstance(valor, pd.Timestamp):
+        return None if pd.isna(valor) else valor.isoformat()
+    if isinstance(valor, (np.integer,)):
+        return int(valor)
+    if isinstance(valor, (float, np.floating)):
+        return None if np.isnan(valor) else float(valor)
+    return valor
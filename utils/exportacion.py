@@ -0,0 +1,88 @@
+"""Exportación por bloques de los datos filtrados, crudos o agregados, a CSV o Parquet.
+
+Los datos se recorren día por día (y en bloques de a lo sumo `filas_por_bloque`
+filas), de modo que una exportación larga nunca existe completa en memoria: cada
+bloque se convierte y se escribe al destino (un archivo o la conexión de una
+descarga) antes de procesar el siguiente.
+"""
+import numpy as np
+import pandas as pd
+
+from utils.agregados import promedios_por_intervalo
+
+FORMATOS_EXPORTACION = {"CSV": ".csv", "Parquet": ".parquet"}
+
+
+def columnas_numericas(df):
+    """Columnas de medición exportables (todas las numéricas)."""
+    return [columna for columna in df.columns if pd.api.types.is_numeric_dtype(df[columna])]
+
+
+def filas_exportacion(df, desde, hasta, intervalo=None):
+    """Filas que tendría la exportación del rango [desde, hasta); si se agrega, una cota superior."""
+    instantes = df["Datetime"].to_numpy(dtype="datetime64[ns]")
+    filas = int(((instantes >= np.datetime64(pd.Timestamp(desde), "ns")) & (instantes < np.datetime64(pd.Timestamp(hasta), "ns"))).sum())
+    if intervalo is None:
+        return filas
+    return min(filas, int(np.ceil((pd.Timestamp(hasta) - pd.Timestamp(desde)) / pd.Timedelta(intervalo))))
+
+
+def iterar_bloques(df, desde, hasta, intervalo=None, columnas=None, filas_por_bloque=100_000):
+    """Genera DataFrames consecutivos del rango [desde, hasta), en orden cronológico.
+
+    Si `intervalo` es None se exportan las muestras crudas; si no, los promedios por
+    intervalo (por ejemplo "15min"), calculados día por día.
+    """
+    columnas = columnas or columnas_numericas(df)
+    instantes = df["Datetime"].to_numpy(dtype="datetime64[ns]")
+    en_rango = (instantes >= np.datetime64(pd.Timestamp(desde), "ns")) & (instantes < np.datetime64(pd.Timestamp(hasta), "ns"))
+
+    posiciones = np.flatnonzero(en_rango)
+    posiciones = posiciones[np.argsort(instantes[posiciones], kind="stable")]
+    if len(posiciones) == 0:
+        return
+
+    # Cortes en cada cambio de día y cada `filas_por_bloque` filas
+    dias = instantes[posiciones].view("int64") // pd.Timedelta(days=1).value
+    cortes_dia = np.flatnonzero(np.diff(dias)) + 1
+    limites = np.concatenate(([0], cortes_dia, [len(posiciones)]))
+
+    for inicio_dia, fin_dia in zip(limites[:-1], limites[1:]):
+        if intervalo is not None:
+            bloque = df.iloc[posiciones[inicio_dia:fin_dia]]
+            yield promedios_por_intervalo(bloque, columnas, intervalo).reset_index()
+            continue
+
+        for inicio in range(inicio_dia, fin_dia, filas_por_bloque):
+            bloque = df.iloc[posiciones[inicio:min(inicio + filas_por_bloque, fin_dia)]]
+            yield bloque[["Datetime"] + columnas]
+
+
+def bloques_csv(bloques):
+    """Convierte cada bloque a bytes CSV; solo el primero lleva encabezado."""
+    for i, bloque in enumerate(bloques):
+        yield bloque.to_csv(index=False, header=(i == 0), date_format="%Y-%m-%d %H:%M:%S").encode("utf-8")
+
+
+def escribir_bloques(bloques, formato, salida):
+    """Escribe los bloques, uno a la vez, en un destino binario abierto (archivo o conexión)."""
+    if formato == "CSV":
+        for trozo in bloques_csv(bloques):
+            salida.write(trozo)
+        return
+
+    # Parquet: un grupo de filas por bloque con pyarrow
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    escritor = None
+    try:
+        for bloque in bloques:
+            tabla = pa.Table.from_pandas(bloque, preserve_index=False)
+            if escritor is None:
+                escritor = pq.ParquetWriter(salida, tabla.schema)
+            escritor.write_table(tabla)
+    finally:
+        if escritor is not None:
+            escritor.close()
+
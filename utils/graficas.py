@@ -0,0 +1,276 @@
+"""Especificación de las gráficas del día con dos renderizadores: plotly y matplotlib.
+
+Cada gráfica se describe con un diccionario (tipo, títulos, series, umbrales y
+leyenda) armado con datos que se calculan una vez por conjunto y se guardan en la
+caché compartida. El Dashboard la dibuja con plotly y el reporte PDF con matplotlib,
+así que ambos muestran lo mismo sin recalcular agregados. plotly y matplotlib se
+importan dentro de cada renderizador para que ninguna página cargue los dos.
+"""
+import numpy as np
+import pandas as pd
+
+from utils.agregados import promedios_dia_hora, promedios_por_intervalo
+from utils.cache_datos import obtener_derivado
+from utils.estadisticas import COLUMNAS_CORRIENTE, COLUMNAS_VOLTAJE
+
+COLUMNAS_HORARIAS = COLUMNAS_VOLTAJE + COLUMNAS_CORRIENTE + ["PF_sum_AVG"]
+
+COLORES_COLUMNAS = {
+    "U1_rms_AVG": "blue",
+    "U2_rms_AVG": "red",
+    "U3_rms_AVG": "green",
+    "I1_rms_AVG": "blue",
+    "I2_rms_AVG": "red",
+    "I3_rms_AVG": "green",
+}
+
+ETIQUETAS_HORAS = [f"{h:02d}:00" for h in range(24)]
+
+
+# ----------------------------------
+# 📦 Datos cacheados
+# ----------------------------------
+
+def pivote_horario(huella, df):
+    """Pivote día × hora de COLUMNAS_HORARIAS de todo el conjunto, guardado en la caché compartida."""
+    return obtener_derivado(
+        huella, ("dia_hora", tuple(COLUMNAS_HORARIAS)), lambda: promedios_dia_hora(df, COLUMNAS_HORARIAS)
+    )
+
+
+def datos_dia(huella, df, dia):
+    """Promedios horarios de voltaje, corriente y PF y corriente promedio por fase de un día.
+
+    Salen de dos agregados del conjunto completo guardados en la caché (día × hora y
+    promedio diario), así que pedir otro día o volver a pedir el mismo no recorre los
+    datos crudos.
+    """
+    dias, matrices = pivote_horario(huella, df)
+    diarios = obtener_derivado(
+        huella, ("promedios_diarios", tuple(COLUMNAS_CORRIENTE)), lambda: promedios_por_intervalo(df, COLUMNAS_CORRIENTE, "1D")
+    )
+
+    fecha = pd.to_datetime(dia, format="%d/%m/%Y")
+    posicion = dias.get_loc(fecha)
+    return {
+        "horas": fecha + pd.to_timedelta(np.arange(24), unit="h"),
+        "voltaje": matrices[0:3, posicion].T,
+        "corriente": matrices[3:6, posicion].T,
+        "pf": matrices[6, posicion],
+        "corriente_promedio": [round(valor, 2) for valor in diarios.loc[fecha].tolist()],
+    }
+
+
+# ----------------------------------
+# 📐 Especificaciones
+# ----------------------------------
+
+def _spec_lineas_fases(x, valores, columnas, titulo, eje_y, umbrales):
+    return {
+        "tipo": "lineas",
+        "titulo": titulo,
+        "eje_x": "Fecha y Hora",
+        "eje_y": eje_y,
+        "x": x,
+        "series": [
+            {"nombre": columna.replace("_rms_AVG", ""), "y": valores[:, posicion], "color": COLORES_COLUMNAS.get(columna, "black")}
+            for posicion, columna in enumerate(columnas)
+        ],
+        "umbrales": umbrales,
+        "titulo_leyenda": "Medidas",
+        "formato_x": "%H:%M",
+    }
+
+
+def spec_voltaje(x, valores, config, titulo="Gráfica Voltaje Promedio"):
+    """Voltaje de las tres fases con los límites superior, nominal e inferior."""
+    return _spec_lineas_fases(x, valores, COLUMNAS_VOLTAJE, titulo, "Voltaje (V)", [
+        {"valor": config["limite_superior_v"], "nombre": "Límite Superior", "color": "red", "estilo": "dash", "ancho": 4},
+        {"valor": config["valor_nominal_v"], "nombre": "Valor Nominal", "color": "grey", "estilo": "dash", "ancho": 4},
+        {"valor": config["limite_inferior_v"], "nombre": "Límite Inferior", "color": "blue", "estilo": "dash", "ancho": 4},
+    ])
+
+
+def spec_corriente(x, valores, corriente_nominal, titulo="Gráfica corriente promedio"):
+    """Corriente de las tres fases con la corriente nominal."""
+    return _spec_lineas_fases(x, valores, COLUMNAS_CORRIENTE, titulo, "Corriente (A)", [
+        {"valor": corriente_nominal, "nombre": "Corriente Nominal", "color": "grey", "estilo": "dash", "ancho": 4},
+    ])
+
+
+def spec_promedio_corriente(promedios, corriente_nominal):
+    """Barras de corriente promedio por fase con el umbral en la leyenda."""
+    return {
+        "tipo": "barras",
+        "titulo": "Corriente promedio por fase",
+        "eje_x": "Fase",
+        "eje_y": "Corriente (A)",
+        "x": ["Fase A", "Fase B", "Fase C"],
+        "y": promedios,
+        "colores": ["blue", "red", "green"],
+        "textos": [f"{valor:.2f}" for valor in promedios],
+        "umbrales": [
+            {"valor": corriente_nominal, "nombre": f"Umbral {corriente_nominal} A", "color": "orange", "estilo": "solid", "ancho": 5, "en_leyenda": True},
+        ],
+    }
+
+
+def spec_factor_potencia(pf_horas, umbral_factor_potencia, etiquetas=None, titulo="Promedio de factor de potencia por Hora"):
+    """Barras del PF promedio de cada hora (o de cada intervalo de `etiquetas`), coloreadas por estado."""
+    pf_horas = np.asarray(pf_horas, dtype=float)
+    anormal = (pf_horas < umbral_factor_potencia) | (pf_horas > 1)
+    return {
+        "tipo": "barras",
+        "titulo": titulo,
+        "eje_x": "Hora del Día",
+        "eje_y": "Factor de Potencia",
+        "x": ETIQUETAS_HORAS if etiquetas is None else list(etiquetas),
+        "y": pf_horas,
+        "colores": np.where(np.isnan(pf_horas), "lightgrey", np.where(anormal, "red", "blue")).tolist(),
+        # Con muchas barras los valores encima no se alcanzan a leer
+        "textos": [f"{valor:.3f}" if not np.isnan(valor) and len(pf_horas) <= 48 else "" for valor in pf_horas],
+        "umbrales": [],
+        "leyenda": [
+            {"nombre": f"Normal (≥ {umbral_factor_potencia} y ≤ 1)", "color": "blue"},
+            {"nombre": f"Anormal (< {umbral_factor_potencia} o > 1)", "color": "red"},
+        ],
+        "titulo_leyenda": "Estado del PF",
+        "rango_y": (0, 1.1),
+        "paso_y": 0.05,
+    }
+
+
+def spec_energia_horaria(energia_horas):
+    """Barras de energía por hora del día."""
+    energia_horas = np.asarray(energia_horas, dtype=float)
+    return {
+        "tipo": "barras",
+        "titulo": "Energía por hora",
+        "eje_x": "Hora del Día",
+        "eje_y": "Energía (kWh)",
+        "x": ETIQUETAS_HORAS,
+        "y": energia_horas,
+        "colores": ["darkorange"] * len(energia_horas),
+        "textos": [f"{valor:.1f}" if not np.isnan(valor) else "" for valor in energia_horas],
+        "umbrales": [],
+        "altura": 500,
+    }
+
+
+# ----------------------------------
+# 🖌️ Renderizadores
+# ----------------------------------
+
+def a_plotly(spec):
+    """Dibuja la especificación como figura de plotly con el estilo del Dashboard."""
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+
+    if spec["tipo"] == "lineas":
+        for serie in spec["series"]:
+            fig.add_trace(go.Scatter(
+                x=spec["x"], y=serie["y"], mode='lines', name=serie["nombre"],
+                line=dict(color=serie["color"], width=2)
+            ))
+    else:
+        fig.add_trace(go.Bar(
+            x=spec["x"], y=spec["y"], marker_color=spec["colores"], text=spec["textos"],
+            textposition='outside', showlegend=False
+        ))
+
+    # Umbrales: línea horizontal con su nombre al lado del eje o en la leyenda
+    formas, anotaciones = [], []
+    for umbral in spec["umbrales"]:
+        linea = dict(color=umbral["color"], width=umbral["ancho"], dash=umbral["estilo"])
+        formas.append(dict(type="line", xref="paper", x0=0, x1=1, yref="y", y0=umbral["valor"], y1=umbral["valor"], line=linea))
+        if umbral.get("en_leyenda"):
+            fig.add_trace(go.Scatter(x=[None], y=[None], mode="lines", name=umbral["nombre"], line=linea))
+        else:
+            anotaciones.append(dict(
+                x=1.005, y=umbral["valor"], xref='paper', yref='y', text=umbral["nombre"],
+                showarrow=False, font=dict(color=umbral["color"], size=12), xanchor='left'
+            ))
+
+    # Entradas manuales de la leyenda (p. ej. estados del PF)
+    for entrada in spec.get("leyenda", []):
+        fig.add_trace(go.Scatter(
+            x=[None], y=[None], mode='markers', marker=dict(size=10, color=entrada["color"]),
+            showlegend=True, name=entrada["nombre"]
+        ))
+
+    eje_x = dict(showgrid=spec["tipo"] == "lineas", gridcolor="lightgrey", tickangle=45)
+    if spec.get("formato_x"):
+        eje_x.update(tickformat=spec["formato_x"], tickmode="auto", nticks=24)
+    eje_y = dict(showgrid=True, gridcolor="lightgrey")
+    if spec.get("rango_y"):
+        eje_y.update(range=list(spec["rango_y"]), tick0=spec["rango_y"][0], dtick=spec.get("paso_y"))
+
+    fig.update_layout(
+        shapes=formas,
+        annotations=anotaciones,
+        title=spec["titulo"],
+        xaxis_title=spec["eje_x"],
+        yaxis_title=spec["eje_y"],
+        xaxis=eje_x,
+        yaxis=eje_y,
+        legend=dict(title=spec.get("titulo_leyenda"), orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        margin=dict(l=40, r=120 if anotaciones or spec["tipo"] == "barras" and spec["umbrales"] else 40, t=80, b=40),
+        height=spec.get("altura", 600),
+        template="simple_white"
+    )
+    return fig
+
+
+def a_matplotlib(spec, ruta):
+    """Dibuja la especificación con matplotlib (API de Figure, apta para hilos) y la guarda en `ruta`."""
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+    import matplotlib.dates as mdates
+    from matplotlib.figure import Figure
+    from matplotlib.patches import Patch
+
+    estilos = {"dash": "--", "solid": "-"}
+
+    if spec["tipo"] == "lineas":
+        fig = Figure(figsize=(12, 5))
+        ax = fig.subplots()
+        for serie in spec["series"]:
+            ax.plot(spec["x"], serie["y"], label=serie["nombre"], color=serie["color"])
+        ax.grid(True)
+    else:
+        fig = Figure(figsize=(8, 6) if len(spec["x"]) <= 6 else (10, 6))
+        ax = fig.subplots()
+        valores = np.nan_to_num(np.asarray(spec["y"], dtype=float))
+        barras = ax.bar(spec["x"], valores, color=spec["colores"])
+        # Valores sobre las barras
+        for barra, texto in zip(barras, spec["textos"]):
+            ax.text(barra.get_x() + barra.get_width() / 2, barra.get_height(), texto,
+                    ha='center', va='bottom', fontsize=10 if len(barras) <= 6 else 7)
+        ax.grid(axis='y', color='lightgray', linestyle='--')
+
+    for umbral in spec["umbrales"]:
+        ax.axhline(umbral["valor"], color=umbral["color"], linestyle=estilos[umbral["estilo"]],
+                   linewidth=umbral["ancho"] / 2 + 0.5, label=umbral["nombre"])
+
+    if spec.get("leyenda"):
+        ax.legend(handles=[Patch(color=entrada["color"], label=entrada["nombre"]) for entrada in spec["leyenda"]])
+    elif spec["umbrales"] or spec["tipo"] == "lineas":
+        ax.legend(loc="upper right")
+
+    if spec.get("formato_x"):
+        ax.xaxis.set_major_locator(mdates.HourLocator(interval=1))
+        ax.xaxis.set_major_formatter(mdates.DateFormatter(spec["formato_x"]))
+    if spec.get("rango_y"):
+        ax.set_ylim(*spec["rango_y"])
+
+    ax.set_title(spec["titulo"])
+    ax.set_xlabel(spec["eje_x"])
+    ax.set_ylabel(spec["eje_y"])
+    ax.tick_params(axis="x", labelrotation=45)
+    fig.tight_layout()
+    # En JPEG fpdf incrusta la imagen tal cual, sin separar el canal alfa como en PNG
+    fig.savefig(ruta, pil_kwargs={"quality": 90} if ruta.endswith(".jpg") else None)
+    return ruta
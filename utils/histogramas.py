@@ -0,0 +1,165 @@
+"""Histogramas diarios de bins fijos por canal, fusionables entre días.
+
+Cada canal tiene un ancho de bin fijo y todos los días del conjunto comparten los
+mismos bordes, así que el histograma de cualquier rango es la suma de las filas de
+sus días: O(días × bins), sin volver a las muestras. De ahí salen la distribución,
+la curva de duración y el tiempo por encima o por debajo de cualquier límite (con
+interpolación lineal dentro del bin que contiene al límite). Se construyen una vez
+al cargar el conjunto y se guardan en la caché compartida.
+"""
+import numpy as np
+import pandas as pd
+
+from utils.cache_datos import obtener_derivado
+from utils.calidad import SEGUNDOS_DIA
+from utils.estadisticas import COLUMNAS_CORRIENTE, COLUMNAS_DESBALANCE, COLUMNAS_VOLTAJE
+
+# Ancho de bin por canal, en sus unidades
+ANCHOS_BIN = {
+    **{columna: 0.5 for columna in COLUMNAS_VOLTAJE},
+    **{columna: 0.5 for columna in COLUMNAS_CORRIENTE},
+    **{columna: 0.05 for columna in COLUMNAS_DESBALANCE},
+    "PF_sum_AVG": 0.005,
+}
+
+# Tope de bins por canal. Si los valores no caben, la ventana de bins se centra en la
+# mediana y los atípicos (por ejemplo centinelas como -9999) se acumulan en el primer o
+# el último bin
+MAX_BINS = 20000
+
+
+def construir_histogramas(df):
+    """Conteos de muestras por día y bin de cada canal, con un bincount por canal."""
+    instantes = df["Datetime"].to_numpy(dtype="datetime64[s]").astype("int64")
+    dias_codigo, posiciones_dia = np.unique(instantes // SEGUNDOS_DIA, return_inverse=True)
+    n_dias = len(dias_codigo)
+
+    intervalos = np.diff(instantes)
+    positivos = intervalos[intervalos > 0]
+    paso = float(np.median(positivos)) if len(positivos) else 1.0
+
+    canales = {}
+    for canal, ancho in ANCHOS_BIN.items():
+        if canal not in df.columns:
+            continue
+        valores = df[canal].to_numpy(dtype=float)
+        validos = np.isfinite(valores)
+        bins = np.floor(valores[validos] / ancho).astype(np.int64)
+        primero = int(bins.min()) if len(bins) else 0
+        n_bins = int(bins.max()) - primero + 1 if len(bins) else 1
+        if n_bins > MAX_BINS:
+            primero = max(primero, int(np.median(bins)) - MAX_BINS // 2)
+            n_bins = MAX_BINS
+        bins = np.clip(bins - primero, 0, n_bins - 1)
+
+        conteos = np.bincount(posiciones_dia[validos] * n_bins + bins, minlength=n_dias * n_bins)
+        canales[canal] = {
+            "inicio": primero * ancho,
+            "ancho": ancho,
+            "conteos": conteos.reshape(n_dias, n_bins).astype(np.int32),
+        }
+
+    return {
+        "dias": pd.to_datetime(dias_codigo * SEGUNDOS_DIA, unit="s"),
+        "paso_segundos": paso,
+        "canales": canales,
+    }
+
+
+def histogramas_compartidos(huella, df):
+    """Histogramas del conjunto desde la caché compartida (se construyen una vez por conjunto)."""
+    return obtener_derivado(huella, "histogramas", lambda: construir_histogramas(df))
+
+
+def _dias_rango(histogramas, desde, hasta):
+    """Máscara de los días entre desde y hasta (ambos incluidos; None deja el extremo abierto)."""
+    dias = histogramas["dias"]
+    mascara = np.ones(len(dias), dtype=bool)
+    if desde is not None:
+        mascara &= dias >= pd.Timestamp(desde)
+    if hasta is not None:
+        mascara &= dias <= pd.Timestamp(hasta)
+    return mascara
+
+
+def histograma_rango(histogramas, canal, desde=None, hasta=None):
+    """Fusiona los histogramas de los días del rango; devuelve los bordes y los conteos."""
+    datos = histogramas["canales"][canal]
+    conteos = datos["conteos"][_dias_rango(histogramas, desde, hasta)].sum(axis=0)
+    bordes = datos["inicio"] + datos["ancho"] * np.arange(len(conteos) + 1)
+    return bordes, conteos
+
+
+def curva_duracion(histogramas, canal, desde=None, hasta=None):
+    """Curva de duración: porcentaje del tiempo (ascendente) en que el canal iguala o supera cada valor."""
+    bordes, conteos = histograma_rango(histogramas, canal, desde, hasta)
+    total = max(conteos.sum(), 1)
+    superado = np.cumsum(conteos[::-1]) / total * 100
+    return superado, bordes[-2::-1]
+
+
+def muestras_fuera_de_limite(histogramas, canal, limite, sobre=True, desde=None, hasta=None):
+    """Muestras de cada día por encima (o por debajo) del límite y muestras totales de cada día.
+
+    Dentro del bin que contiene al límite se supone una distribución uniforme.
+    """
+    datos = histogramas["canales"][canal]
+    conteos = datos["conteos"][_dias_rango(histogramas, desde, hasta)]
+    n_bins = conteos.shape[1]
+
+    # Muestras por debajo de cada borde
+    debajo_borde = np.zeros((len(conteos), n_bins + 1))
+    np.cumsum(conteos, axis=1, out=debajo_borde[:, 1:])
+
+    posicion = np.clip((limite - datos["inicio"]) / datos["ancho"], 0, n_bins)
+    entero = min(int(posicion), n_bins - 1)
+    debajo = debajo_borde[:, entero] + (posicion - entero) * conteos[:, entero]
+
+    totales = debajo_borde[:, -1]
+    return (totales - debajo if sobre else debajo), totales
+
+
+def fuera_de_limite_por_dia(histogramas, canales, limite, sobre=True):
+    """Peor canal del grupo en cada día: muestras fuera del límite y fracción del día fuera (NaN sin datos)."""
+    muestras, fracciones = [], []
+    for canal in canales:
+        if canal not in histogramas["canales"]:
+            continue
+        fuera, totales = muestras_fuera_de_limite(histogramas, canal, limite, sobre)
+        muestras.append(fuera)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            fracciones.append(np.where(totales > 0, fuera / totales, np.nan))
+    if not muestras:
+        vacio = np.full(len(histogramas["dias"]), np.nan)
+        return vacio, vacio
+    with np.errstate(invalid="ignore"):
+        return np.max(muestras, axis=0), np.fmax.reduce(fracciones, axis=0)
+
+
+def tiempo_fuera_de_limite(histogramas, canal, limite, sobre=True, desde=None, hasta=None):
+    """Resumen del tiempo fuera del límite en el rango: porcentaje, horas y días afectados."""
+    fuera, totales = muestras_fuera_de_limite(histogramas, canal, limite, sobre, desde, hasta)
+    total = totales.sum()
+    return {
+        "porcentaje": fuera.sum() / total * 100 if total else np.nan,
+        "horas": fuera.sum() * histogramas["paso_segundos"] / 3600,
+        "dias": int((fuera >= 0.5).sum()),
+    }
+
+
+def limites_configuracion(canal, config):
+    """Límites de alarma de la configuración que aplican al canal: lista de (nombre, valor, sobre)."""
+    if canal in COLUMNAS_VOLTAJE:
+        return [("Límite superior", config["limite_superior_v"], True),
+                ("Límite inferior", config["limite_inferior_v"], False)]
+    if canal in COLUMNAS_CORRIENTE:
+        return [("Umbral de corriente", config["umbral_corriente"], True)]
+    if canal == "Uunb_AVG":
+        return [("Desbalance moderado", config["desbalance_moderado_v"], True),
+                ("Desbalance crítico", config["desbalance_critico_v"], True)]
+    if canal == "Iunb_AVG":
+        return [("Desbalance moderado", config["desbalance_moderado_i"], True),
+                ("Desbalance crítico", config["desbalance_critico_i"], True)]
+    if canal == "PF_sum_AVG":
+        return [("Umbral de factor de potencia", config["umbral_factor_potencia"], False)]
+    return []
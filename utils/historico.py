@@ -0,0 +1,287 @@
+"""Almacén histórico local (SQLite) de todas las mediciones cargadas.
+
+Las muestras crudas se guardan indexadas por (medidor, instante) y, al ingresar, se
+actualizan los promedios horarios. La política de retención conserva las muestras
+crudas de los últimos N días de cada medidor y, para lo anterior, solo los promedios
+horarios. Las consultas por día o rango se resuelven en SQLite usando el índice, así
+que nadie tiene que mantener todo el historial en memoria. Las muestras crudas y los
+promedios horarios se leen por separado y nunca se mezclan en un mismo DataFrame.
+
+Como la página de inicio lo importa, pandas y numpy se importan dentro de las
+funciones que los necesitan.
+"""
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timezone
+
+from utils.cache_datos import huella_contenido, obtener_o_cargar
+from utils.ingesta import cargar_mediciones_compartidas
+
+RUTA_HISTORICO = os.environ.get("IELE_HISTORICO", "./historico.sqlite")
+
+# Días de muestras crudas que se conservan por medidor
+DIAS_CRUDOS = int(os.environ.get("IELE_DIAS_CRUDOS", "90"))
+
+FILAS_POR_LOTE = 50_000
+
+
+def _conectar(ruta=None):
+    conexion = sqlite3.connect(ruta or RUTA_HISTORICO, timeout=30)
+    conexion.execute("PRAGMA synchronous = NORMAL")
+    return closing(conexion)
+
+
+def _identificador(columna):
+    """Nombre de columna entre comillas dobles para SQLite, admitiendo espacios, símbolos y comillas."""
+    return '"' + str(columna).replace('"', '""') + '"'
+
+
+def _asegurar_esquema(conexion, columnas):
+    """Crea las tablas si no existen y agrega las columnas de medición nuevas."""
+    for tabla, extra in (("mediciones", ""), ("mediciones_hora", "muestras INTEGER NOT NULL, ")):
+        conexion.execute(
+            f"CREATE TABLE IF NOT EXISTS {tabla} ("
+            f"medidor TEXT NOT NULL, ts INTEGER NOT NULL, {extra}"
+            f"PRIMARY KEY (medidor, ts)) WITHOUT ROWID"
+        )
+        existentes = {fila[1] for fila in conexion.execute(f"PRAGMA table_info({tabla})")}
+        for columna in columnas:
+            if columna not in existentes:
+                conexion.execute(f"ALTER TABLE {tabla} ADD COLUMN {_identificador(columna)} REAL")
+
+
+def _columnas_medicion(conexion, tabla="mediciones"):
+    return [fila[1] for fila in conexion.execute(f"PRAGMA table_info({tabla})") if fila[1] not in ("medidor", "ts", "muestras")]
+
+
+def guardar_mediciones(df, medidor, reportar_progreso=None, ruta=None):
+    """Guarda las muestras de un medidor, actualiza sus promedios horarios y aplica la retención."""
+    import numpy as np
+    import pandas as pd
+
+    columnas = [columna for columna in df.columns if columna != "Datetime" and pd.api.types.is_numeric_dtype(df[columna])]
+    instantes = df["Datetime"].to_numpy(dtype="datetime64[s]")
+    validos = ~np.isnat(instantes)
+    segundos = instantes[validos].astype("int64")
+    valores = df[columnas].to_numpy(dtype=float)[validos]
+
+    with _conectar(ruta) as conexion:
+        _asegurar_esquema(conexion, columnas)
+
+        marcadores = ", ".join(["?"] * (len(columnas) + 2))
+        insercion = f"INSERT OR REPLACE INTO mediciones (medidor, ts, {', '.join(map(_identificador, columnas))}) VALUES ({marcadores})"
+
+        for inicio in range(0, len(segundos), FILAS_POR_LOTE):
+            fin = inicio + FILAS_POR_LOTE
+            # SQLite guarda los NaN como NULL
+            filas = [(medidor, ts, *fila) for ts, fila in zip(segundos[inicio:fin].tolist(), valores[inicio:fin].tolist())]
+            conexion.executemany(insercion, filas)
+            if reportar_progreso is not None:
+                reportar_progreso(0.8 * min(fin, len(segundos)) / max(len(segundos), 1), "Guardando en el histórico...")
+
+        if len(segundos):
+            _actualizar_promedios_horarios(conexion, medidor, int(segundos.min()), int(segundos.max()))
+        conexion.commit()
+
+    if reportar_progreso is not None:
+        reportar_progreso(0.9, "Aplicando retención...")
+    aplicar_retencion(medidor, ruta=ruta)
+
+    if reportar_progreso is not None:
+        reportar_progreso(1.0, "Guardado en el histórico")
+
+
+def _actualizar_promedios_horarios(conexion, medidor, desde, hasta):
+    """Recalcula en SQLite los promedios horarios de las horas tocadas por una ingesta."""
+    columnas = _columnas_medicion(conexion)
+    promedios = ", ".join(f"AVG({_identificador(columna)})" for columna in columnas)
+    conexion.execute(
+        f"INSERT OR REPLACE INTO mediciones_hora (medidor, ts, muestras, {', '.join(map(_identificador, columnas))}) "
+        f"SELECT medidor, (ts / 3600) * 3600, COUNT(*), {promedios} FROM mediciones "
+        f"WHERE medidor = ? AND ts >= ? AND ts < ? GROUP BY medidor, ts / 3600",
+        (medidor, (desde // 3600) * 3600, (hasta // 3600 + 1) * 3600),
+    )
+
+
+def aplicar_retencion(medidor=None, dias_crudos=None, ruta=None):
+    """Borra las muestras crudas más antiguas que `dias_crudos` respecto a la última de cada medidor.
+
+    Los promedios horarios se conservan, así que esos días siguen siendo consultables.
+    """
+    dias_crudos = DIAS_CRUDOS if dias_crudos is None else dias_crudos
+    with _conectar(ruta) as conexion:
+        medidores = [medidor] if medidor is not None else listar_medidores(ruta)
+        for nombre in medidores:
+            (ultimo,) = conexion.execute("SELECT MAX(ts) FROM mediciones WHERE medidor = ?", (nombre,)).fetchone()
+            if ultimo is None:
+                continue
+            limite = (ultimo // 86400 - dias_crudos + 1) * 86400
+            conexion.execute("DELETE FROM mediciones WHERE medidor = ? AND ts < ?", (nombre, limite))
+        conexion.commit()
+
+
+def _existe_historico(ruta=None):
+    return os.path.exists(ruta or RUTA_HISTORICO)
+
+
+def listar_medidores(ruta=None):
+    """Medidores con datos en el histórico."""
+    if not _existe_historico(ruta):
+        return []
+    with _conectar(ruta) as conexion:
+        try:
+            return [fila[0] for fila in conexion.execute("SELECT DISTINCT medidor FROM mediciones_hora ORDER BY medidor")]
+        except sqlite3.OperationalError:
+            return []
+
+
+def rango_fechas(medidor, ruta=None):
+    """Primer y último instante con datos (crudos o horarios) del medidor."""
+    with _conectar(ruta) as conexion:
+        primero, ultimo = conexion.execute(
+            "SELECT MIN(ts), MAX(ts) FROM mediciones_hora WHERE medidor = ?", (medidor,)
+        ).fetchone()
+    if primero is None:
+        return None, None
+    return _desde_epoca(primero), _desde_epoca(ultimo + 3599)
+
+
+def rango_crudo(medidor, ruta=None):
+    """Primer y último instante con muestras crudas del medidor (lo que no pasó la retención)."""
+    with _conectar(ruta) as conexion:
+        primero, ultimo = conexion.execute(
+            "SELECT MIN(ts), MAX(ts) FROM mediciones WHERE medidor = ?", (medidor,)
+        ).fetchone()
+    if primero is None:
+        return None, None
+    return _desde_epoca(primero), _desde_epoca(ultimo)
+
+
+def _desde_epoca(segundos):
+    return datetime.fromtimestamp(segundos, timezone.utc).replace(tzinfo=None)
+
+
+def version_historico(ruta=None):
+    """Identificador que cambia cada vez que se modifica el archivo del histórico."""
+    estado = os.stat(ruta or RUTA_HISTORICO)
+    return f"{estado.st_mtime_ns}-{estado.st_size}"
+
+
+def leer_rango(medidor, desde, hasta, ruta=None):
+    """Lee del histórico las muestras crudas del medidor en [desde, hasta).
+
+    Las páginas trabajan sobre muestras individuales (energía, histogramas, cobertura,
+    índice acumulado), así que un promedio horario no puede mezclarse con ellas: si el
+    rango incluye días que ya solo tienen promedios horarios se lanza ValueError. Esos
+    días se consultan aparte con `leer_promedios_horarios`. El resultado tiene las
+    columnas Date, Time y Datetime que esperan las páginas.
+    """
+    import pandas as pd
+
+    from utils.calidad import formatear_fecha_hora
+
+    desde_s = int(pd.Timestamp(desde).timestamp())
+    hasta_s = int(pd.Timestamp(hasta).timestamp())
+
+    with _conectar(ruta) as conexion:
+        columnas = _columnas_medicion(conexion)
+
+        # Antes de la primera muestra cruda conservada solo quedan los promedios horarios
+        (primer_crudo,) = conexion.execute("SELECT MIN(ts) FROM mediciones WHERE medidor = ?", (medidor,)).fetchone()
+        limite_horario = min(hasta_s, primer_crudo if primer_crudo is not None else hasta_s)
+        (horas_resumidas,) = conexion.execute(
+            "SELECT COUNT(*) FROM mediciones_hora WHERE medidor = ? AND ts >= ? AND ts < ?",
+            (medidor, desde_s, limite_horario),
+        ).fetchone()
+        if horas_resumidas:
+            raise ValueError(
+                f"El rango incluye {horas_resumidas} horas de {medidor} que solo se conservan como promedios horarios"
+                + (f"; las muestras crudas empiezan el {_desde_epoca(primer_crudo):%d/%m/%Y}." if primer_crudo is not None else ".")
+            )
+
+        crudos = pd.read_sql_query(
+            f"SELECT {', '.join(['ts'] + [_identificador(columna) for columna in columnas])} FROM mediciones WHERE medidor = ? AND ts >= ? AND ts < ? ORDER BY ts",
+            conexion, params=(medidor, desde_s, hasta_s),
+        )
+
+    crudos["Datetime"] = pd.to_datetime(crudos.pop("ts"), unit="s")
+    crudos["Date"], crudos["Time"] = formatear_fecha_hora(crudos["Datetime"])
+    return crudos[["Date", "Time"] + columnas + ["Datetime"]]
+
+
+def leer_promedios_horarios(medidor, desde, hasta, ruta=None):
+    """Promedios horarios del medidor en [desde, hasta), con las muestras que resume cada hora.
+
+    Cada fila es una hora completa, no una muestra: la columna `muestras` es el peso
+    con que hay que combinarla.
+    """
+    import pandas as pd
+
+    desde_s = int(pd.Timestamp(desde).timestamp())
+    hasta_s = int(pd.Timestamp(hasta).timestamp())
+
+    with _conectar(ruta) as conexion:
+        columnas = _columnas_medicion(conexion, "mediciones_hora")
+        horarios = pd.read_sql_query(
+            f"SELECT {', '.join(['ts', 'muestras'] + [_identificador(columna) for columna in columnas])} FROM mediciones_hora "
+            f"WHERE medidor = ? AND ts >= ? AND ts < ? ORDER BY ts",
+            conexion, params=(medidor, desde_s, hasta_s),
+        )
+
+    horarios.insert(0, "Datetime", pd.to_datetime(horarios.pop("ts"), unit="s"))
+    return horarios
+
+
+def estadisticas_historico(ruta=None):
+    """Filas crudas y horarias por medidor, para mostrar el estado del histórico."""
+    import pandas as pd
+
+    if not _existe_historico(ruta):
+        return pd.DataFrame(columns=["Medidor", "Muestras crudas", "Horas"])
+    with _conectar(ruta) as conexion:
+        try:
+            return pd.read_sql_query(
+                "SELECT h.medidor AS Medidor, "
+                "(SELECT COUNT(*) FROM mediciones m WHERE m.medidor = h.medidor) AS 'Muestras crudas', "
+                "COUNT(*) AS Horas FROM mediciones_hora h GROUP BY h.medidor",
+                conexion,
+            )
+        except sqlite3.OperationalError:
+            return pd.DataFrame(columns=["Medidor", "Muestras crudas", "Horas"])
+
+
+def cargar_rango_compartido(medidor, desde, hasta, reportar_progreso=None, ruta=None):
+    """Lee un rango del histórico a través de la caché compartida y devuelve su huella y el DataFrame."""
+    clave = f"{os.path.abspath(ruta or RUTA_HISTORICO)}|{version_historico(ruta)}|{medidor}|{desde}|{hasta}"
+    huella = "historico-" + huella_contenido(clave.encode("utf-8"))
+
+    if reportar_progreso is not None:
+        reportar_progreso(0.1, f"Consultando {medidor} en el histórico...")
+    df = obtener_o_cargar(huella, lambda: leer_rango(medidor, desde, hasta, ruta=ruta))
+
+    # Índice de sumas acumuladas, histogramas y resumen por día, igual que en la carga de CSV
+    from utils.calendario import resumen_calendario_compartido
+    from utils.histogramas import histogramas_compartidos
+    from utils.indice_acumulado import indice_compartido
+
+    indice_compartido(huella, df)
+    histogramas_compartidos(huella, df)
+    resumen_calendario_compartido(huella, df)
+
+    if reportar_progreso is not None:
+        reportar_progreso(1.0, "Rango cargado")
+    return huella, df
+
+
+def cargar_y_guardar(contenido, medidor, reportar_progreso=None, ruta=None):
+    """Carga un CSV a través de la caché compartida y guarda sus muestras en el histórico."""
+    def progreso_carga(fraccion, mensaje=None):
+        reportar_progreso(0.5 * fraccion, mensaje)
+
+    def progreso_guardado(fraccion, mensaje=None):
+        reportar_progreso(0.5 + 0.5 * fraccion, mensaje)
+
+    huella, df = cargar_mediciones_compartidas(contenido, progreso_carga if reportar_progreso else None)
+    guardar_mediciones(df, medidor, progreso_guardado if reportar_progreso else None, ruta=ruta)
+    return huella, df
@@ -0,0 +1,81 @@
+"""Lectura y preparación de los archivos CSV del analizador.
+
+pandas y la validación se importan dentro de las funciones: la página de inicio
+importa este módulo y así arranca sin cargarlos hasta que llega el primer archivo.
+"""
+import io
+
+from utils.cache_datos import huella_contenido, obtener_derivado, obtener_o_cargar
+
+
+def cargar_mediciones(contenido, reportar_progreso=None, filas_por_bloque=200_000):
+    """Lee el CSV del analizador por bloques, reportando el avance, y prepara las fechas."""
+    return cargar_mediciones_con_informe(contenido, reportar_progreso, filas_por_bloque)[0]
+
+
+def cargar_mediciones_con_informe(contenido, reportar_progreso=None, filas_por_bloque=200_000):
+    """Como cargar_mediciones, pero devuelve también el informe de calidad de la ingesta."""
+    import pandas as pd
+
+    from utils.calidad import reparar_mediciones
+
+    buffer = io.BytesIO(contenido)
+    total_bytes = max(len(contenido), 1)
+
+    bloques = []
+    for bloque in pd.read_csv(buffer, chunksize=filas_por_bloque):
+        bloques.append(bloque)
+        if reportar_progreso is not None:
+            reportar_progreso(0.8 * buffer.tell() / total_bytes, f"Leyendo archivo ({len(bloques) * filas_por_bloque:,} filas)...")
+
+    df = pd.concat(bloques, ignore_index=True) if bloques else pd.read_csv(io.BytesIO(contenido))
+
+    if reportar_progreso is not None:
+        reportar_progreso(0.85, "Validando fechas, horas y orden de las muestras...")
+    df, informe = reparar_mediciones(df)
+
+    if reportar_progreso is not None:
+        reportar_progreso(1.0, "Archivo cargado")
+    return df, informe
+
+
+def cargar_mediciones_compartidas(contenido, reportar_progreso=None):
+    """Carga el CSV a través de la caché compartida y devuelve su huella y el DataFrame."""
+    huella = huella_contenido(contenido)
+    informes = []
+
+    def cargar():
+        df, informe = cargar_mediciones_con_informe(contenido, reportar_progreso)
+        informes.append(informe)
+        return df
+
+    df = obtener_o_cargar(huella, cargar)
+    if informes:
+        # El informe se guarda junto al conjunto para las sesiones que lo reutilicen
+        obtener_derivado(huella, "calidad", lambda: informes[0])
+
+    # Índice de sumas acumuladas, histogramas y resumen por día, construidos en la carga
+    from utils.calendario import resumen_calendario_compartido
+    from utils.histogramas import histogramas_compartidos
+    from utils.indice_acumulado import indice_compartido
+
+    indice_compartido(huella, df)
+    histogramas_compartidos(huella, df)
+    resumen_calendario_compartido(huella, df)
+    return huella, df
+
+
+def informe_calidad(huella, df):
+    """Informe de calidad del conjunto; si no viene de la ingesta solo incluye huecos y cobertura."""
+    def calcular():
+        from utils.calidad import evaluar_cobertura
+
+        informe = evaluar_cobertura(df["Datetime"])
+        informe["resumen"] = {
+            "filas_leidas": len(df), "filas_validas": len(df), "malformadas": 0, "ambiguas": 0,
+            "fuera_de_orden": 0, "duplicadas": 0, "huecos": len(informe["huecos"]),
+            "paso_segundos": informe["paso_segundos"],
+        }
+        return informe
+
+    return obtener_derivado(huella, "calidad", calcular)
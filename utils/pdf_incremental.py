@@ -0,0 +1,141 @@
+"""PDF de fpdf 1.7 que se escribe en disco a medida que se cierran las páginas.
+
+fpdf 1.7 acumula todo el documento, con las imágenes, en memoria hasta `output()`.
+Aquí cada página se escribe en el archivo apenas se cierra, junto con las imágenes
+que usó por primera vez, y luego se descartan su contenido y los bytes de esas
+imágenes; al final solo se escriben las fuentes, el diccionario de recursos, el
+árbol de páginas y la tabla de referencias cruzadas. Así la memoria del documento
+no crece con el número de páginas.
+
+El contenido de las páginas nombra las imágenes y las fuentes (/I1, /F1) a través
+del diccionario de recursos compartido (objeto 2), por eso puede escribirse antes
+que ellos. No se admiten alias_nb_pages ni enlaces internos, que fpdf resuelve al
+final con todo el documento en memoria.
+"""
+import os
+import zlib
+
+from fpdf import FPDF
+
+
+class PDFIncremental(FPDF):
+    """FPDF que vuelca cada página cerrada en `ruta`; `output()` termina el archivo."""
+
+    def __init__(self, ruta, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.ruta = ruta
+        self.archivo = open(ruta, "wb")
+        self.bytes_escritos = 0
+        self.objetos_pagina = []
+
+    def _newobj(self):
+        # El desplazamiento cuenta lo que ya se escribió en disco además del buffer
+        self.n += 1
+        self.offsets[self.n] = self.bytes_escritos + len(self.buffer)
+        self._out(str(self.n) + " 0 obj")
+
+    def _volcar(self):
+        datos = self.buffer.encode("latin1")
+        self.archivo.write(datos)
+        self.bytes_escritos += len(datos)
+        self.buffer = ""
+
+    def _endpage(self):
+        super()._endpage()
+        if not self.objetos_pagina:
+            self._putheader()
+
+        # Página y su contenido; la primera página queda como objeto 3, como espera fpdf
+        self._newobj()
+        self.objetos_pagina.append(self.n)
+        self._out("<</Type /Page")
+        self._out("/Parent 1 0 R")
+        if self.page in self.orientation_changes:
+            self._out("/MediaBox [0 0 %.2f %.2f]" % (self.w_pt, self.h_pt))
+        self._out("/Resources 2 0 R")
+        if self.pdf_version > "1.3":
+            self._out("/Group <</Type /Group /S /Transparency /CS /DeviceRGB>>")
+        self._out("/Contents " + str(self.n + 1) + " 0 R>>")
+        self._out("endobj")
+
+        contenido = self.pages[self.page].encode("latin1")
+        filtro = ""
+        if self.compress:
+            contenido = zlib.compress(contenido)
+            filtro = "/Filter /FlateDecode "
+        self._newobj()
+        self._out("<<" + filtro + "/Length " + str(len(contenido)) + ">>")
+        self._putstream(contenido)
+        self._out("endobj")
+        self.pages[self.page] = ""
+
+        self._putimages()
+        self._volcar()
+
+    def _putimages(self):
+        # Solo las imágenes nuevas; de las ya escritas se conserva su número de objeto
+        for _, info in sorted((info["i"], info) for info in self.images.values() if "data" in info):
+            self._putimage(info)
+            del info["data"]
+            info.pop("smask", None)
+
+    def _enddoc(self):
+        self._putfonts()
+        self._putimages()
+
+        self.offsets[2] = self.bytes_escritos + len(self.buffer)
+        self._out("2 0 obj")
+        self._out("<<")
+        self._putresourcedict()
+        self._out(">>")
+        self._out("endobj")
+
+        ancho, alto = (self.fw_pt, self.fh_pt) if self.def_orientation == "P" else (self.fh_pt, self.fw_pt)
+        self.offsets[1] = self.bytes_escritos + len(self.buffer)
+        self._out("1 0 obj")
+        self._out("<</Type /Pages")
+        self._out("/Kids [" + "".join(f"{n} 0 R " for n in self.objetos_pagina) + "]")
+        self._out("/Count " + str(len(self.objetos_pagina)))
+        self._out("/MediaBox [0 0 %.2f %.2f]" % (ancho, alto))
+        self._out(">>")
+        self._out("endobj")
+
+        self._newobj()
+        self._out("<<")
+        self._putinfo()
+        self._out(">>")
+        self._out("endobj")
+        self._newobj()
+        self._out("<<")
+        self._putcatalog()
+        self._out(">>")
+        self._out("endobj")
+
+        inicio_xref = self.bytes_escritos + len(self.buffer)
+        self._out("xref")
+        self._out("0 " + str(self.n + 1))
+        self._out("0000000000 65535 f ")
+        for i in range(1, self.n + 1):
+            self._out("%010d 00000 n " % self.offsets[i])
+        self._out("trailer")
+        self._out("<<")
+        self._puttrailer()
+        self._out(">>")
+        self._out("startxref")
+        self._out(inicio_xref)
+        self._out("%%EOF")
+        self._volcar()
+        self.archivo.close()
+        self.state = 3
+
+    def output(self, name="", dest=""):
+        """Termina el documento en `ruta` (los argumentos de fpdf se ignoran) y devuelve la ruta."""
+        if self.state < 3:
+            self.close()
+        return self.ruta
+
+    def descartar(self):
+        """Cierra y borra el archivo a medio escribir."""
+        self.archivo.close()
+        if os.path.exists(self.ruta):
+            os.remove(self.ruta)
@@ -0,0 +1,200 @@
+"""Construcción de figuras de plotly compartidas por las páginas."""
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+
+def figura_mapa_calor(matriz, dias, titulo, titulo_barra, escala_colores="Viridis", zmin=None, zmax=None, zmid=None):
+    """Crea un mapa de calor con los días en las filas y las horas en las columnas."""
+    etiquetas_horas = [f"{h:02d}:00" for h in range(24)]
+    etiquetas_dias = [dia.strftime("%d/%m/%Y") for dia in dias]
+
+    fig = go.Figure(go.Heatmap(
+        z=matriz,
+        x=etiquetas_horas,
+        y=etiquetas_dias,
+        colorscale=escala_colores,
+        zmin=zmin,
+        zmax=zmax,
+        zmid=zmid,
+        colorbar=dict(title=titulo_barra),
+        hovertemplate="Día: %{y}<br>Hora: %{x}<br>Valor: %{z:.3f}<extra></extra>",
+        hoverongaps=False
+    ))
+
+    fig.update_layout(
+        title=titulo,
+        xaxis_title="Hora del Día",
+        yaxis_title="Día",
+        xaxis=dict(tickangle=45, side="bottom"),
+        yaxis=dict(autorange="reversed", type="category"),
+        height=max(400, 22 * len(etiquetas_dias) + 160),
+        margin=dict(l=40, r=40, t=80, b=40),
+        template="simple_white"
+    )
+
+    return fig
+
+
+def _lineas_limite(fig, limites, eje="x"):
+    """Agrega líneas verticales (eje x) u horizontales (eje y) con el nombre de cada límite."""
+    for valor, nombre, color in limites:
+        if eje == "x":
+            fig.add_vline(x=valor, line=dict(color=color, width=2, dash="dash"),
+                          annotation_text=nombre, annotation_font_color=color, annotation_position="top")
+        else:
+            fig.add_hline(y=valor, line=dict(color=color, width=2, dash="dash"),
+                          annotation_text=nombre, annotation_font_color=color, annotation_position="right")
+
+
+def figura_histograma(bordes, conteos, titulo, unidad, limites=(), altura=450):
+    """Histograma en porcentaje del tiempo, con líneas verticales en los límites (valor, nombre, color)."""
+    total = max(conteos.sum(), 1)
+    # Solo el tramo con muestras, para no dibujar colas vacías
+    con_datos = conteos.nonzero()[0]
+    desde, hasta = (con_datos[0], con_datos[-1] + 1) if len(con_datos) else (0, len(conteos))
+    centros = (bordes[desde:hasta] + bordes[desde + 1:hasta + 1]) / 2
+
+    fig = go.Figure(go.Bar(
+        x=centros,
+        y=conteos[desde:hasta] / total * 100,
+        width=bordes[1] - bordes[0],
+        marker_color="steelblue",
+        hovertemplate=f"%{{x:.3f}} {unidad}<br>%{{y:.2f}} % del tiempo<extra></extra>"
+    ))
+    _lineas_limite(fig, limites)
+
+    fig.update_layout(
+        title=titulo,
+        xaxis_title=unidad,
+        yaxis_title="% del tiempo",
+        bargap=0,
+        yaxis=dict(showgrid=True, gridcolor="lightgrey"),
+        height=altura,
+        margin=dict(l=40, r=40, t=80, b=40),
+        template="simple_white"
+    )
+    return fig
+
+
+def figura_curva_duracion(porcentaje_tiempo, valores, titulo, unidad, limites=(), altura=450):
+    """Curva de duración: valor que se iguala o supera durante cada porcentaje del tiempo."""
+    fig = go.Figure(go.Scatter(
+        x=porcentaje_tiempo,
+        y=valores,
+        mode="lines",
+        line=dict(color="darkorange", width=2, shape="hv"),
+        hovertemplate=f"%{{y:.3f}} {unidad} o más durante el %{{x:.2f}} % del tiempo<extra></extra>"
+    ))
+    _lineas_limite(fig, limites, eje="y")
+
+    fig.update_layout(
+        title=titulo,
+        xaxis_title="% del tiempo en que se iguala o supera",
+        yaxis_title=unidad,
+        xaxis=dict(range=[0, 100], showgrid=True, gridcolor="lightgrey"),
+        yaxis=dict(showgrid=True, gridcolor="lightgrey"),
+        height=altura,
+        margin=dict(l=40, r=120, t=80, b=40),
+        template="simple_white"
+    )
+    return fig
+
+
+def figura_perfiles_comparados(etiquetas, antes, despues, titulo, unidad, altura=450):
+    """Perfiles típicos de dos campañas superpuestos sobre el mismo eje de intervalos."""
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=etiquetas, y=antes, mode="lines", name="Antes",
+                             line=dict(color="grey", width=2), connectgaps=False))
+    fig.add_trace(go.Scatter(x=etiquetas, y=despues, mode="lines", name="Después",
+                             line=dict(color="blue", width=2), connectgaps=False))
+
+    fig.update_layout(
+        title=titulo,
+        xaxis_title="Intervalo",
+        yaxis_title=unidad,
+        xaxis=dict(nticks=24, showgrid=True, gridcolor="lightgrey"),
+        yaxis=dict(showgrid=True, gridcolor="lightgrey"),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        height=altura,
+        margin=dict(l=40, r=40, t=80, b=40),
+        template="simple_white"
+    )
+    return fig
+
+
+def figura_calendario(fechas, valores, dias, textos, titulo, unidad, escala_colores="Viridis", zmin=None, zmax=None):
+    """Calendario de semanas × días de la semana con un cuadro por día, coloreado por `valores`.
+
+    Cada punto lleva el día ('dd/mm/YYYY') en customdata, para poder seleccionarlo con un clic.
+    """
+    fechas = pd.DatetimeIndex(fechas)
+    dias_semana = ["Lun", "Mar", "Mié", "Jue", "Vie", "Sáb", "Dom"]
+    semanas = fechas - pd.to_timedelta(fechas.weekday, unit="D")
+
+    fig = go.Figure(go.Scatter(
+        x=semanas,
+        y=[dias_semana[dia] for dia in fechas.weekday],
+        mode="markers",
+        marker=dict(symbol="square", size=18, color=valores, colorscale=escala_colores, cmin=zmin, cmax=zmax,
+                    colorbar=dict(title=unidad), line=dict(color="white", width=1)),
+        customdata=np.stack([dias], axis=-1),
+        text=textos,
+        hovertemplate="%{text}<extra></extra>"
+    ))
+
+    fig.update_layout(
+        title=titulo,
+        xaxis=dict(title="Semana", tickformat="%d/%m/%Y", showgrid=False),
+        yaxis=dict(categoryorder="array", categoryarray=dias_semana[::-1], showgrid=False),
+        height=330,
+        margin=dict(l=40, r=40, t=60, b=40),
+        template="simple_white"
+    )
+    return fig
+
+
+def figura_centroides(etiquetas, centroides, nombres, titulo, unidad, colores, altura=450):
+    """Perfil (centroide) de cada grupo de días típicos sobre las horas del día."""
+    fig = go.Figure()
+    for centroide, nombre, color in zip(centroides, nombres, colores):
+        fig.add_trace(go.Scatter(x=etiquetas, y=centroide, mode="lines", name=nombre, line=dict(color=color, width=2)))
+
+    fig.update_layout(
+        title=titulo,
+        xaxis_title="Hora del día",
+        yaxis_title=unidad,
+        xaxis=dict(nticks=24, showgrid=True, gridcolor="lightgrey"),
+        yaxis=dict(showgrid=True, gridcolor="lightgrey"),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        height=altura,
+        margin=dict(l=40, r=40, t=80, b=40),
+        template="simple_white"
+    )
+    return fig
+
+
+def figura_en_vivo(titulo, nombres, colores, unidad, limites=(), altura=350):
+    """Figura vacía para un panel en vivo: una traza por serie y líneas fijas en los límites.
+
+    Se crea una sola vez; en cada actualización solo se reemplazan los datos de sus trazas.
+    """
+    fig = go.Figure()
+    for nombre, color in zip(nombres, colores):
+        fig.add_trace(go.Scattergl(x=[], y=[], mode="lines", name=nombre, line=dict(color=color, width=2)))
+    for valor, color in limites:
+        fig.add_hline(y=valor, line=dict(color=color, width=2, dash="dash"))
+
+    fig.update_layout(
+        title=titulo,
+        xaxis_title="Tiempo",
+        yaxis_title=unidad,
+        xaxis=dict(showgrid=True, gridcolor="lightgrey"),
+        yaxis=dict(showgrid=True, gridcolor="lightgrey"),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        height=altura,
+        margin=dict(l=40, r=40, t=80, b=40),
+        uirevision="en_vivo",
+        template="simple_white"
+    )
+    return fig
@@ -0,0 +1,154 @@
+"""Pronóstico de carga sobre los promedios horarios con modelos estacionales vectorizados.
+
+Todas las series (corriente por fase y factor de potencia) y todas las combinaciones
+de parámetros de Holt-Winters se ajustan a la vez: el recorrido en el tiempo es un
+solo bucle y cada paso opera sobre un arreglo de series × combinaciones.
+"""
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from utils.agregados import promedios_dia_hora
+
+COLUMNAS_PRONOSTICO = ["I1_rms_AVG", "I2_rms_AVG", "I3_rms_AVG", "PF_sum_AVG"]
+PERIODO = 24
+
+# Rejilla de parámetros (alfa, beta, gamma) evaluada en lote para cada serie
+REJILLA_HOLT_WINTERS = np.array(list(itertools.product([0.1, 0.3, 0.5], [0.0, 0.01, 0.05], [0.05, 0.2, 0.4])))
+
+
+def series_horarias(df, columnas=COLUMNAS_PRONOSTICO):
+    """Construye series horarias continuas (series × horas) a partir del pivote día × hora.
+
+    Las series terminan en la última hora con datos, así que el último día puede quedar
+    incompleto. Las horas sin datos anteriores a esa se rellenan con el valor de la misma
+    hora del día anterior y, si no existe, con el promedio de la serie.
+    """
+    dias, matrices = promedios_dia_hora(df, columnas)
+    if len(dias) == 0:
+        return pd.DatetimeIndex([]), np.empty((len(columnas), 0))
+
+    n_dias = (dias[-1] - dias[0]).days + 1
+    posiciones = (dias - dias[0]).days
+
+    continuas = np.full((len(columnas), n_dias, PERIODO), np.nan)
+    continuas[:, posiciones, :] = matrices
+    series = continuas.reshape(len(columnas), n_dias * PERIODO)
+
+    # Las horas posteriores a la última observación no son historia
+    observadas = np.flatnonzero(~np.isnan(series).all(axis=0))
+    series = series[:, :observadas[-1] + 1]
+
+    for desfase in range(PERIODO, series.shape[1], PERIODO):
+        huecos = np.isnan(series[:, desfase:])
+        if not huecos.any():
+            break
+        series[:, desfase:] = np.where(huecos, series[:, :-desfase], series[:, desfase:])
+
+    medias = np.nanmean(series, axis=1, keepdims=True)
+    series = np.where(np.isnan(series), medias, series)
+
+    horas = pd.date_range(dias[0], periods=series.shape[1], freq="h")
+    return horas, series
+
+
+def estacional_ingenuo(series, horizonte=PERIODO):
+    """Repite el último ciclo diario.
+
+    El error medio absoluto se mide pronosticando las últimas `horizonte` horas con
+    los datos anteriores a ellas, igual que en Holt-Winters.
+    """
+    def repetir_ultimo_ciclo(historia):
+        repeticiones = int(np.ceil(horizonte / PERIODO))
+        return np.tile(historia[:, -PERIODO:], repeticiones)[:, :horizonte]
+
+    validacion = repetir_ultimo_ciclo(series[:, :-horizonte])
+    errores = np.abs(series[:, -horizonte:] - validacion).mean(axis=1)
+    return repetir_ultimo_ciclo(series), errores
+
+
+def _holt_winters_lote(series, horizonte, rejilla):
+    """Recorre Holt-Winters aditivo para todas las series y combinaciones y pronostica `horizonte` pasos.
+
+    Devuelve un arreglo series × combinaciones × horizonte.
+    """
+    n_series, n_horas = series.shape
+    n_combinaciones = len(rejilla)
+
+    # Lote de forma (series × combinaciones)
+    y = np.repeat(series[:, None, :], n_combinaciones, axis=1)
+    alfa, beta, gamma = (rejilla[:, i][None, :] for i in range(3))
+
+    primer_ciclo = y[:, :, :PERIODO]
+    segundo_ciclo = y[:, :, PERIODO:2 * PERIODO]
+    nivel = primer_ciclo.mean(axis=2)
+    tendencia = (segundo_ciclo.mean(axis=2) - nivel) / PERIODO
+    estacionalidad = primer_ciclo - nivel[:, :, None]
+
+    for t in range(PERIODO, n_horas):
+        s = t % PERIODO
+        observado = y[:, :, t]
+        estacional = estacionalidad[:, :, s]
+
+        nivel_anterior = nivel
+        nivel = alfa * (observado - estacional) + (1 - alfa) * (nivel + tendencia)
+        tendencia = beta * (nivel - nivel_anterior) + (1 - beta) * tendencia
+        estacionalidad[:, :, s] = gamma * (observado - nivel) + (1 - gamma) * estacional
+
+    pasos = np.arange(1, horizonte + 1)
+    indices_estacion = (n_horas + pasos - 1) % PERIODO
+    return nivel[:, :, None] + pasos * tendencia[:, :, None] + estacionalidad[:, :, indices_estacion]
+
+
+def holt_winters(series, horizonte=PERIODO, rejilla=REJILLA_HOLT_WINTERS):
+    """Ajusta Holt-Winters aditivo a todas las series y parámetros en lote.
+
+    Para cada serie se elige la combinación con menor error pronosticando las últimas
+    `horizonte` horas con los datos anteriores a ellas, es decir, con el mismo horizonte
+    del pronóstico. Devuelve el pronóstico (series × horizonte), ese error medio
+    absoluto y los parámetros.
+    """
+    filas = np.arange(series.shape[0])
+
+    validacion = _holt_winters_lote(series[:, :-horizonte], horizonte, rejilla)
+    errores = np.abs(validacion - series[:, None, -horizonte:]).mean(axis=2)
+    mejores = errores.argmin(axis=1)
+
+    pronostico = _holt_winters_lote(series, horizonte, rejilla)[filas, mejores]
+    return pronostico, errores[filas, mejores], rejilla[mejores]
+
+
+def pronosticar(df, columnas=COLUMNAS_PRONOSTICO, horizonte=PERIODO):
+    """Ajusta ambos modelos a las series horarias y devuelve historia, pronósticos y errores.
+
+    El pronóstico empieza en la hora siguiente a la última observada.
+    """
+    horas, series = series_horarias(df, columnas)
+    # Dos ciclos para iniciar Holt-Winters más las horas reservadas para validar
+    if series.shape[1] < 2 * PERIODO + horizonte:
+        raise ValueError(f"Se necesitan al menos {2 * PERIODO + horizonte} horas de datos para pronosticar.")
+
+    pronostico_ingenuo, errores_ingenuo = estacional_ingenuo(series, horizonte)
+    pronostico_hw, errores_hw, parametros_hw = holt_winters(series, horizonte)
+
+    horas_pronostico = pd.date_range(horas[-1] + pd.Timedelta(hours=1), periods=horizonte, freq="h")
+
+    return {
+        "columnas": columnas,
+        "horas": horas,
+        "series": series,
+        "horas_pronostico": horas_pronostico,
+        "modelos": {
+            "Holt-Winters": pronostico_hw,
+            "Estacional ingenuo": pronostico_ingenuo,
+        },
+        "errores": pd.DataFrame({
+            "Serie": [columna.replace("_rms_AVG", "").replace("_sum_AVG", "") for columna in columnas],
+            "MAE Holt-Winters": errores_hw.round(4),
+            "MAE Estacional ingenuo": errores_ingenuo.round(4),
+            "alfa": parametros_hw[:, 0],
+            "beta": parametros_hw[:, 1],
+            "gamma": parametros_hw[:, 2],
+        }),
+    }
@@ -0,0 +1,219 @@
+"""Reglas de alarma definidas por el usuario, compiladas a programas vectorizados sobre las columnas.
+
+Una regla es una expresión como ``max(U1, U2, U3) > 1.1 * nominal`` o
+``Iunb > 10 and I1 > 50`` con una duración mínima en segundos. La expresión se
+analiza una sola vez con ``ast`` (solo se admiten números, columnas, valores de la
+configuración, operaciones aritméticas, comparaciones, and/or/not y las funciones
+max, min, any, all y abs) y se convierte en un árbol de funciones que opera sobre
+arreglos completos de NumPy. Los tramos contiguos donde la regla se cumple se
+convierten en eventos, descartando los más cortos que la duración mínima y
+cortándolos en los huecos de la serie.
+"""
+import ast
+import operator
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from utils.cache_datos import obtener_derivado
+from utils.estadisticas import COLUMNAS_CORRIENTE, COLUMNAS_DESBALANCE, COLUMNAS_VOLTAJE
+
+# Nombres cortos de las columnas que se pueden usar en las reglas
+ALIAS_COLUMNAS = {
+    "U1": "U1_rms_AVG", "U2": "U2_rms_AVG", "U3": "U3_rms_AVG",
+    "I1": "I1_rms_AVG", "I2": "I2_rms_AVG", "I3": "I3_rms_AVG",
+    "Uunb": "Uunb_AVG", "Iunb": "Iunb_AVG", "PF": "PF_sum_AVG",
+}
+COLUMNAS_REGLAS = COLUMNAS_VOLTAJE + COLUMNAS_CORRIENTE + COLUMNAS_DESBALANCE + ["PF_sum_AVG"]
+
+# Nombres cortos de valores de la configuración
+ALIAS_CONFIGURACION = {
+    "nominal": "valor_nominal_v",
+}
+
+# Operaciones de NumPy también entre escalares: dividir por cero o desbordar da inf o nan, no un error
+_OPERADORES_BINARIOS = {
+    ast.Add: np.add,
+    ast.Sub: np.subtract,
+    ast.Mult: np.multiply,
+    ast.Div: np.true_divide,
+}
+_COMPARACIONES = {
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+}
+_FUNCIONES = {
+    "max": lambda *args: np.maximum.reduce(np.broadcast_arrays(*args)),
+    "min": lambda *args: np.minimum.reduce(np.broadcast_arrays(*args)),
+    "any": lambda *args: np.logical_or.reduce(np.broadcast_arrays(*args)),
+    "all": lambda *args: np.logical_and.reduce(np.broadcast_arrays(*args)),
+    "abs": np.abs,
+}
+
+# Claves de la configuración que no son números y no pueden usarse en una regla
+_CLAVES_NO_NUMERICAS = {"reglas"}
+
+
+def _compilar_nodo(nodo, columnas):
+    """Convierte un nodo del AST en una función (datos, config) -> arreglo, registrando las columnas usadas."""
+    if isinstance(nodo, ast.Constant) and isinstance(nodo.value, (int, float)) and not isinstance(nodo.value, bool):
+        valor = float(nodo.value)
+        return lambda datos, config: valor
+
+    if isinstance(nodo, ast.Name):
+        nombre = ALIAS_COLUMNAS.get(nodo.id, nodo.id)
+        if nombre in COLUMNAS_REGLAS:
+            columnas.add(nombre)
+            return lambda datos, config: datos[nombre]
+        clave = ALIAS_CONFIGURACION.get(nodo.id, nodo.id)
+        if clave in _CLAVES_NO_NUMERICAS:
+            raise ValueError(f"'{nodo.id}' no es un valor numérico de la configuración.")
+        return lambda datos, config: float(config[clave])
+
+    if isinstance(nodo, ast.BinOp) and type(nodo.op) in _OPERADORES_BINARIOS:
+        operacion = _OPERADORES_BINARIOS[type(nodo.op)]
+        izquierda, derecha = _compilar_nodo(nodo.left, columnas), _compilar_nodo(nodo.right, columnas)
+
+        def operar(datos, config):
+            with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+                return operacion(izquierda(datos, config), derecha(datos, config))
+        return operar
+
+    if isinstance(nodo, ast.UnaryOp) and isinstance(nodo.op, ast.USub):
+        operando = _compilar_nodo(nodo.operand, columnas)
+        return lambda datos, config: -operando(datos, config)
+
+    if isinstance(nodo, ast.UnaryOp) and isinstance(nodo.op, ast.Not):
+        operando = _compilar_nodo(nodo.operand, columnas)
+        return lambda datos, config: np.logical_not(operando(datos, config))
+
+    if isinstance(nodo, ast.BoolOp):
+        reduccion = np.logical_and if isinstance(nodo.op, ast.And) else np.logical_or
+        operandos = [_compilar_nodo(valor, columnas) for valor in nodo.values]
+        return lambda datos, config: reduccion.reduce(np.broadcast_arrays(*[op(datos, config) for op in operandos]))
+
+    if isinstance(nodo, ast.Compare) and all(type(op) in _COMPARACIONES for op in nodo.ops):
+        # Comparaciones encadenadas (a < b < c) como conjunción de pares
+        terminos = [_compilar_nodo(termino, columnas) for termino in [nodo.left] + nodo.comparators]
+        comparaciones = [_COMPARACIONES[type(op)] for op in nodo.ops]
+
+        def comparar(datos, config):
+            valores = [termino(datos, config) for termino in terminos]
+            resultado = True
+            for comparacion, izquierda, derecha in zip(comparaciones, valores[:-1], valores[1:]):
+                resultado = np.logical_and(resultado, comparacion(izquierda, derecha))
+            return resultado
+        return comparar
+
+    if (isinstance(nodo, ast.Call) and isinstance(nodo.func, ast.Name) and nodo.func.id in _FUNCIONES
+            and nodo.args and not nodo.keywords):
+        funcion = _FUNCIONES[nodo.func.id]
+        argumentos = [_compilar_nodo(argumento, columnas) for argumento in nodo.args]
+        return lambda datos, config: funcion(*[argumento(datos, config) for argumento in argumentos])
+
+    raise ValueError(f"Elemento no permitido en la regla: '{ast.unparse(nodo)}'.")
+
+
+@lru_cache(maxsize=256)
+def compilar_regla(expresion):
+    """Analiza la expresión una sola vez y devuelve (programa, columnas usadas).
+
+    Lanza ValueError si la expresión no es válida.
+    """
+    try:
+        arbol = ast.parse(expresion.strip(), mode="eval")
+    except SyntaxError as error:
+        raise ValueError(f"La regla no es una expresión válida: {error.msg}.") from None
+    columnas = set()
+    programa = _compilar_nodo(arbol.body, columnas)
+    return programa, tuple(sorted(columnas))
+
+
+def validar_regla(expresion, config):
+    """Mensaje de error de la regla con esa configuración, o None si es válida."""
+    try:
+        programa, columnas = compilar_regla(expresion)
+        programa({columna: np.zeros(1) for columna in columnas}, config)
+    except KeyError as error:
+        return f"La configuración no tiene el valor {error}."
+    except (ValueError, TypeError, ArithmeticError) as error:
+        return str(error)
+    return None
+
+
+def tramos_activos(mascara, instantes, paso_segundos, duracion_minima):
+    """Tramos contiguos de la máscara, cortados en los huecos de la serie, de al menos duracion_minima segundos.
+
+    Devuelve las posiciones de inicio y fin (inclusive) y la duración de cada tramo.
+    """
+    if not mascara.any():
+        vacio = np.array([], dtype=np.int64)
+        return vacio, vacio, np.array([], dtype=float)
+
+    # Un tramo no continúa a través de un hueco mayor que 1.5 pasos
+    continua = np.diff(instantes) <= 1.5 * paso_segundos * 10 ** 9
+    sigue_activo = mascara[1:] & mascara[:-1] & continua
+
+    inicios = np.flatnonzero(mascara & ~np.concatenate(([False], sigue_activo)))
+    fines = np.flatnonzero(mascara & ~np.concatenate((sigue_activo, [False])))
+    duraciones = (instantes[fines] - instantes[inicios]) / 10 ** 9 + paso_segundos
+
+    largos = duraciones >= duracion_minima
+    return inicios[largos], fines[largos], duraciones[largos]
+
+
+def evaluar_reglas(df, reglas, config):
+    """Evalúa todas las reglas en una pasada sobre el conjunto y devuelve (eventos, resumen por regla).
+
+    Cada regla es un diccionario con 'nombre', 'expresion' y 'duracion_s'. Las
+    columnas que usan las reglas se convierten a NumPy una sola vez.
+    """
+    programas = [compilar_regla(regla["expresion"]) for regla in reglas]
+    columnas = sorted({columna for _, usadas in programas for columna in usadas})
+    datos = {columna: df[columna].to_numpy(dtype=float) for columna in columnas}
+
+    instantes = df["Datetime"].to_numpy(dtype="datetime64[ns]").view("int64")
+    intervalos = np.diff(instantes)
+    positivos = intervalos[intervalos > 0]
+    paso = float(np.median(positivos)) / 10 ** 9 if len(positivos) else 1.0
+
+    tablas = []
+    filas_resumen = []
+    for regla, (programa, _) in zip(reglas, programas):
+        mascara = np.broadcast_to(np.asarray(programa(datos, config), dtype=bool), instantes.shape)
+        inicios, fines, duraciones = tramos_activos(mascara, instantes, paso, float(regla["duracion_s"]))
+
+        tablas.append(pd.DataFrame({
+            "Regla": regla["nombre"],
+            "Inicio": pd.to_datetime(instantes[inicios]),
+            "Fin": pd.to_datetime(instantes[fines]),
+            "Duración (s)": duraciones.round(1),
+            "Muestras": fines - inicios + 1,
+        }))
+        filas_resumen.append({
+            "Regla": regla["nombre"],
+            "Expresión": regla["expresion"],
+            "Duración mínima (s)": float(regla["duracion_s"]),
+            "Eventos": len(inicios),
+            "Tiempo total (min)": round(duraciones.sum() / 60, 1),
+            "Evento más largo (s)": round(duraciones.max(), 1) if len(duraciones) else 0.0,
+        })
+
+    eventos = pd.concat(tablas, ignore_index=True) if tablas else pd.DataFrame(
+        columns=["Regla", "Inicio", "Fin", "Duración (s)", "Muestras"])
+    return eventos.sort_values("Inicio", kind="stable", ignore_index=True), pd.DataFrame(filas_resumen)
+
+
+def eventos_compartidos(huella, df, reglas, config):
+    """Eventos de las reglas desde la caché compartida, por reglas y valores de la configuración."""
+    clave = (
+        "eventos_reglas",
+        tuple((regla["nombre"], regla["expresion"], float(regla["duracion_s"])) for regla in reglas),
+        tuple(sorted((nombre, valor) for nombre, valor in config.items() if nombre not in _CLAVES_NO_NUMERICAS)),
+    )
+    return obtener_derivado(huella, clave, lambda: evaluar_reglas(df, reglas, config))
@@ -0,0 +1,363 @@
+"""Reporte PDF consolidado de un rango de fechas (p. ej. un mes).
+
+Los promedios horarios salen del pivote día × hora compartido con el Dashboard y
+los resúmenes diarios, la energía y las alarmas del rango se calculan en una sola
+pasada vectorizada. Las figuras de cada día se grafican en paralelo en un pool de
+procesos, con un número acotado de figuras en vuelo. Cada página diaria se agrega
+al PDF apenas su figura está lista y se escribe en disco al cerrarse
+(utils.pdf_incremental); luego se borran la imagen y los datos de ese día, así que
+la memoria del reporte no crece con el número de días.
+"""
+import atexit
+import multiprocessing
+import os
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait
+from datetime import datetime
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+
+from utils.cache_datos import obtener_derivado
+from utils.cumplimiento import evaluar_cumplimiento_semanal
+from utils.energia import VENTANA_DEMANDA_MINUTOS, calcular_energia
+from utils.estadisticas import COLUMNAS_CORRIENTE, COLUMNAS_VOLTAJE
+from utils.graficas import pivote_horario
+from utils.histogramas import histogramas_compartidos
+from utils.pdf_incremental import PDFIncremental
+from utils.resumen_diario import construir_resumen_diario, evaluar_alarmas_diarias
+
+TMP_DIR = "./tmp"
+
+# Procesos para graficar los días; con 1 se grafica en el mismo hilo de la tarea
+PROCESOS_FIGURAS = int(os.environ.get("IELE_PROCESOS_FIGURAS", str(min(4, os.cpu_count() or 1))))
+
+COLORES_FASES = ["blue", "red", "green"]
+DPI_FIGURAS = 90
+
+# Las figuras se guardan en JPEG: fpdf 1.7 lo incrusta tal cual, mientras que separar
+# el canal alfa de los PNG de matplotlib en Python tarda más que graficarlos
+
+_pool = None
+_candado_pool = threading.Lock()
+
+
+def _pool_figuras():
+    """Pool de procesos compartido, creado al primer reporte consolidado y cerrado al salir del servidor."""
+    global _pool
+    with _candado_pool:
+        if _pool is None:
+            # spawn: el servidor de Streamlit tiene hilos y no es seguro hacer fork
+            _pool = ProcessPoolExecutor(max_workers=PROCESOS_FIGURAS, mp_context=multiprocessing.get_context("spawn"))
+            atexit.register(_pool.shutdown, cancel_futures=True)
+        return _pool
+
+
+# ----------------------------------
+# 📈 Figuras (se ejecutan en los procesos del pool)
+# ----------------------------------
+
+def graficar_dia_consolidado(dia, voltajes, corrientes, pf, config, ruta):
+    """Voltaje, corriente y PF horarios de un día en tres paneles."""
+    horas = np.arange(24)
+    fig = Figure(figsize=(10, 9))
+    ax_voltaje, ax_corriente, ax_pf = fig.subplots(3, 1, sharex=True)
+
+    for fase in range(3):
+        ax_voltaje.plot(horas, voltajes[:, fase], marker="o", markersize=3, color=COLORES_FASES[fase], label=f"U{fase + 1}")
+        ax_corriente.plot(horas, corrientes[:, fase], marker="o", markersize=3, color=COLORES_FASES[fase], label=f"I{fase + 1}")
+
+    ax_voltaje.axhline(config["limite_superior_v"], color="red", linestyle="--", linewidth=1.5, label="Límite Superior")
+    ax_voltaje.axhline(config["limite_inferior_v"], color="blue", linestyle="--", linewidth=1.5, label="Límite Inferior")
+    ax_voltaje.set_ylabel("Voltaje (V)")
+    ax_voltaje.legend(loc="upper right", fontsize=7, ncol=5)
+
+    ax_corriente.axhline(config["umbral_corriente"], color="orange", linewidth=2, label="Corriente Nominal")
+    ax_corriente.set_ylabel("Corriente (A)")
+    ax_corriente.legend(loc="upper right", fontsize=7, ncol=4)
+
+    anormal = (pf < config["umbral_factor_potencia"]) | (pf > 1)
+    ax_pf.bar(horas, np.nan_to_num(pf), color=np.where(anormal, "red", "blue"))
+    ax_pf.axhline(config["umbral_factor_potencia"], color="orange", linestyle="--", linewidth=1.5)
+    ax_pf.set_ylim(0, 1.1)
+    ax_pf.set_ylabel("Factor de Potencia")
+    ax_pf.set_xlabel("Hora del Día")
+    ax_pf.set_xticks(horas, [f"{h:02d}:00" for h in horas], rotation=45, fontsize=7)
+
+    for ax in (ax_voltaje, ax_corriente, ax_pf):
+        ax.grid(True, color="lightgray", linestyle="--")
+
+    ax_voltaje.set_title(f"Promedios por hora del {dia}")
+    fig.tight_layout()
+    fig.savefig(ruta, dpi=DPI_FIGURAS, pil_kwargs={"quality": 90})
+    return ruta
+
+
+def graficar_energia_diaria(etiquetas, energia, demanda_maxima, ruta):
+    """Energía por día en barras y demanda máxima diaria en un segundo eje."""
+    fig = Figure(figsize=(12, 5))
+    ax = fig.subplots()
+    posiciones = np.arange(len(etiquetas))
+
+    ax.bar(posiciones, energia, color="darkorange", label="Energía (kWh)")
+    ax.set_ylabel("Energía (kWh)")
+    ax_demanda = ax.twinx()
+    ax_demanda.plot(posiciones, demanda_maxima, color="black", marker="o", markersize=3,
+                    label=f"Demanda máxima {VENTANA_DEMANDA_MINUTOS} min (kW)")
+    ax_demanda.set_ylabel("Demanda (kW)")
+
+    ax.set_xticks(posiciones, etiquetas, rotation=90, fontsize=7)
+    ax.set_title("Energía y demanda máxima por día")
+    ax.grid(axis="y", color="lightgray", linestyle="--")
+    fig.legend(loc="upper right", fontsize=8)
+    fig.tight_layout()
+    fig.savefig(ruta, dpi=DPI_FIGURAS, pil_kwargs={"quality": 90})
+    return ruta
+
+
+def graficar_voltaje_diario(etiquetas, minimos, promedios, maximos, config, ruta):
+    """Mínimo, promedio y máximo diario del voltaje de cada fase."""
+    fig = Figure(figsize=(12, 5))
+    ax = fig.subplots()
+    posiciones = np.arange(len(etiquetas))
+
+    for fase in range(3):
+        ax.fill_between(posiciones, minimos[:, fase], maximos[:, fase], color=COLORES_FASES[fase], alpha=0.15)
+        ax.plot(posiciones, promedios[:, fase], color=COLORES_FASES[fase], marker="o", markersize=3, label=f"U{fase + 1}")
+
+    ax.axhline(config["limite_superior_v"], color="red", linestyle="--", linewidth=1.5, label="Límite Superior")
+    ax.axhline(config["limite_inferior_v"], color="blue", linestyle="--", linewidth=1.5, label="Límite Inferior")
+    ax.set_xticks(posiciones, etiquetas, rotation=90, fontsize=7)
+    ax.set_ylabel("Voltaje (V)")
+    ax.set_title("Voltaje diario: promedio y rango mínimo-máximo")
+    ax.grid(True, color="lightgray", linestyle="--")
+    ax.legend(loc="upper right", fontsize=8, ncol=5)
+    fig.tight_layout()
+    fig.savefig(ruta, dpi=DPI_FIGURAS, pil_kwargs={"quality": 90})
+    return ruta
+
+
+# ----------------------------------
+# 📄 PDF
+# ----------------------------------
+
+def _texto(valor):
+    """fpdf 1.7 solo admite latin-1."""
+    return str(valor).encode("latin-1", "replace").decode("latin-1")
+
+
+def _tabla(pdf, tabla, tamano=7, alto=5):
+    pdf.set_font("Courier", size=tamano)
+    for linea in tabla.to_string(index=False).split("\n"):
+        pdf.cell(0, alto, _texto(linea), ln=True)
+
+
+def _resumenes_diarios(df_rango):
+    """Mínimo, promedio y máximo diario de voltajes y promedio diario de corrientes y PF."""
+    dias = df_rango["Datetime"].dt.normalize()
+    agrupado = df_rango.groupby(dias)
+    voltajes = agrupado[COLUMNAS_VOLTAJE]
+    return {
+        "dias": voltajes.mean().index,
+        "voltaje_min": voltajes.min().to_numpy(),
+        "voltaje_promedio": voltajes.mean().to_numpy(),
+        "voltaje_max": voltajes.max().to_numpy(),
+        "corriente_promedio": agrupado[COLUMNAS_CORRIENTE].mean().to_numpy(),
+        "pf_promedio": agrupado["PF_sum_AVG"].mean().to_numpy(),
+    }
+
+
+def construir_reporte_consolidado(df, desde, hasta, config, reportar_progreso, huella=None):
+    """Genera el PDF consolidado de los días entre `desde` y `hasta` (ambos incluidos)."""
+    prefijo = uuid.uuid4().hex[:8]
+    os.makedirs(TMP_DIR, exist_ok=True)
+    inicio = pd.Timestamp(desde)
+    fin = pd.Timestamp(hasta) + pd.Timedelta(days=1)
+
+    reportar_progreso(0.02, "Calculando resúmenes del rango...")
+    df_rango = df[(df["Datetime"] >= inicio) & (df["Datetime"] < fin)]
+    if df_rango.empty:
+        raise ValueError("No hay datos en el rango seleccionado.")
+
+    # Promedios horarios de cada día: el mismo pivote día × hora que usan el Dashboard y el reporte diario
+    resumen = _resumenes_diarios(df_rango)
+    dias = resumen["dias"]
+    dias_pivote, matrices_horarias = pivote_horario(huella, df)
+    posiciones_pivote = dias_pivote.get_indexer(dias)
+
+    energia = obtener_derivado(huella, ("energia", VENTANA_DEMANDA_MINUTOS), lambda: calcular_energia(df))
+    etiquetas = dias.strftime("%d/%m/%Y")
+    tabla_energia = energia["dias"].set_index("Día").reindex(etiquetas)
+    columna_pico = f"Demanda máxima {VENTANA_DEMANDA_MINUTOS} min (kW)"
+
+    resumen_diario = obtener_derivado(huella, "resumen_diario", lambda: construir_resumen_diario(df))
+    alarmas = evaluar_alarmas_diarias(resumen_diario, histogramas_compartidos(huella, df), config)
+    alarmas = alarmas[alarmas["Día"].isin(etiquetas)]
+
+    df_cumplimiento = None
+    if config["valor_nominal_v"] > 0:
+        df_cumplimiento = evaluar_cumplimiento_semanal(df_rango, config["valor_nominal_v"])
+    del df_rango
+
+    # Figuras del rango y de cada día en el pool; como máximo 2 figuras en vuelo por proceso
+    paralelo = PROCESOS_FIGURAS > 1
+    en_vuelo = deque()
+    figuras_rango = []
+    maximo_en_vuelo = 2 * PROCESOS_FIGURAS
+
+    def enviar(funcion, *args):
+        if paralelo:
+            return _pool_figuras().submit(funcion, *args)
+        return funcion(*args)
+
+    def resultado(figura):
+        return figura.result() if paralelo else figura
+
+    pdf = None
+    try:
+        ruta_energia = os.path.join(TMP_DIR, f"{prefijo}_energia_diaria.jpg")
+        ruta_voltaje = os.path.join(TMP_DIR, f"{prefijo}_voltaje_diario.jpg")
+        figuras_rango += [
+            enviar(graficar_energia_diaria, list(etiquetas), tabla_energia["Energía (kWh)"].to_numpy(),
+                   tabla_energia[columna_pico].to_numpy(), ruta_energia),
+            enviar(graficar_voltaje_diario, list(etiquetas), resumen["voltaje_min"], resumen["voltaje_promedio"],
+                   resumen["voltaje_max"], config, ruta_voltaje),
+        ]
+
+        def enviar_dia(posicion):
+            # Un día sin ningún valor válido en el pivote no tiene fila en él: se grafica vacío
+            if posiciones_pivote[posicion] >= 0:
+                bloque = matrices_horarias[:, posiciones_pivote[posicion]].T
+            else:
+                bloque = np.full((24, len(matrices_horarias)), np.nan)
+            ruta = os.path.join(TMP_DIR, f"{prefijo}_dia_{posicion:03d}.jpg")
+            return posicion, enviar(graficar_dia_consolidado, etiquetas[posicion], bloque[:, 0:3], bloque[:, 3:6], bloque[:, 6], config, ruta)
+
+        siguiente = 0
+        while siguiente < len(dias) and len(en_vuelo) < maximo_en_vuelo:
+            en_vuelo.append(enviar_dia(siguiente))
+            siguiente += 1
+
+        # ---- Portada y resumen del rango
+        reportar_progreso(0.1, "Armando resumen del rango...")
+        ruta_pdf = os.path.join(TMP_DIR, f"{prefijo}_reporte_consolidado_{datetime.now().strftime('%Y%m%d')}.pdf")
+        pdf = PDFIncremental(ruta_pdf)
+        pdf.set_auto_page_break(auto=True, margin=15)
+        pdf.add_page()
+
+        pdf.set_font("Arial", 'B', 16)
+        pdf.cell(0, 10, "Reporte consolidado del sistema", ln=True, align='C')
+        pdf.set_font("Arial", size=12)
+        pdf.cell(0, 8, f"Del {etiquetas[0]} al {etiquetas[-1]} ({len(dias)} días con datos)", ln=True, align='C')
+        pdf.ln(8)
+
+        pdf.set_font("Arial", size=11)
+        pdf.multi_cell(0, 8, _texto(
+            "Este reporte consolida el comportamiento eléctrico del sistema en el rango indicado: energía y demanda "
+            "por día, niveles de voltaje, alarmas diarias y cumplimiento semanal, seguidos de una página por día "
+            "con los promedios horarios de voltaje, corriente y factor de potencia."
+        ))
+        pdf.ln(4)
+
+        pico = tabla_energia[columna_pico]
+        dia_pico = pico.idxmax() if pico.notna().any() else None
+        pdf.set_font("Arial", '', 9)
+        lineas_resumen = [
+            f"Energía total: {tabla_energia['Energía (kWh)'].sum():,.2f} kWh",
+            f"Energía promedio diaria: {tabla_energia['Energía (kWh)'].mean():,.2f} kWh",
+            f"Potencia obtenida de: {energia['fuente']}",
+        ]
+        if dia_pico is not None:
+            lineas_resumen.append(
+                f"Demanda máxima de {VENTANA_DEMANDA_MINUTOS} min del rango: {pico[dia_pico]:,.2f} kW "
+                f"el {dia_pico} (ventana que termina a las {tabla_energia.loc[dia_pico, 'Hora demanda máxima']})"
+            )
+        lineas_resumen += [
+            f"Límites de voltaje: {config['limite_inferior_v']} V - {config['limite_superior_v']} V (nominal {config['valor_nominal_v']} V)",
+            f"Valor nominal de corriente: {config['umbral_corriente']} A",
+            f"Factor de potencia umbral: {config['umbral_factor_potencia']}",
+        ]
+        for linea in lineas_resumen:
+            pdf.cell(0, 6, _texto(linea), ln=True)
+        pdf.ln(4)
+
+        pdf.set_font("Arial", size=11)
+        pdf.multi_cell(0, 8, "Energía y demanda por día:")
+        _tabla(pdf, tabla_energia.reset_index())
+
+        pdf.add_page()
+        for figura in figuras_rango:
+            ruta = resultado(figura)
+            pdf.image(ruta, x=10, w=190)
+            pdf.ln(5)
+            os.remove(ruta)
+
+        pdf.add_page()
+        pdf.set_font("Arial", size=11)
+        pdf.multi_cell(0, 8, "Alarmas por día con la configuración actual:")
+        _tabla(pdf, alarmas.drop(columns=["Estado desbalance V", "Estado desbalance I"]), tamano=6, alto=4)
+
+        if df_cumplimiento is not None and not df_cumplimiento.empty:
+            pdf.ln(5)
+            pdf.set_font("Arial", size=11)
+            pdf.multi_cell(0, 8, _texto("Cumplimiento semanal del voltaje (95% de los promedios de 10 minutos dentro de ±10% del nominal):"))
+            _tabla(pdf, df_cumplimiento)
+
+        # ---- Una página por día, en orden, a medida que las figuras terminan
+        while en_vuelo:
+            posicion, figura = en_vuelo.popleft()
+            ruta = resultado(figura)
+            if siguiente < len(dias):
+                en_vuelo.append(enviar_dia(siguiente))
+                siguiente += 1
+
+            pdf.add_page()
+            pdf.set_font("Arial", 'B', 13)
+            pdf.cell(0, 9, _texto(f"Día {etiquetas[posicion]}"), ln=True)
+            pdf.set_font("Arial", '', 9)
+            fila_energia = tabla_energia.iloc[posicion]
+            if pd.isna(fila_energia[columna_pico]) or pd.isna(fila_energia["Hora demanda máxima"]):
+                demanda = "sin datos"
+            else:
+                demanda = f"{fila_energia[columna_pico]:,.2f} kW a las {fila_energia['Hora demanda máxima']}"
+            voltaje_min = resumen["voltaje_min"][posicion]
+            voltaje_max = resumen["voltaje_max"][posicion]
+            corrientes = resumen["corriente_promedio"][posicion]
+            for linea in (
+                f"Energía: {fila_energia['Energía (kWh)']:,.2f} kWh  |  Demanda máxima {VENTANA_DEMANDA_MINUTOS} min: {demanda}",
+                f"Voltaje mínimo / máximo: " + ", ".join(f"U{fase + 1} {voltaje_min[fase]:.1f}/{voltaje_max[fase]:.1f} V" for fase in range(3)),
+                f"Corriente promedio: " + ", ".join(f"I{fase + 1} {corrientes[fase]:.2f} A" for fase in range(3))
+                + f"  |  PF promedio: {resumen['pf_promedio'][posicion]:.3f}",
+            ):
+                pdf.cell(0, 6, _texto(linea), ln=True)
+            pdf.image(ruta, x=10, w=190)
+            os.remove(ruta)
+
+            reportar_progreso(0.15 + 0.8 * (posicion + 1) / len(dias), f"Página del {etiquetas[posicion]} lista")
+
+        reportar_progreso(0.97, "Terminando PDF...")
+        pdf.output()
+    except BaseException:
+        if pdf is not None:
+            pdf.descartar()
+        raise
+    finally:
+        # Si algo falla no deben quedar imágenes sueltas en el directorio temporal: se cancelan
+        # las figuras pendientes y se espera a las que ya se están escribiendo antes de borrar
+        if paralelo:
+            pendientes = [figura for _, figura in en_vuelo] + figuras_rango
+            for figura in pendientes:
+                figura.cancel()
+            wait(pendientes)
+        for archivo in os.listdir(TMP_DIR):
+            if archivo.startswith(prefijo) and archivo.endswith(".jpg"):
+                os.remove(os.path.join(TMP_DIR, archivo))
+
+    return ruta_pdf
@@ -0,0 +1,220 @@
+"""Armado del PDF del reporte diario.
+
+Se importa solo cuando el usuario pide un reporte, para que fpdf y matplotlib no
+pesen en el arranque de las páginas. Las gráficas son las mismas especificaciones
+del Dashboard (utils.graficas) dibujadas con matplotlib a partir de los agregados
+que ya están en la caché compartida.
+"""
+import os
+import uuid
+from datetime import datetime
+
+import pandas as pd
+from fpdf import FPDF
+
+from utils.cache_datos import obtener_derivado
+from utils.cumplimiento import evaluar_cumplimiento_semanal
+from utils.energia import VENTANA_DEMANDA_MINUTOS, calcular_energia, energia_del_dia
+from utils.graficas import (a_matplotlib, datos_dia, spec_corriente, spec_energia_horaria, spec_factor_potencia,
+                            spec_promedio_corriente, spec_voltaje)
+
+TMP_DIR = "./tmp"
+
+
+def generar_pdf(fig_paths, df, config_text, df_cumplimiento=None, nombre_pdf=None, energia_text=None):
+    """Genera un PDF con imágenes, resumen de configuración, energía y tabla de cumplimiento."""
+    pdf = FPDF()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.add_page()
+
+    pdf.set_font("Arial", 'B', 16)
+    pdf.cell(0, 10, "Reporte del Sistema", ln=True, align='C')
+    pdf.ln(10)
+
+    intro_text="Este reporte presenta un resumen detallado del comportamiento eléctrico del sistema durante el día seleccionado. Incluye el análisis de los niveles de voltaje, corriente y factor de potencia por hora, así como los valores promedio y umbrales definidos. Su propósito es facilitar el monitoreo, identificar desviaciones de los parámetros normales y apoyar la toma de decisiones técnicas.\n\n"
+
+    # Párrafo introductorio
+    if intro_text:
+        pdf.set_font("Arial", size=11)
+        pdf.multi_cell(0, 8, intro_text)
+        pdf.ln(5)
+
+    # Texto introductorio para la sección de alarmas
+    config_intro_text = (
+        "Configuración de Alarmas del Sistema\n"
+    )
+
+    # Párrafo introductorio
+    if config_intro_text:
+        pdf.set_font("Arial", size=11)
+        pdf.multi_cell(0, 8, config_intro_text)
+        pdf.ln(5)
+
+    # Resumen de configuración
+    pdf.set_font("Arial", '', 8)
+    for linea in config_text:
+        pdf.cell(0, 8, linea, ln=True)
+    pdf.ln(5)
+
+    # Texto introductorio para la tabla de voltajes
+    intro_tabla = (
+        "Resumen por cuartiles del voltaje:\n"
+    )
+
+    # Párrafo introductorio
+    if intro_tabla:
+        pdf.set_font("Arial", size=11)
+        pdf.multi_cell(0, 8, intro_tabla)
+        pdf.ln(5)
+
+    # Tabla de datos (máximo 20 filas)
+    pdf.set_font("Courier", size=10)
+    tabla = df.head(20).to_string(index=True).split('\n')
+    for linea in tabla:
+        pdf.cell(0, 8, linea, ln=True)
+
+    # Resumen de energía y demanda del día
+    if energia_text:
+        pdf.ln(5)
+        pdf.set_font("Arial", size=11)
+        pdf.multi_cell(0, 8, "Energía y demanda del día:\n")
+        pdf.ln(5)
+
+        pdf.set_font("Arial", '', 8)
+        for linea in energia_text:
+            pdf.cell(0, 8, linea, ln=True)
+
+    # Tabla de cumplimiento semanal (EN 50160)
+    if df_cumplimiento is not None and not df_cumplimiento.empty:
+        pdf.ln(5)
+        pdf.set_font("Arial", size=11)
+        pdf.multi_cell(0, 8, "Cumplimiento semanal del voltaje (95% de los promedios de 10 minutos dentro de ±10% del nominal):\n")
+        pdf.ln(5)
+
+        pdf.set_font("Courier", size=8)
+        tabla_cumplimiento = df_cumplimiento.to_string(index=False).split('\n')
+        for linea in tabla_cumplimiento:
+            pdf.cell(0, 6, linea, ln=True)
+        pdf.ln(5)
+
+    # Texto introductorio para las gráficas
+    intro_graficas= (
+        "Gráficas para voltaje, corriente y factor de potencia:\n"
+    )
+
+    # Párrafo introductorio
+    if intro_graficas:
+        pdf.set_font("Arial", size=11)
+        pdf.multi_cell(0, 8, intro_graficas)
+        pdf.ln(5)
+
+    
+
+    
+
+    # Imágenes
+    for fig_path in fig_paths:
+        if os.path.exists(fig_path):
+            pdf.image(fig_path, x=10, w=190)
+            pdf.ln(10)
+
+    if nombre_pdf is None:
+        nombre_pdf = f"reporte_{datetime.now().strftime('%Y%m%d')}.pdf"
+    path_pdf = os.path.join(TMP_DIR, nombre_pdf)
+    pdf.output(path_pdf)
+
+    return path_pdf
+
+
+def _texto_demanda(pico, hora):
+    """Línea de la demanda máxima del día, o "sin datos" si el día no tiene pico."""
+    if pd.isna(pico) or pd.isna(hora):
+        return f"Demanda máxima de {VENTANA_DEMANDA_MINUTOS} minutos: sin datos"
+    return f"Demanda máxima de {VENTANA_DEMANDA_MINUTOS} minutos: {pico:.2f} kW, ventana que termina a las {hora}"
+
+
+def construir_reporte(df, dia, df_tabla_voltajes, config, reportar_progreso, huella=None):
+    """Genera las gráficas y el PDF del día; pensada para ejecutarse como tarea en segundo plano."""
+    # Prefijo único para que reportes simultáneos de varias sesiones no se sobrescriban
+    prefijo = uuid.uuid4().hex[:8]
+    os.makedirs(TMP_DIR, exist_ok=True)
+
+    try:
+        # Promedios horarios del día tomados de los agregados que comparte con el Dashboard
+        reportar_progreso(0.05, "Tomando promedios horarios...")
+        datos = datos_dia(huella, df, dia)
+
+        reportar_progreso(0.1, "Graficando voltajes...")
+        img_voltaje = a_matplotlib(
+            spec_voltaje(datos["horas"], datos["voltaje"], config, titulo="Voltajes promedio por hora"),
+            os.path.join(TMP_DIR, f"{prefijo}_voltaje_resumido.jpg")
+        )
+
+        reportar_progreso(0.25, "Graficando corrientes...")
+        img_corriente = a_matplotlib(
+            spec_corriente(datos["horas"], datos["corriente"], config["umbral_corriente"], titulo="Corriente promedio por hora"),
+            os.path.join(TMP_DIR, f"{prefijo}_corriente_resumido.jpg")
+        )
+
+        img_promedio_corriente = a_matplotlib(
+            spec_promedio_corriente(datos["corriente_promedio"], config["umbral_corriente"]),
+            os.path.join(TMP_DIR, f"{prefijo}_corriente_promedio_fases.jpg")
+        )
+
+        reportar_progreso(0.45, "Graficando factor de potencia...")
+        img_factor_potencia = a_matplotlib(
+            spec_factor_potencia(datos["pf"], config["umbral_factor_potencia"]),
+            os.path.join(TMP_DIR, f"{prefijo}_factor_potencia_resumido.jpg")
+        )
+
+        # Texto resumen
+        config_text = [
+            f"Límite superior de voltaje: {config['limite_superior_v']} V",
+            f"Valor nominal de voltaje: {config['valor_nominal_v']} V",
+            f"Límite inferior de voltaje: {config['limite_inferior_v']} V",
+            f"Valor nominal de corriente: {config['umbral_corriente']} I",
+            f"Factor de potencia umbral: {config['umbral_factor_potencia']}",
+        ]
+
+        # Cumplimiento semanal sobre todo el conjunto de datos, compartido con el Dashboard
+        reportar_progreso(0.6, "Evaluando cumplimiento semanal...")
+        df_cumplimiento = None
+        if config["valor_nominal_v"] > 0:
+            df_cumplimiento = obtener_derivado(
+                huella, ("cumplimiento", config["valor_nominal_v"]),
+                lambda: evaluar_cumplimiento_semanal(df, config["valor_nominal_v"])
+            )
+
+        imagenes = [img_voltaje, img_corriente, img_promedio_corriente, img_factor_potencia]
+
+        # Energía y demanda del día, tomadas del cálculo compartido con el Dashboard
+        energia_text = None
+        reportar_progreso(0.7, "Calculando energía y demanda...")
+        try:
+            energia = obtener_derivado(huella, ("energia", VENTANA_DEMANDA_MINUTOS), lambda: calcular_energia(df))
+        except ValueError:
+            energia = None
+
+        if energia is not None:
+            energia_horas, fila_dia = energia_del_dia(energia, dia)
+            if fila_dia is not None:
+                columna_pico = f"Demanda máxima {VENTANA_DEMANDA_MINUTOS} min (kW)"
+                energia_text = [
+                    f"Energía del día: {fila_dia['Energía (kWh)']:.2f} kWh (cobertura {fila_dia['Cobertura (%)']:.1f} %)",
+                    _texto_demanda(fila_dia[columna_pico], fila_dia["Hora demanda máxima"]),
+                    f"Potencia obtenida de: {energia['fuente']}",
+                ]
+                imagenes.append(a_matplotlib(spec_energia_horaria(energia_horas), os.path.join(TMP_DIR, f"{prefijo}_energia_horaria.jpg")))
+
+        # Crear PDF
+        reportar_progreso(0.8, "Armando PDF...")
+        pdf_path = generar_pdf(imagenes, df_tabla_voltajes, config_text, df_cumplimiento,
+                               nombre_pdf=f"{prefijo}_reporte_{datetime.now().strftime('%Y%m%d')}.pdf",
+                               energia_text=energia_text)
+    finally:
+        # Las imágenes ya quedaron embebidas en el PDF; si algo falla tampoco deben quedar sueltas
+        for archivo in os.listdir(TMP_DIR):
+            if archivo.startswith(prefijo) and archivo.endswith(".jpg"):
+                os.remove(os.path.join(TMP_DIR, archivo))
+
+    return pdf_path
@@ -0,0 +1,213 @@
+"""Reproducción en tiempo real de un conjunto de mediciones, para demostrar y validar el monitoreo en vivo.
+
+El conjunto se recorre a una velocidad configurable: en cada actualización se toman
+solo las muestras nuevas según el reloj de la reproducción, se agregan a un buffer
+circular de tamaño fijo y se evalúan las alarmas sobre ese lote, arrastrando el estado
+de los tramos abiertos entre lotes. Así el costo de cada actualización depende del
+tamaño del lote y del buffer, no de cuánto tiempo lleve la reproducción.
+"""
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from utils.reglas_alarma import COLUMNAS_REGLAS, compilar_regla
+
+# Alarmas de los límites fijos de la configuración, expresadas como reglas
+REGLAS_LIMITES = [
+    {"nombre": "Sobretensión", "expresion": "max(U1, U2, U3) > limite_superior_v", "duracion_s": 0.0},
+    {"nombre": "Subtensión", "expresion": "min(U1, U2, U3) < limite_inferior_v", "duracion_s": 0.0},
+    {"nombre": "Sobrecorriente", "expresion": "max(I1, I2, I3) > umbral_corriente", "duracion_s": 0.0},
+    {"nombre": "PF bajo", "expresion": "PF < umbral_factor_potencia", "duracion_s": 0.0},
+    {"nombre": "Desbalance V crítico", "expresion": "Uunb > desbalance_critico_v", "duracion_s": 0.0},
+    {"nombre": "Desbalance I crítico", "expresion": "Iunb > desbalance_critico_i", "duracion_s": 0.0},
+]
+
+# Máximo de eventos cerrados que se conservan en el registro
+MAX_EVENTOS = 200
+
+
+class BufferCircular:
+    """Buffer de tamaño fijo con los últimos instantes y valores recibidos."""
+
+    def __init__(self, capacidad, n_columnas):
+        self.capacidad = capacidad
+        self.instantes = np.zeros(capacidad, dtype=np.int64)
+        self.valores = np.full((capacidad, n_columnas), np.nan)
+        self.siguiente = 0
+        self.tamano = 0
+
+    def agregar(self, instantes, valores):
+        """Agrega un lote; si es más grande que el buffer solo se conservan sus últimas muestras."""
+        instantes, valores = instantes[-self.capacidad:], valores[-self.capacidad:]
+        posiciones = (self.siguiente + np.arange(len(instantes))) % self.capacidad
+        self.instantes[posiciones] = instantes
+        self.valores[posiciones] = valores
+        self.siguiente = (self.siguiente + len(instantes)) % self.capacidad
+        self.tamano = min(self.tamano + len(instantes), self.capacidad)
+
+    def ordenado(self):
+        """Instantes y valores del buffer en orden de llegada."""
+        if self.tamano < self.capacidad:
+            return self.instantes[:self.tamano], self.valores[:self.tamano]
+        orden = np.r_[self.siguiente:self.capacidad, 0:self.siguiente]
+        return self.instantes[orden], self.valores[orden]
+
+
+def iniciar_reproduccion(df, config, capacidad=3600, velocidad=60.0):
+    """Estado inicial de una reproducción del conjunto con las alarmas de la configuración y sus reglas."""
+    columnas = [columna for columna in COLUMNAS_REGLAS if columna in df.columns]
+    instantes = df["Datetime"].to_numpy(dtype="datetime64[ns]").view("int64")
+    intervalos = np.diff(instantes)
+    positivos = intervalos[intervalos > 0]
+
+    reglas = []
+    for regla in REGLAS_LIMITES + list(config.get("reglas", [])):
+        programa, usadas = compilar_regla(regla["expresion"])
+        if set(usadas) <= set(columnas):
+            reglas.append((regla, programa))
+
+    return {
+        "df": df,
+        "columnas": columnas,
+        "instantes": instantes,
+        "paso_ns": int(np.median(positivos)) if len(positivos) else 10 ** 9,
+        "config": config,
+        "buffer": BufferCircular(capacidad, len(columnas)),
+        "velocidad": velocidad,
+        "posicion": 0,
+        # Reloj: instante de datos alcanzado y momento real en que se alcanzó (None si está en pausa)
+        "reloj_datos": int(instantes[0]) if len(instantes) else 0,
+        "reloj_real": None,
+        "reglas": reglas,
+        "alarmas": {regla["nombre"]: {"inicio": None, "ultimo": None} for regla, _ in reglas},
+        "eventos": deque(maxlen=MAX_EVENTOS),
+        "muestras_ultimo_lote": 0,
+    }
+
+
+def en_curso(estado):
+    """Indica si el reloj de la reproducción está corriendo."""
+    return estado["reloj_real"] is not None
+
+
+def terminada(estado):
+    """Indica si ya se reprodujeron todas las muestras."""
+    return estado["posicion"] >= len(estado["instantes"])
+
+
+def reanudar(estado, ahora=None):
+    """Pone a correr el reloj desde el instante de datos alcanzado."""
+    estado["reloj_real"] = time.monotonic() if ahora is None else ahora
+
+
+def pausar(estado, ahora=None):
+    """Detiene el reloj conservando el instante de datos alcanzado."""
+    if en_curso(estado):
+        estado["reloj_datos"] = _instante_objetivo(estado, ahora)
+        estado["reloj_real"] = None
+
+
+def _instante_objetivo(estado, ahora=None):
+    """Instante de datos que corresponde al momento real `ahora` según la velocidad."""
+    ahora = time.monotonic() if ahora is None else ahora
+    return estado["reloj_datos"] + int((ahora - estado["reloj_real"]) * estado["velocidad"] * 10 ** 9)
+
+
+def _actualizar_alarma(regla, alarma, mascara, instantes, paso_ns):
+    """Actualiza el tramo abierto de una alarma con un lote y devuelve los eventos que se cerraron en él."""
+    continua_previo = alarma["ultimo"] is not None and instantes[0] - alarma["ultimo"] <= 1.5 * paso_ns
+    sigue_activo = mascara[1:] & mascara[:-1] & (np.diff(instantes) <= 1.5 * paso_ns)
+    inicios = np.flatnonzero(mascara & ~np.concatenate(([False], sigue_activo)))
+    fines = np.flatnonzero(mascara & ~np.concatenate((sigue_activo, [False])))
+    inicios_ns, fines_ns = instantes[inicios], instantes[fines]
+
+    cerrados = []
+    if alarma["inicio"] is not None:
+        if mascara[0] and continua_previo:
+            # El primer tramo del lote continúa el que quedó abierto
+            inicios_ns[0] = alarma["inicio"]
+        else:
+            cerrados.append((alarma["inicio"], alarma["ultimo"]))
+
+    # El último tramo queda abierto si llega hasta el final del lote
+    abierto = bool(mascara[-1])
+    hasta = len(inicios_ns) - 1 if abierto else len(inicios_ns)
+    cerrados += list(zip(inicios_ns[:hasta], fines_ns[:hasta]))
+    alarma["inicio"] = int(inicios_ns[-1]) if abierto else None
+    alarma["ultimo"] = int(instantes[-1])
+    return _eventos(regla, cerrados, paso_ns)
+
+
+def _eventos(regla, tramos, paso_ns):
+    """Eventos del registro para los tramos (inicio, fin) que cumplen la duración mínima de la regla."""
+    eventos = []
+    for inicio, fin in tramos:
+        duracion = (fin - inicio + paso_ns) / 10 ** 9
+        if duracion >= float(regla["duracion_s"]):
+            eventos.append({
+                "Regla": regla["nombre"],
+                "Inicio": pd.Timestamp(int(inicio)),
+                "Fin": pd.Timestamp(int(fin)),
+                "Duración (s)": round(duracion, 1),
+            })
+    return eventos
+
+
+def avanzar(estado, ahora=None):
+    """Procesa las muestras nuevas hasta el reloj actual; devuelve cuántas se agregaron.
+
+    Solo se leen las filas nuevas del conjunto y las alarmas se evalúan sobre ese lote.
+    """
+    if not en_curso(estado) or terminada(estado):
+        estado["muestras_ultimo_lote"] = 0
+        return 0
+
+    ahora = time.monotonic() if ahora is None else ahora
+    objetivo = _instante_objetivo(estado, ahora)
+    estado["reloj_datos"], estado["reloj_real"] = objetivo, ahora
+
+    instantes = estado["instantes"]
+    desde = estado["posicion"]
+    hasta = int(np.searchsorted(instantes, objetivo, side="right"))
+    estado["posicion"] = hasta
+    estado["muestras_ultimo_lote"] = hasta - desde
+    if hasta == desde:
+        return 0
+
+    instantes_lote = instantes[desde:hasta]
+    valores_lote = estado["df"].iloc[desde:hasta][estado["columnas"]].to_numpy(dtype=float)
+    estado["buffer"].agregar(instantes_lote, valores_lote)
+
+    datos = {columna: valores_lote[:, i] for i, columna in enumerate(estado["columnas"])}
+    nuevos = []
+    for regla, programa in estado["reglas"]:
+        mascara = np.broadcast_to(np.asarray(programa(datos, estado["config"]), dtype=bool), instantes_lote.shape)
+        alarma = estado["alarmas"][regla["nombre"]]
+        nuevos += _actualizar_alarma(regla, alarma, mascara, instantes_lote, estado["paso_ns"])
+    if terminada(estado):
+        # Al final de los datos se cierran los tramos que seguían abiertos, igual que en evaluar_reglas
+        for regla, _ in estado["reglas"]:
+            alarma = estado["alarmas"][regla["nombre"]]
+            if alarma["inicio"] is not None:
+                nuevos += _eventos(regla, [(alarma["inicio"], alarma["ultimo"])], estado["paso_ns"])
+                alarma["inicio"] = None
+        pausar(estado, ahora)
+
+    # El registro queda del más reciente al más antiguo
+    estado["eventos"].extendleft(sorted(nuevos, key=lambda evento: evento["Inicio"]))
+    return hasta - desde
+
+
+def alarmas_activas(estado):
+    """Alarmas con un tramo abierto que ya cumple su duración mínima."""
+    filas = []
+    for regla, _ in estado["reglas"]:
+        alarma = estado["alarmas"][regla["nombre"]]
+        if alarma["inicio"] is None:
+            continue
+        duracion = (alarma["ultimo"] - alarma["inicio"] + estado["paso_ns"]) / 10 ** 9
+        if duracion >= float(regla["duracion_s"]):
+            filas.append({"Regla": regla["nombre"], "Desde": pd.Timestamp(alarma["inicio"]), "Duración (s)": round(duracion, 1)})
+    return pd.DataFrame(filas, columns=["Regla", "Desde", "Duración (s)"])
@@ -0,0 +1,77 @@
+"""Resúmenes diarios precalculados para reevaluar alarmas sin recorrer los datos crudos.
+
+La fracción de tiempo de cada día por encima o por debajo de un límite sale de los
+histogramas diarios (utils.histogramas), los mismos que usan la distribución y el
+calendario. Aquí solo se guardan el desbalance como suma y conteo diarios y el factor
+de potencia como matriz de promedios día × hora.
+"""
+import numpy as np
+import pandas as pd
+
+from utils.agregados import promedios_dia_hora
+from utils.calidad import SEGUNDOS_DIA
+from utils.histogramas import fuera_de_limite_por_dia
+
+CANALES_VOLTAJE = ["U1_rms_AVG", "U2_rms_AVG", "U3_rms_AVG"]
+CANALES_CORRIENTE = ["I1_rms_AVG", "I2_rms_AVG", "I3_rms_AVG"]
+CANALES_DESBALANCE = ["Uunb_AVG", "Iunb_AVG"]
+
+
+def construir_resumen_diario(df):
+    """Precalcula por día la suma y el conteo del desbalance y el PF horario."""
+    instantes = df["Datetime"].to_numpy(dtype="datetime64[s]").astype("int64")
+    dias_codigo, posiciones_dia = np.unique(instantes // SEGUNDOS_DIA, return_inverse=True)
+
+    desbalance = {}
+    for canal in CANALES_DESBALANCE:
+        valores = df[canal].to_numpy(dtype=float)
+        no_nulos = ~np.isnan(valores)
+        desbalance[canal] = (
+            np.bincount(posiciones_dia[no_nulos], weights=valores[no_nulos], minlength=len(dias_codigo)),
+            np.bincount(posiciones_dia[no_nulos], minlength=len(dias_codigo)),
+        )
+
+    # promedios_dia_hora omite los días sin ningún PF válido: se alinean con todos los días, con NaN
+    dias = pd.to_datetime(dias_codigo * SEGUNDOS_DIA, unit="s")
+    dias_pf, matrices_pf = promedios_dia_hora(df, ["PF_sum_AVG"])
+    posiciones_pf = dias_pf.get_indexer(dias)
+    pf_horario = np.full((len(dias), 24), np.nan)
+    pf_horario[posiciones_pf >= 0] = matrices_pf[0][posiciones_pf[posiciones_pf >= 0]]
+
+    return {
+        "dias": dias,
+        "desbalance": desbalance,
+        "pf_horario": pf_horario,
+    }
+
+
+def clasificar_desbalance(valores, moderado, critico):
+    """Estado del desbalance (Normal, Moderado o Crítico) según los umbrales de la configuración."""
+    return np.select([valores < moderado, valores < critico], ["Normal", "Moderado"], default="Crítico")
+
+
+def evaluar_alarmas_diarias(resumen, histogramas, config):
+    """Reevalúa las alarmas de cada día para una configuración usando solo los resúmenes y los histogramas."""
+    def peor_fase(canales, limite, sobre):
+        return 100 * fuera_de_limite_por_dia(histogramas, canales, limite, sobre)[1]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sumas_v, conteos_v = resumen["desbalance"]["Uunb_AVG"]
+        sumas_i, conteos_i = resumen["desbalance"]["Iunb_AVG"]
+        desbalance_v = sumas_v / conteos_v
+        desbalance_i = sumas_i / conteos_i
+
+    pf_horario = resumen["pf_horario"]
+    horas_pf_anormal = ((pf_horario < config["umbral_factor_potencia"]) | (pf_horario > 1)).sum(axis=1)
+
+    return pd.DataFrame({
+        "Día": resumen["dias"].strftime("%d/%m/%Y"),
+        "% tiempo sobre límite superior V": peor_fase(CANALES_VOLTAJE, config["limite_superior_v"], True).round(2),
+        "% tiempo bajo límite inferior V": peor_fase(CANALES_VOLTAJE, config["limite_inferior_v"], False).round(2),
+        "% tiempo sobre umbral I": peor_fase(CANALES_CORRIENTE, config["umbral_corriente"], True).round(2),
+        "Desbalance V (%)": desbalance_v.round(3),
+        "Estado desbalance V": clasificar_desbalance(desbalance_v, config["desbalance_moderado_v"], config["desbalance_critico_v"]),
+        "Desbalance I (%)": desbalance_i.round(3),
+        "Estado desbalance I": clasificar_desbalance(desbalance_i, config["desbalance_moderado_i"], config["desbalance_critico_i"]),
+        "Horas PF anormal": horas_pf_anormal,
+    })
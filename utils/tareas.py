@@ -0,0 +1,102 @@
+"""Ejecución de tareas pesadas en segundo plano, compartida por todas las sesiones.
+
+Las tareas viven en el proceso del servidor, así que sobreviven a los reruns y a los
+cambios de página; cada sesión solo guarda el identificador de su tarea. Las tareas
+cuyo resultado es un archivo temporal lo borran al descartarse si nadie lo recogió.
+"""
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# Máximo de tareas pesadas simultáneas entre todas las sesiones del servidor
+MAX_TAREAS_CONCURRENTES = int(os.environ.get("IELE_MAX_TAREAS", "2"))
+
+# Tiempo que se conservan las tareas terminadas antes de descartarlas
+SEGUNDOS_RETENCION = 3600
+
+_ejecutor = ThreadPoolExecutor(max_workers=MAX_TAREAS_CONCURRENTES, thread_name_prefix="iele-tarea")
+_tareas = {}
+_candado = threading.Lock()
+
+
+class Tarea:
+    """Estado, progreso y resultado de una tarea en segundo plano."""
+
+    def __init__(self, descripcion, archivo_temporal=False):
+        self.id = uuid.uuid4().hex
+        self.descripcion = descripcion
+        self.archivo_temporal = archivo_temporal
+        self.estado = "pendiente"
+        self.progreso = 0.0
+        self.mensaje = "En cola..."
+        self.resultado = None
+        self.error = None
+        self.terminada_en = None
+
+    @property
+    def activa(self):
+        return self.estado in ("pendiente", "ejecutando")
+
+    def reportar_progreso(self, fraccion, mensaje=None):
+        """Actualiza el progreso (0 a 1) y, opcionalmente, el mensaje visible."""
+        self.progreso = min(max(float(fraccion), 0.0), 1.0)
+        if mensaje is not None:
+            self.mensaje = mensaje
+
+
+def _ejecutar(tarea, funcion, args, kwargs):
+    tarea.estado = "ejecutando"
+    tarea.mensaje = "Procesando..."
+    try:
+        tarea.resultado = funcion(*args, reportar_progreso=tarea.reportar_progreso, **kwargs)
+        tarea.progreso = 1.0
+        tarea.mensaje = "Terminado"
+        tarea.estado = "terminada"
+    except Exception as error:
+        tarea.error = error
+        tarea.mensaje = str(error)
+        tarea.estado = "fallida"
+    finally:
+        tarea.terminada_en = time.time()
+
+
+def _limpiar_tareas_antiguas():
+    limite = time.time() - SEGUNDOS_RETENCION
+    for id_tarea in [i for i, t in _tareas.items() if t.terminada_en is not None and t.terminada_en < limite]:
+        tarea = _tareas.pop(id_tarea)
+        if tarea.archivo_temporal and tarea.resultado is not None and os.path.exists(tarea.resultado):
+            os.remove(tarea.resultado)
+
+
+def enviar_tarea(funcion, *args, descripcion="", archivo_temporal=False, **kwargs):
+    """Encola `funcion` en el pool compartido y devuelve el id de la tarea.
+
+    La función recibe un argumento adicional `reportar_progreso(fraccion, mensaje)`.
+    Con `archivo_temporal=True` el resultado es la ruta de un archivo que se borra
+    cuando la tarea se descarta.
+    """
+    tarea = Tarea(descripcion, archivo_temporal)
+    with _candado:
+        _limpiar_tareas_antiguas()
+        _tareas[tarea.id] = tarea
+    _ejecutor.submit(_ejecutar, tarea, funcion, args, kwargs)
+    return tarea.id
+
+
+def obtener_tarea(id_tarea):
+    """Devuelve la tarea con ese id o None si no existe o ya fue descartada."""
+    if id_tarea is None:
+        return None
+    with _candado:
+        return _tareas.get(id_tarea)
+
+
+def leer_archivo_temporal(ruta):
+    """Lee los bytes de un archivo generado por una tarea y lo borra del disco."""
+    try:
+        with open(ruta, "rb") as archivo:
+            return archivo.read()
+    finally:
+        os.remove(ruta)